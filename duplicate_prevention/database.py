@@ -21,7 +21,7 @@ Functions:
     get_health_status: Check database health and connectivity
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 import requests
 
@@ -47,6 +47,11 @@ class DatabaseHealthCheckError(DatabaseError):
     pass
 
 
+def _file_path_filter(file_path: str) -> Dict[str, Any]:
+    """Qdrant filter matching the points of one file"""
+    return {"must": [{"key": "file_path", "match": {"value": file_path}}]}
+
+
 class DatabaseConnector:
     """Main interface for Qdrant database operations
 
@@ -1300,6 +1305,169 @@ class DatabaseConnector:
             )
             return False
 
+    def count_file_points(self, collection_name: str, file_path: str) -> int:
+        """Count the points whose file_path payload equals a path
+
+        Args:
+            collection_name: Name of the collection
+            file_path: Value of the file_path payload field
+
+        Returns:
+            Number of matching points, 0 if the count failed
+        """
+        if not collection_name or not file_path:
+            return 0
+
+        try:
+            response = self.session.post(
+                f"{self.base_url}/collections/{collection_name}/points/count",
+                json={"filter": _file_path_filter(file_path), "exact": True},
+                timeout=self.timeout_tuple
+            )
+            if response.status_code == 200:
+                return response.json().get("result", {}).get("count", 0)
+
+            self.logger.error(
+                "Failed to count file points",
+                extra={"collection_name": collection_name, "file_path": file_path,
+                       "status_code": response.status_code}
+            )
+            return 0
+
+        except (requests.exceptions.RequestException, ValueError) as e:
+            self.logger.error(
+                "Error counting file points",
+                extra={"collection_name": collection_name, "file_path": file_path, "error": str(e)}
+            )
+            return 0
+
+    def file_paths_with_points(self, collection_name: str, file_paths: List[str]) -> Optional[Set[str]]:
+        """Find which of the given paths have points, with one filtered scroll
+
+        Args:
+            collection_name: Name of the collection
+            file_paths: Values of the file_path payload field to look for
+
+        Returns:
+            The paths that have at least one point, None if the scroll failed
+        """
+        if not collection_name or not file_paths:
+            return set()
+
+        request = {
+            "filter": {"must": [{"key": "file_path", "match": {"any": list(file_paths)}}]},
+            "limit": 1000,
+            "with_payload": {"include": ["file_path"]},
+            "with_vector": False,
+        }
+        found = set()
+        try:
+            while True:
+                response = self.session.post(
+                    f"{self.base_url}/collections/{collection_name}/points/scroll",
+                    json=request,
+                    timeout=self.timeout_tuple
+                )
+                if response.status_code != 200:
+                    self.logger.error(
+                        "Failed to scroll file points",
+                        extra={"collection_name": collection_name, "files_count": len(file_paths),
+                               "status_code": response.status_code}
+                    )
+                    return None
+
+                result = response.json().get("result", {})
+                found.update(point.get("payload", {}).get("file_path") for point in result.get("points", []))
+                offset = result.get("next_page_offset")
+                if offset is None:
+                    found.discard(None)
+                    return found
+                request["offset"] = offset
+
+        except (requests.exceptions.RequestException, ValueError) as e:
+            self.logger.error(
+                "Error scrolling file points",
+                extra={"collection_name": collection_name, "files_count": len(file_paths), "error": str(e)}
+            )
+            return None
+
+    def move_file_paths(self, collection_name: str, moves: Dict[str, str]) -> bool:
+        """Rewrite the file_path payload of every point of moved files in one batch request
+
+        Vectors are left untouched, so renamed or moved files are not embedded
+        again. Points already stored under a destination path belong to the
+        file the move replaced and are deleted first.
+
+        Qdrant applies the operations in order, so a move whose destination is
+        the source of another move (a -> b, b -> c) is issued after that move;
+        otherwise a's points would be carried on to c. Cycles such as swapping
+        two files cannot be ordered and are rejected.
+
+        Args:
+            collection_name: Name of the collection
+            moves: Old file path -> new file path
+
+        Returns:
+            True if Qdrant applied every update, False otherwise
+        """
+        if not collection_name or not moves:
+            return False
+
+        pending = {old_path: new_path for old_path, new_path in moves.items() if old_path != new_path}
+        ordered = []
+        while pending:
+            ready = [old_path for old_path, new_path in pending.items() if new_path not in pending]
+            if not ready:
+                self.logger.error(
+                    "Cannot move file paths in a cycle",
+                    extra={"collection_name": collection_name, "files_count": len(pending)}
+                )
+                return False
+            for old_path in ready:
+                ordered.append((old_path, pending.pop(old_path)))
+
+        operations = []
+        for old_path, new_path in ordered:
+            operations.append({"delete": {"filter": _file_path_filter(new_path)}})
+            operations.append({
+                "set_payload": {"payload": {"file_path": new_path}, "filter": _file_path_filter(old_path)}
+            })
+        if not operations:
+            return True
+
+        try:
+            response = self.session.post(
+                f"{self.base_url}/collections/{collection_name}/points/batch",
+                params={"wait": "true"},
+                json={"operations": operations},
+                timeout=self.timeout_tuple
+            )
+
+            if response.status_code == 200:
+                self.logger.debug(
+                    "File paths moved",
+                    extra={"collection_name": collection_name, "files_count": len(moves)}
+                )
+                return True
+
+            self.logger.error(
+                "Failed to move file paths",
+                extra={
+                    "collection_name": collection_name,
+                    "files_count": len(moves),
+                    "status_code": response.status_code,
+                    "response_text": response.text[:200]
+                }
+            )
+            return False
+
+        except requests.exceptions.RequestException as e:
+            self.logger.error(
+                "Error moving file paths",
+                extra={"collection_name": collection_name, "files_count": len(moves), "error": str(e)}
+            )
+            return False
+
     def create_collection_strict(self, collection_name: str, vector_size: int, distance: str = "cosine") -> None:
         """Create a new collection in Qdrant with strict error handling
 
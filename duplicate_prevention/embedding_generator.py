@@ -29,8 +29,9 @@ import logging
 import math
 import os
 import re
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
 # Custom exceptions for embedding generation
@@ -716,7 +717,7 @@ class EmbeddingGenerator:
                  chunking_strategy: str = "function_based", chunk_size: int = 512,
                  overlap: int = 50, preprocess: bool = True,
                  extract_metadata: bool = True, batch_size: int = 32,
-                 memory_optimized: bool = False):
+                 memory_optimized: bool = False, on_embedding: Optional[Callable[[float], None]] = None):
         """Initialize embedding generator
 
         Args:
@@ -729,6 +730,8 @@ class EmbeddingGenerator:
             extract_metadata: Whether to extract detailed metadata
             batch_size: Batch size for processing
             memory_optimized: Use memory-efficient processing
+            on_embedding: Called with the seconds each generate_embedding() call took,
+                e.g. a metrics histogram's observe
         """
         # Validate model name
         supported_models = ['simple', 'unixcoder', 'codebert', 'custom']
@@ -741,6 +744,7 @@ class EmbeddingGenerator:
         self.extract_metadata = extract_metadata
         self.batch_size = batch_size
         self.memory_optimized = memory_optimized
+        self.on_embedding = on_embedding
 
         # Initialize components
         self.preprocessor = CodePreprocessor() if preprocess else None
@@ -764,6 +768,7 @@ class EmbeddingGenerator:
         Returns:
             Dictionary with embedding and metadata
         """
+        start = time.perf_counter()
         try:
             self.logger.debug(f"Generating embedding for {language} code, length: {len(code)}")
 
@@ -796,6 +801,8 @@ class EmbeddingGenerator:
             }
 
             self.logger.debug(f"Generated {len(embedding)}-dim embedding with {len(chunks)} chunks")
+            if self.on_embedding is not None:
+                self.on_embedding(time.perf_counter() - start)
             return result
 
         except Exception as e:
@@ -624,6 +624,17 @@ class ExampleClass:
         # Should produce identical embeddings for identical input
         assert result1["embedding"] == result2["embedding"]
 
+    @pytest.mark.integration
+    def test_on_embedding_receives_elapsed_seconds(self):
+        """Test that the hook passed to the generator is called once per embedding"""
+        timings = []
+        generator = EmbeddingGenerator(model_name="simple", on_embedding=timings.append)
+
+        generator.generate_embedding("def test_function(): return 42", language="python")
+
+        assert len(timings) == 1
+        assert timings[0] >= 0
+
     @pytest.mark.integration
     def test_similarity_comparison_real(self):
         """Test utility method for comparing embedding similarity with real vectors"""
@@ -514,6 +514,88 @@ class TestDeleteVectorPoints:
         assert hasattr(connector, "delete_point")
 
 
+class TestMoveFilePaths:
+    """Test suite for rewriting file paths of moved files without re-embedding"""
+
+    @pytest.mark.integration
+    def test_move_file_paths_rewrites_payload_and_replaces_destination(self):
+        """Test that moved points keep their vectors and stale destination points are dropped"""
+        connector = DatabaseConnector(host="localhost", port=6333)
+        collection_name = "test_vector_move_paths"
+
+        connector.create_collection(collection_name, vector_size=4)
+
+        try:
+            connector.insert_points_batch(
+                collection_name,
+                [
+                    {"id": 1, "vector": [0.1, 0.2, 0.3, 0.4], "metadata": {"file_path": "/src/old.py"}},
+                    {"id": 2, "vector": [0.4, 0.3, 0.2, 0.1], "metadata": {"file_path": "/src/old.py"}},
+                    {"id": 3, "vector": [0.2, 0.2, 0.2, 0.2], "metadata": {"file_path": "/lib/new.py"}},
+                ],
+            )
+
+            result = connector.move_file_paths(collection_name, {"/src/old.py": "/lib/new.py"})
+
+            assert result is True
+            assert connector.count_file_points(collection_name, "/src/old.py") == 0
+            assert connector.count_file_points(collection_name, "/lib/new.py") == 2
+            matches = connector.search_similar_vectors(collection_name, [0.1, 0.2, 0.3, 0.4], limit=5)
+            assert {match["id"] for match in matches} == {1, 2}
+
+        finally:
+            connector.delete_collection(collection_name)
+
+    @pytest.mark.integration
+    def test_move_file_paths_applies_chained_moves_in_order(self):
+        """Test that a -> b, b -> c leaves a's points at b and b's points at c"""
+        connector = DatabaseConnector(host="localhost", port=6333)
+        collection_name = "test_vector_move_chain"
+
+        connector.create_collection(collection_name, vector_size=4)
+
+        try:
+            connector.insert_points_batch(
+                collection_name,
+                [
+                    {"id": 1, "vector": [0.1, 0.2, 0.3, 0.4], "metadata": {"file_path": "/a.py"}},
+                    {"id": 2, "vector": [0.4, 0.3, 0.2, 0.1], "metadata": {"file_path": "/b.py"}},
+                    {"id": 3, "vector": [0.2, 0.2, 0.2, 0.2], "metadata": {"file_path": "/c.py"}},
+                ],
+            )
+
+            result = connector.move_file_paths(collection_name, {"/a.py": "/b.py", "/b.py": "/c.py"})
+
+            assert result is True
+            assert connector.count_file_points(collection_name, "/a.py") == 0
+            assert connector.count_file_points(collection_name, "/b.py") == 1
+            assert connector.count_file_points(collection_name, "/c.py") == 1
+            assert connector.file_paths_with_points(collection_name, ["/a.py", "/b.py", "/c.py"]) == {
+                "/b.py", "/c.py"
+            }
+            matches = connector.search_similar_vectors(collection_name, [0.4, 0.3, 0.2, 0.1], limit=1)
+            assert matches[0]["id"] == 2
+            assert matches[0]["metadata"]["file_path"] == "/c.py"
+
+        finally:
+            connector.delete_collection(collection_name)
+
+    def test_move_file_paths_rejects_cycles(self):
+        """Test that swapping two files is refused before anything is sent"""
+        connector = DatabaseConnector(host="localhost", port=1, timeout=0.1)
+
+        assert connector.move_file_paths("test_collection", {"/a.py": "/b.py", "/b.py": "/a.py"}) is False
+
+    @pytest.mark.integration
+    def test_move_file_paths_connection_failure(self):
+        """Test move_file_paths handles connection failures gracefully"""
+        connector = DatabaseConnector(host="localhost", port=1, timeout=0.1)
+
+        assert connector.move_file_paths("test_collection", {"/a.py": "/b.py"}) is False
+        assert connector.count_file_points("test_collection", "/a.py") == 0
+        assert connector.file_paths_with_points("test_collection", ["/b.py"]) is None
+
+
 # TDD RED Phase Notes:
 # - All tests should currently FAIL with AttributeError (methods don't exist yet)
 # - @pytest.mark.integration marks tests that need real database
@@ -17,7 +17,6 @@ Uses watchdog library for efficient file system monitoring
 import logging
 import threading
 import time
-from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
 
 try:
@@ -34,12 +33,52 @@ import sys
 
 # Add indexer scripts to path
 sys.path.insert(0, "/indexer/scripts")
+from directory_walker import walk_files
 from index_repository import RepositoryIndexer
+from indexer_metrics import REGISTRY, RateMeter, start_health_server
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
+EVENTS = REGISTRY.counter(
+    "duplicate_index_events_total", "File system events received by the watcher", labels=("kind",)
+)
+EVENT_RATE = RateMeter(window=60)
+REGISTRY.gauge("duplicate_index_events_per_second", "File system events received per second over the last minute",
+               function=EVENT_RATE.rate)
+FILE_SECONDS = REGISTRY.histogram(
+    "duplicate_index_file_seconds", "Time to embed and store one changed file, including Qdrant writes"
+)
+EMBEDDING_SECONDS = REGISTRY.histogram("duplicate_index_embedding_seconds", "Time to embed one file")
+QDRANT_SECONDS = REGISTRY.histogram(
+    "duplicate_index_qdrant_request_seconds", "Round-trip time of Qdrant HTTP requests until the response headers"
+)
+LAST_RECONCILE = REGISTRY.gauge(
+    "duplicate_index_last_reconcile_timestamp_seconds", "Unix time of the last completed full scan of the workspace"
+)
+
+
+def record_event(kind):
+    """Count a file system event for /metrics"""
+    EVENTS.inc(kind=kind)
+    EVENT_RATE.mark()
+
+
+def instrument(indexer):
+    """Record embedding time and Qdrant round trips of an indexer in the metrics"""
+    # The indexer creates its EmbeddingGenerator itself, so hand the hook to that instance
+    generator = getattr(indexer, "embedding_generator", None)
+    if generator is not None and hasattr(generator, "on_embedding"):
+        generator.on_embedding = EMBEDDING_SECONDS.observe
+    else:
+        logger.warning("Indexer has no embedding_generator; embedding time will not be recorded")
+
+    session = getattr(indexer.db, "session", None)
+    if session is not None:
+        session.hooks["response"].append(lambda response, *args, **kwargs: QDRANT_SECONDS.observe(
+            response.elapsed.total_seconds()))
+
 
 class DuplicatePreventionHandler(FileSystemEventHandler):
     """Handles file system events and updates the duplicate prevention index"""
@@ -48,16 +87,17 @@ class DuplicatePreventionHandler(FileSystemEventHandler):
         self.indexer = indexer
         self.last_indexed = {}
 
+    def is_indexable(self, file_path):
+        """Check if a path has a supported extension and is not ignored"""
+        path = Path(file_path)
+        return path.suffix.lower() in self.indexer.SUPPORTED_EXTENSIONS and not self.indexer.should_ignore_path(path)
+
     def should_index_file(self, file_path):
         """Check if file should be indexed"""
         path = Path(file_path)
 
-        # Skip if not supported extension
-        if path.suffix.lower() not in self.indexer.SUPPORTED_EXTENSIONS:
-            return False
-
-        # Skip ignored patterns
-        if self.indexer.should_ignore_path(path):
+        # Skip unsupported extensions and ignored patterns
+        if not self.is_indexable(path):
             return False
 
         # Skip if file was indexed very recently (within 1 second)
@@ -71,12 +111,14 @@ class DuplicatePreventionHandler(FileSystemEventHandler):
         """Handle file modification events"""
         if event.is_directory:
             return
+        record_event("modified")
 
         if self.should_index_file(event.src_path):
             logger.info(f"File modified: {event.src_path}")
             try:
                 file_path = Path(event.src_path)
-                self.indexer.index_file(file_path, self._get_next_point_id())
+                with FILE_SECONDS.time():
+                    self.indexer.index_file(file_path, self._get_next_point_id())
                 self.last_indexed[str(file_path)] = time.time()
                 logger.info(f"Successfully re-indexed: {event.src_path}")
             except Exception as e:
@@ -86,6 +128,7 @@ class DuplicatePreventionHandler(FileSystemEventHandler):
         """Handle file creation events"""
         if event.is_directory:
             return
+        record_event("created")
 
         if self.should_index_file(event.src_path):
             logger.info(f"New file created: {event.src_path}")
@@ -93,7 +136,8 @@ class DuplicatePreventionHandler(FileSystemEventHandler):
             time.sleep(0.1)
             try:
                 file_path = Path(event.src_path)
-                self.indexer.index_file(file_path, self._get_next_point_id())
+                with FILE_SECONDS.time():
+                    self.indexer.index_file(file_path, self._get_next_point_id())
                 self.last_indexed[str(file_path)] = time.time()
                 logger.info(f"Successfully indexed new file: {event.src_path}")
             except Exception as e:
@@ -103,6 +147,7 @@ class DuplicatePreventionHandler(FileSystemEventHandler):
         """Handle file deletion events"""
         if event.is_directory:
             return
+        record_event("deleted")
 
         if Path(event.src_path).suffix.lower() in self.indexer.SUPPORTED_EXTENSIONS:
             logger.info(f"File deleted: {event.src_path}")
@@ -114,6 +159,58 @@ class DuplicatePreventionHandler(FileSystemEventHandler):
             except Exception as e:
                 logger.error(f"Error removing {event.src_path} from index: {e}")
 
+    def on_moved(self, event):
+        """Handle file and directory moves by rewriting stored paths instead of re-embedding
+
+        A rename keeps the file's content, so its points only need a new
+        file_path payload. A file is embedded again only when its content
+        changed, when it replaced the destination from a temporary file as
+        editors do on save, or when it had no points to move.
+        """
+        # watchdog follows a directory move with synthetic moves of everything
+        # below it, which the directory move has already handled
+        if getattr(event, "is_synthetic", False):
+            return
+        record_event("moved")
+        src, dest = Path(event.src_path), Path(event.dest_path)
+        if event.is_directory:
+            pairs = [(src / path.relative_to(dest), path) for path in (Path(entry.path) for entry in walk_files(dest))]
+        else:
+            pairs = [(src, dest)]
+
+        db, collection = self.indexer.db, self.indexer.collection_name
+        moves = {}
+        changed = []
+        for old, new in pairs:
+            if not self.is_indexable(new):
+                continue
+            if self.is_indexable(old):
+                moves[str(old)] = str(new)
+            else:
+                changed.append(new)
+
+        if moves:
+            logger.info(f"Moved: {event.src_path} -> {event.dest_path} ({len(moves)} files)")
+            if db.move_file_paths(collection, moves):
+                # Files never indexed under their old path had nothing to move
+                stored = db.file_paths_with_points(collection, list(moves.values()))
+                if stored is None:
+                    logger.error(f"Error checking {len(moves)} moved files in index, embedding them again")
+                    stored = set()
+                changed.extend(Path(new) for new in moves.values() if new not in stored)
+            else:
+                logger.error(f"Error moving {len(moves)} files in index, embedding them again")
+                changed.extend(Path(new) for new in moves.values())
+
+        for file_path in changed:
+            try:
+                with FILE_SECONDS.time():
+                    self.indexer.index_file(file_path, self._get_next_point_id())
+                self.last_indexed[str(file_path)] = time.time()
+                logger.info(f"Successfully indexed moved file: {file_path}")
+            except Exception as e:
+                logger.error(f"Error indexing {file_path}: {e}")
+
     def _get_next_point_id(self):
         """Get next available point ID"""
         # Simple implementation - use timestamp + random for uniqueness
@@ -122,33 +219,6 @@ class DuplicatePreventionHandler(FileSystemEventHandler):
         return int(time.time() * 1000) + random.randint(1, 999)
 
 
-class HealthCheckHandler(BaseHTTPRequestHandler):
-    """Simple HTTP handler for health checks"""
-
-    def do_GET(self):
-        if self.path == "/health":
-            self.send_response(200)
-            self.send_header("Content-type", "text/plain")
-            self.end_headers()
-            self.wfile.write(b"OK")
-        else:
-            self.send_response(404)
-            self.end_headers()
-
-    def log_message(self, format, *args):
-        # Suppress health check logs
-        if "/health" not in args[0]:
-            super().log_message(format, *args)
-
-
-def start_health_server(port=9999):
-    """Start a simple HTTP server for health checks"""
-    server_address = ("", port)
-    httpd = HTTPServer(server_address, HealthCheckHandler)
-    logger.info(f"Health check server started on port {port}")
-    httpd.serve_forever()
-
-
 def periodic_scan(indexer, scan_interval=60):
     """Fallback mode: periodically scan for changes"""
     logger.info(f"Running in periodic scan mode (every {scan_interval} seconds)")
@@ -162,10 +232,8 @@ def periodic_scan(indexer, scan_interval=60):
 
             # Scan workspace root for all supported files
             project_root = Path("/workspace")
-            for file_path in project_root.rglob("*"):
-                if not file_path.is_file():
-                    continue
-
+            for entry in walk_files(project_root):
+                file_path = Path(entry.path)
                 if file_path.suffix.lower() not in indexer.SUPPORTED_EXTENSIONS:
                     continue
 
@@ -173,7 +241,8 @@ def periodic_scan(indexer, scan_interval=60):
                     continue
 
                 try:
-                    point_id = indexer.index_file(file_path, point_id)
+                    with FILE_SECONDS.time():
+                        point_id = indexer.index_file(file_path, point_id)
                     changed_count += 1
                 except Exception as e:
                     logger.error(f"Error indexing {file_path}: {e}")
@@ -182,6 +251,7 @@ def periodic_scan(indexer, scan_interval=60):
                 logger.info(f"Updated {changed_count} files in index")
             else:
                 logger.info("No changes detected")
+            LAST_RECONCILE.set_to_current_time()
 
         except Exception as e:
             logger.error(f"Error during periodic scan: {e}")
@@ -196,6 +266,7 @@ def main():
     health_thread.start()
 
     indexer = RepositoryIndexer(quiet=False)
+    instrument(indexer)
     logger.info(f"Using collection: {indexer.collection_name}")
 
     # Check if collection has any vectors
@@ -211,6 +282,7 @@ def main():
         logger.info("Performing initial duplicate prevention index...")
         workspace_path = Path("/workspace")
         indexer.index_repository(workspace_path)
+        LAST_RECONCILE.set_to_current_time()
     except Exception as e:
         logger.error(f"Error during initial indexing: {e}")
 
@@ -220,6 +292,8 @@ def main():
 
         event_handler = DuplicatePreventionHandler(indexer)
         observer = Observer()
+        REGISTRY.gauge("duplicate_index_event_queue_depth", "File system events waiting for the handler",
+                       function=observer.event_queue.qsize)
 
         # Watch the entire workspace
         workspace_root = Path("/workspace")
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# RULE #0: MANDATORY FIRST ACTION FOR EVERY REQUEST
+# 1. Read CLAUDE.md COMPLETELY before responding
+# 2. Setup Python venv: [ -d "venv" ] || ./setup-venv.sh && source venv/bin/activate
+# 3. Search for rules related to the request
+# 4. Only proceed after confirming no violations
+# Failure to follow Rule #0 has caused real harm. Check BEFORE acting, not AFTER making mistakes.
+#
+# GUARDS ARE SAFETY EQUIPMENT - WHEN THEY FIRE, FIX THE PROBLEM THEY FOUND
+# NEVER weaken, disable, or bypass guards - they prevent real harm
+
+"""Measure indexing throughput and search latency as the index grows.
+
+For each size a synthetic Python repository is generated and indexed from
+scratch, then measured on:
+- cold index: first full index of the tree
+- no-op rescan: full walk of the unchanged tree
+- single-file update: re-indexing one edited file, including the commit
+- search: p50/p99 latency of every CodeSearcher search_type with the
+  result cache disabled, so each call queries the database
+
+Results are printed, and can be saved as JSON baselines next to
+PERFORMANCE_BASELINES.md or compared with them. A metric regresses when it
+is slower than its baseline by more than the tolerance and by more than
+MIN_REGRESSION_MS; comparisons exit with status 1 when any metric does.
+
+Usage:
+    python3 benchmark_scale.py [--sizes 1000 10000 100000] [--save | --compare]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+from typing import Dict, List
+
+from code_indexer import CodeIndexer
+
+src_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from code_searcher import CodeSearcher
+
+DEFAULT_BASELINE_PATH = Path(__file__).parent / "SCALE_BASELINES.json"
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+# Slowdown tolerated before a metric counts as a regression, and the absolute
+# difference below which timer noise is ignored
+DEFAULT_TOLERANCE = 0.25
+MIN_REGRESSION_MS = 1.0
+
+VERBS = ("get", "set", "load", "save", "parse", "build", "validate", "fetch", "render",
+         "compute", "update", "delete", "create", "resolve", "merge", "refresh")
+NOUNS = ("user", "order", "config", "file", "cache", "request", "session", "token",
+         "record", "report", "index", "payload", "schema", "event", "queue", "account")
+ROLES = ("Manager", "Handler", "Service", "Repository", "Client", "Builder", "Validator", "Store")
+
+# Queries per search_type, cycled through for the latency samples
+QUERIES = {
+    "name": ["get_user", "load_*", "*Service*", "validate_payload", "Order*", "refresh_token"],
+    "content": ["validate request", "cache", "user session", "report schema", "merge records"],
+    "file": ["*module_12*", "package_3", "*subsystem_4/module_7*", "orders"],
+    "fuzzy": ["gu", "lc", "OrdMgr", "get_uesr", "vldt_payload", "SessionHndlr"],
+}
+
+
+def generate_repo(root: Path, files: int, seed: int = 0):
+    """Write a synthetic package tree of documented classes, methods and functions."""
+    rng = random.Random(seed)
+    for i in range(files):
+        path = root / f"package_{i % 50}" / f"subsystem_{i % 13}" / f"module_{i}.py"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        noun = NOUNS[i % len(NOUNS)]
+        lines = [f'"""Module {i}: {noun} handling for the synthetic benchmark repository."""', "", "import os", ""]
+        for c in range(rng.randint(1, 3)):
+            cls_noun = rng.choice(NOUNS)
+            lines += [
+                f"class {cls_noun.title()}{rng.choice(ROLES)}{i}_{c}:",
+                f'    """Coordinate {cls_noun} objects and keep their {rng.choice(NOUNS)} state consistent."""',
+                "",
+            ]
+            for _ in range(rng.randint(2, 5)):
+                verb, method_noun = rng.choice(VERBS), rng.choice(NOUNS)
+                lines += [
+                    f"    def {verb}_{method_noun}(self, {method_noun}, timeout=None):",
+                    f'        """{verb.title()} the {method_noun} and validate the request before returning."""',
+                    f"        if {method_noun} is None:",
+                    f"            raise ValueError('missing {method_noun}')",
+                    f"        return {method_noun}",
+                    "",
+                ]
+        for _ in range(rng.randint(1, 3)):
+            verb = rng.choice(VERBS)
+            lines += [
+                f"def {verb}_{noun}_{rng.randint(0, 99)}(config):",
+                f'    """{verb.title()} a {noun} from the config."""',
+                "    return config",
+                "",
+            ]
+        path.write_text("\n".join(lines))
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of a list of samples."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def timed(function, *args, **kwargs) -> float:
+    """Run a function with its output discarded and return the elapsed milliseconds."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        function(*args, **kwargs)
+        return (time.perf_counter() - start) * 1000
+
+
+def measure(files: int, workers: int, repeat: int, updates: int) -> Dict[str, float]:
+    """Generate, index and query one synthetic repository; return its metrics in milliseconds."""
+    work_dir = Path(tempfile.mkdtemp())
+    try:
+        project = work_dir / "project"
+        generate_repo(project, files)
+        metrics: Dict[str, float] = {}
+
+        indexer = CodeIndexer(str(project), cache_max_bytes=0)
+        metrics["cold_index_ms"] = timed(indexer.index_all, workers=workers, use_git=False)
+        metrics["noop_rescan_ms"] = timed(indexer.index_all, workers=workers, use_git=False)
+
+        samples = []
+        target = project / "package_0" / "subsystem_0" / "module_0.py"
+        original = target.read_text()
+        for n in range(updates):
+            target.write_text(original + f"\n\ndef edited_{n}():\n    return {n}\n")
+            samples.append(timed(indexer.index_file, target))
+        metrics["update_p50_ms"] = percentile(samples, 0.5)
+        metrics["update_p99_ms"] = percentile(samples, 0.99)
+        indexer.close()
+
+        conn = sqlite3.connect(indexer.db_path)
+        metrics["symbols"] = conn.execute("SELECT SUM(symbol_count) FROM symbol_kinds").fetchone()[0]
+        conn.close()
+
+        searcher = CodeSearcher(str(indexer.db_path), result_cache_size=0)
+        for search_type, queries in QUERIES.items():
+            for query in queries:
+                searcher.search(query, search_type)  # warm connections, statements and name index
+            samples = [timed(searcher.search, queries[n % len(queries)], search_type) for n in range(repeat)]
+            metrics[f"search_{search_type}_p50_ms"] = percentile(samples, 0.5)
+            metrics[f"search_{search_type}_p99_ms"] = percentile(samples, 0.99)
+        searcher.close()
+        return metrics
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def environment() -> Dict[str, str]:
+    """Describe the machine the numbers were taken on."""
+    return {
+        "date": date.today().isoformat(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpus": str(os.cpu_count()),
+    }
+
+
+def compare(results: Dict[str, Dict], baselines: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Return a description of every metric slower than its baseline beyond the tolerance."""
+    regressions = []
+    for size, result in results.items():
+        baseline = baselines.get(size, {}).get("metrics")
+        if baseline is None:
+            print(f"No baseline for {size} files")
+            continue
+        for metric, value in result["metrics"].items():
+            if not metric.endswith("_ms") or metric not in baseline:
+                continue
+            before = baseline[metric]
+            if value > before * (1 + tolerance) and value - before > MIN_REGRESSION_MS:
+                regressions.append(f"{size} files: {metric} {before:.2f} -> {value:.2f} ms ({value / before - 1:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CodeIndexer and CodeSearcher on synthetic repositories")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Repository sizes in files (default: 1000 10000 100000)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="Parser processes for full indexes (default: CPU count)")
+    parser.add_argument("--repeat", type=int, default=200, help="Searches timed per search_type (default: 200)")
+    parser.add_argument("--updates", type=int, default=20, help="Single-file updates timed (default: 20)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH,
+                        help=f"Baseline file (default: {DEFAULT_BASELINE_PATH.name})")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Slowdown allowed by --compare, as a fraction (default: {DEFAULT_TOLERANCE})")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--save", action="store_true", help="Store the results as the new baselines for these sizes")
+    mode.add_argument("--compare", action="store_true", help="Flag metrics that regressed against the baselines")
+    args = parser.parse_args()
+
+    results = {}
+    for files in args.sizes:
+        print(f"Benchmarking {files} files...", flush=True)
+        metrics = measure(files, args.workers, args.repeat, args.updates)
+        results[str(files)] = {"environment": environment(), "metrics": metrics}
+        for metric, value in metrics.items():
+            print(f"  {metric:<24} {value:>12.2f}")
+
+    baselines = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if args.save:
+        baselines.update(results)
+        args.baseline.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"Saved baselines to {args.baseline}")
+    elif args.compare:
+        regressions = compare(results, baselines, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# RULE #0: MANDATORY FIRST ACTION FOR EVERY REQUEST
+# 1. Read CLAUDE.md COMPLETELY before responding
+# 2. Setup Python venv: [ -d "venv" ] || ./setup-venv.sh && source venv/bin/activate
+# 3. Search for rules related to the request
+# 4. Only proceed after confirming no violations
+# Failure to follow Rule #0 has caused real harm. Check BEFORE acting, not AFTER making mistakes.
+#
+# GUARDS ARE SAFETY EQUIPMENT - WHEN THEY FIRE, FIX THE PROBLEM THEY FOUND
+# NEVER weaken, disable, or bypass guards - they prevent real harm
+
+"""Compare the normalized symbol schema with the original flat symbols table.
+
+A synthetic project is indexed with the current schema, then the same
+symbols are copied into a database using the original flat table (full
+file path, file hash and docstring on every row). Both databases are
+vacuumed and compared on size and on the latency of the queries the
+searchers run.
+
+Usage:
+    python3 benchmark_schema.py [--files 2000] [--classes 5] [--repeat 200]
+"""
+
+import argparse
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from code_indexer import CodeIndexer
+
+# The symbols table, its indexes and full-text indexes as originally shipped
+FLAT_SCHEMA = """
+    CREATE TABLE symbols (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        type TEXT NOT NULL,
+        file_path TEXT NOT NULL,
+        line_number INTEGER NOT NULL,
+        column INTEGER NOT NULL,
+        parent TEXT,
+        signature TEXT,
+        docstring TEXT,
+        file_hash TEXT NOT NULL,
+        indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(name, type, file_path, line_number)
+    );
+    CREATE INDEX idx_symbol_name ON symbols(name);
+    CREATE INDEX idx_symbol_type ON symbols(type);
+    CREATE INDEX idx_file_path ON symbols(file_path);
+    CREATE VIRTUAL TABLE symbols_fts USING fts5(
+        name, docstring, signature, parent,
+        content='symbols', content_rowid='id', prefix='2 3'
+    );
+    CREATE VIRTUAL TABLE file_paths_trigram USING fts5(
+        file_path, content='file_hashes', content_rowid='rowid', tokenize='trigram'
+    );
+"""
+
+# Index tables the flat schema did not have, dropped from the normalized copy
+# so both databases hold the same data
+EXTRA_TABLES = (
+    "symbol_references",
+    "imports",
+    "modules",
+    "extraction_cache",
+    "index_meta",
+    "symbol_names_trigram",
+)
+
+# Tables (with their indexes) holding symbol data in each schema
+FLAT_TABLES = ("symbols",)
+NORMALIZED_TABLES = ("symbol_rows", "files", "symbol_kinds", "docstrings")
+
+
+def generate_project(root: Path, files: int, classes: int):
+    """Write a synthetic package tree with documented classes and methods."""
+    for i in range(files):
+        path = root / "src" / f"package_{i % 20}" / f"subsystem_{i % 7}" / f"module_{i}.py"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = [f'"""Module {i} of the synthetic benchmark project."""', ""]
+        for c in range(classes):
+            lines += [
+                f"class Handler{i}_{c}:",
+                f'    """Handle requests of kind {c} for module {i}, validating input before dispatch."""',
+                "",
+                "    def process(self, request, timeout=None):",
+                '        """Process one request and return the response object."""',
+                "        return request",
+                "",
+                "    def validate(self, payload):",
+                "        return payload is not None",
+                "",
+            ]
+        lines += [f"def build_{i}(config):", '    """Create the handlers for this module."""', "    return config", ""]
+        path.write_text("\n".join(lines))
+
+
+def build_flat_copy(db_path: Path, flat_path: Path):
+    """Copy every symbol from a normalized index into a database with the original flat table."""
+    conn = sqlite3.connect(flat_path)
+    conn.executescript(FLAT_SCHEMA)
+    conn.execute("ATTACH DATABASE ? AS normalized", (str(db_path),))
+    conn.execute(
+        """
+        INSERT INTO symbols (id, name, type, file_path, line_number, column, parent, signature, docstring, file_hash)
+        SELECT id, name, type, file_path, line_number, column, parent, signature, docstring, COALESCE(file_hash, '')
+        FROM normalized.symbols
+    """
+    )
+    conn.execute("CREATE TABLE file_hashes AS SELECT * FROM normalized.file_hashes")
+    conn.commit()
+    conn.execute("DETACH DATABASE normalized")
+    conn.execute("INSERT INTO symbols_fts(symbols_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO file_paths_trigram(file_paths_trigram) VALUES ('rebuild')")
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def symbol_bytes(db_path: Path, tables) -> int:
+    """Return the bytes used by some tables and their indexes, or 0 without the dbstat table."""
+    conn = sqlite3.connect(db_path)
+    try:
+        placeholders = ",".join("?" for _ in tables)
+        row = conn.execute(
+            f"""
+            SELECT SUM(d.pgsize) FROM dbstat d
+            JOIN sqlite_master m ON m.name = d.name
+            WHERE m.tbl_name IN ({placeholders})
+        """,
+            tables,
+        ).fetchone()
+        return row[0] or 0
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        conn.close()
+
+
+def time_query(db_path: Path, sql: str, params, repeat: int) -> float:
+    """Return the median latency of a query in milliseconds on a warm connection."""
+    conn = sqlite3.connect(db_path)
+    conn.execute(sql, params).fetchall()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    conn.close()
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the normalized symbol schema against the flat table")
+    parser.add_argument("--files", type=int, default=2000, help="Synthetic modules to index (default: 2000)")
+    parser.add_argument("--classes", type=int, default=5, help="Classes per module (default: 5)")
+    parser.add_argument("--repeat", type=int, default=200, help="Runs per query (default: 200)")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp())
+    try:
+        project = work_dir / "project"
+        generate_project(project, args.files, args.classes)
+
+        indexer = CodeIndexer(str(project), cache_max_bytes=0)
+        indexer.index_all(use_git=False)
+        indexer.close()
+
+        normalized_path = work_dir / "normalized.db"
+        conn = sqlite3.connect(indexer.db_path)
+        conn.execute("VACUUM INTO ?", (str(normalized_path),))
+        conn.close()
+        conn = sqlite3.connect(normalized_path)
+        for table in EXTRA_TABLES:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+        conn.commit()
+        conn.execute("VACUUM")
+        conn.close()
+        flat_path = work_dir / "flat.db"
+        build_flat_copy(normalized_path, flat_path)
+
+        sample_file = str(project / "src" / "package_3" / "subsystem_3" / f"module_{min(3, args.files - 1)}.py")
+        # Queries as the searchers issue them; (label, flat SQL, normalized SQL or None for the same, params)
+        search = (
+            "SELECT name, type, file_path, line_number, column, parent, signature, docstring "
+            "FROM symbols WHERE {} ORDER BY name, file_path LIMIT 50"
+        )
+        queries = [
+            ("exact name", search.format("name LIKE ?"), None, ("process",)),
+            ("name prefix", search.format("name LIKE ?"), None, ("Handler1%",)),
+            ("type filter", search.format("name LIKE ? AND type = ?"), None, ("Handler2%", "class")),
+            (
+                "file symbols",
+                "SELECT name, type, line_number FROM symbols WHERE file_path = ? ORDER BY line_number",
+                None,
+                (sample_file,),
+            ),
+            (
+                "file search",
+                "SELECT file_path, COUNT(*) FROM symbols WHERE file_path IN (SELECT file_path FROM file_hashes "
+                "WHERE rowid IN (SELECT rowid FROM file_paths_trigram WHERE file_path LIKE ?)) "
+                "GROUP BY file_path LIMIT 50",
+                None,
+                ("%module_12%",),
+            ),
+            (
+                "stats by type",
+                "SELECT type, COUNT(*) FROM symbols GROUP BY type",
+                "SELECT k.name, COUNT(*) FROM symbol_rows s JOIN symbol_kinds k ON k.id = s.kind GROUP BY s.kind",
+                (),
+            ),
+        ]
+
+        print(f"\nSchema benchmark: {args.files} files, {args.classes} classes per file\n")
+        rows = [
+            ("database size (KB)", flat_path.stat().st_size / 1024, normalized_path.stat().st_size / 1024),
+            (
+                "symbol tables (KB)",
+                symbol_bytes(flat_path, FLAT_TABLES) / 1024,
+                symbol_bytes(normalized_path, NORMALIZED_TABLES) / 1024,
+            ),
+        ]
+        for label, flat_sql, normalized_sql, params in queries:
+            rows.append(
+                (
+                    f"{label} (ms)",
+                    time_query(flat_path, flat_sql, params, args.repeat),
+                    time_query(normalized_path, normalized_sql or flat_sql, params, args.repeat),
+                )
+            )
+
+        print(f"{'metric':<22} {'flat':>12} {'normalized':>12} {'change':>8}")
+        for label, before, after in rows:
+            change = f"{(after - before) / before * 100:+.0f}%" if before else "n/a"
+            print(f"{label:<22} {before:>12.3f} {after:>12.3f} {change:>8}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ Provides structured output that's easy to parse.
 import json
 import os
 import sys
-from typing import Any, Dict
+from typing import Any, Dict, List, Union
 
 # Add src directory to path for imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -25,11 +25,11 @@ class ClaudeCodeSearcher:
         """Initialize the Claude Code searcher."""
         self.searcher = CodeSearcher()
 
-    def search(self, query: str, search_type: str = "name", **kwargs) -> Dict[str, Any]:
+    def search(self, query: Union[str, List[str]], search_type: str = "name", **kwargs) -> Dict[str, Any]:
         """Unified search interface that returns structured JSON.
 
         Args:
-            query: Search query
+            query: Search query, or a list of file paths for "file_symbols"
             search_type: One of "name", "file", "type", "file_symbols"
             **kwargs: Additional parameters like limit, symbol_type, etc.
         """
@@ -43,7 +43,9 @@ class ClaudeCodeSearcher:
             elif search_type == "type":
                 results = self.searcher.search_by_type(query, limit=kwargs.get("limit", 50))
             elif search_type == "file_symbols":
-                results = self.searcher.get_file_symbols(query)
+                results = self.searcher.search_in_files(
+                    query, name_pattern=kwargs.get("name_pattern"), limit=kwargs.get("limit")
+                )
             else:
                 return {"success": False, "error": f"Unknown search type: {search_type}", "results": []}
 
@@ -75,7 +77,7 @@ def main():
                         "search": "Search by symbol name",
                         "search_file": "Search in specific files",
                         "list_type": "List all symbols of a type",
-                        "file_symbols": "Get all symbols in a file",
+                        "file_symbols": "Get all symbols in one or more files, in source order",
                     },
                 },
                 indent=2,
@@ -101,8 +103,8 @@ def main():
         result = searcher.search(symbol_type, "type")
 
     elif command == "file_symbols" and len(sys.argv) >= 3:
-        file_path = sys.argv[2]
-        result = searcher.search(file_path, "file_symbols")
+        file_paths = sys.argv[2:]
+        result = searcher.search(file_paths, "file_symbols")
 
     else:
         result = {"success": False, "error": f"Unknown command or missing arguments: {command}"}
@@ -14,18 +14,124 @@
 Falls back to regex patterns if tree-sitter has issues.
 """
 
+import argparse
 import ast
 import hashlib
+import json
 import logging
+import os
 import re
 import sqlite3
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from git_changes import GitChanges, collect_changes, find_repo_root, relative_paths
+from symbol_store import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CACHE_MAX_BYTES,
+    FileState,
+    SymbolStore,
+    create_schema,
+    read_cached_extraction,
+)
+
+# Shared modules used by both the indexer and the MCP servers live in src/
+src_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from directory_walker import DEFAULT_EXCLUDED_DIRS, walk_files
+from indexer_metrics import REGISTRY, SIZE_BUCKETS
+from semantic_index import DEFAULT_MODEL_PATH, EmbeddingStore, EmbeddingUpdater
+
+try:
+    import xxhash
+
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
 
 logger = logging.getLogger(__name__)
 
+# Content hash functions selectable with CodeIndexer(hash_algorithm=...)
+HASH_ALGORITHMS = {
+    "md5": lambda data: hashlib.md5(data).hexdigest(),
+    "blake2b": lambda data: hashlib.blake2b(data, digest_size=16).hexdigest(),
+}
+if HAS_XXHASH:
+    HASH_ALGORITHMS["xxh3"] = lambda data: xxhash.xxh3_128_hexdigest(data)
+
+# Directories never worth descending into when collecting source files
+EXCLUDED_DIRS = DEFAULT_EXCLUDED_DIRS
+
+# index_meta keys recording the git state the index was last brought up to date with
+INDEXED_COMMIT_KEY = "indexed_commit"
+DIRTY_PATHS_KEY = "dirty_paths"
+
+# Names loaded in nearly every method; recording them would only bloat the reference index
+IGNORED_REFERENCE_NAMES = {"self", "cls"}
+
+# Bump whenever extract_python changes what it records, so results cached
+# by an older extractor are not reused
+EXTRACTOR_VERSION = 1
+
+WRITE_BATCH_FILES = REGISTRY.histogram(
+    "code_index_write_batch_files", "Files written per index database transaction", buckets=SIZE_BUCKETS
+)
+EMBEDDING_SECONDS = REGISTRY.histogram(
+    "code_index_embedding_seconds", "Time spent embedding the symbols of changed files, per embeddings update"
+)
+
+# Indexer instance and read-only cache connection shared by the functions
+# below inside each pool worker
+_worker_indexer = None
+_worker_cache = None
+
+
+def _init_extract_worker(indexer: "CodeIndexer"):
+    """Store the indexer in a pool worker so tasks only ship file paths."""
+    global _worker_indexer, _worker_cache
+    _worker_indexer = indexer
+    if indexer.cache_max_bytes > 0:
+        _worker_cache = sqlite3.connect(f"{indexer.db_path.as_uri()}?mode=ro", uri=True)
+
+
+def _extract_in_worker(task: Tuple[Path, Optional[str], os.stat_result]):
+    """Hash and parse one file inside a pool worker.
+
+    Returns (file_path, hash, parsed, stat, payload) where parsed is a
+    ParsedFile. It is None when the hash matches the stored one, so unchanged
+    files are never parsed or sent back to the writer; the hash is None when
+    the file is unreadable. Content found in the extraction cache is decoded
+    instead of parsed and comes back without a payload; freshly parsed files
+    come back with the encoded payload for the writer to cache.
+    """
+    file_path, known_hash, stat = task
+    try:
+        with open(file_path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        logger.warning("Could not read %s: %s", file_path, e)
+        return file_path, None, None, stat, None
+
+    file_hash = _worker_indexer.hash_bytes(data)
+    if file_hash == known_hash:
+        return file_path, file_hash, None, stat, None
+
+    if _worker_cache is not None:
+        payload = read_cached_extraction(_worker_cache, file_hash, EXTRACTOR_VERSION)
+        if payload is not None:
+            return file_path, file_hash, _worker_indexer.decode_extraction(payload, file_path), stat, None
+
+    parsed = _worker_indexer.extract_python(file_path, source=data)
+    payload = _worker_indexer.encode_extraction(parsed, file_path) if _worker_cache is not None else None
+    return file_path, file_hash, parsed, stat, payload
+
 
 @dataclass
 class Symbol:
@@ -41,22 +147,105 @@ class Symbol:
     docstring: Optional[str] = None
 
 
+@dataclass
+class Reference:
+    """Represents a use of a name: a call, attribute access, name load or import."""
+
+    name: str
+    kind: str  # call, attribute, name, import
+    file_path: str
+    line_number: int
+    column: int
+    scope: Optional[str] = None  # Dotted name of the enclosing class/function
+
+
+@dataclass
+class Import:
+    """Represents one imported module or name, with relative imports made absolute."""
+
+    imported_module: str
+    symbol: Optional[str]  # Name imported with 'from ... import', or None
+    line_number: int
+    level: int = 0  # Leading dots of a relative import
+
+    @property
+    def target(self) -> str:
+        """Most specific dotted name the import can refer to."""
+        if self.symbol is None or self.symbol == "*":
+            return self.imported_module
+        return f"{self.imported_module}.{self.symbol}" if self.imported_module else self.symbol
+
+
+class ParsedFile(NamedTuple):
+    """Everything one AST pass extracts from a Python file."""
+
+    symbols: List[Symbol]
+    references: List[Reference]
+    imports: List[Import]
+
+
+def relative_import_base(package: List[str], level: int) -> List[str]:
+    """Return the package a relative import with the given number of dots starts from.
+
+    'from . import x' is relative to the file's package, each extra dot goes up one.
+    """
+    return package[: max(0, len(package) - level + 1)]
+
+
 class CodeIndexer:
     """Main code indexing class that parses Python files and stores symbols."""
 
-    def __init__(self, project_root: str = None):
+    def __init__(
+        self,
+        project_root: str = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        hash_algorithm: str = "md5",
+        walk_threads: int = 1,
+        cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        embeddings: bool = False,
+        embedding_model: str = DEFAULT_MODEL_PATH,
+        embedding_encoder=None,
+    ):
         """Initialize the code indexer.
 
         Args:
             project_root: Root directory of the project to index. Defaults to parent of indexing/.
+            batch_size: Number of files written per transaction during bulk indexing.
+            hash_algorithm: Content hash used for change detection - 'md5', 'blake2b',
+                or 'xxh3' when the xxhash package is installed. Switching algorithms
+                re-indexes every file once.
+            walk_threads: Threads used to walk top-level directories concurrently,
+                which helps on network filesystems and cold caches.
+            cache_max_bytes: Size bound of the content-addressed extraction
+                cache; 0 disables it.
+            embeddings: Embed every symbol for semantic search into
+                .code_index.embeddings.db, updated after each commit. Needs
+                numpy and sentence-transformers.
+            embedding_model: sentence-transformers model used for the embeddings.
+            embedding_encoder: Function embedding a list of texts, replacing
+                the model (mainly for tests).
         """
+        if hash_algorithm not in HASH_ALGORITHMS:
+            raise ValueError(
+                f"Unknown hash algorithm '{hash_algorithm}'. Available: {', '.join(sorted(HASH_ALGORITHMS))}"
+            )
+        self.hash_algorithm = hash_algorithm
+
         if project_root is None:
             # Default to parent directory of indexing/
             self.project_root = Path(__file__).parent.parent.resolve()
         else:
             self.project_root = Path(project_root).resolve()
         self.db_path = self.project_root / ".code_index.db"
+        self.batch_size = batch_size
+        self.walk_threads = walk_threads
+        self.cache_max_bytes = cache_max_bytes
+        self._store = None
         self.init_database()
+        self.embeddings = (
+            EmbeddingStore(self.db_path, encoder=embedding_encoder, model_path=embedding_model) if embeddings else None
+        )
+        self._embedding_updater = None
 
         # Index the entire repository root
         self.index_dirs = ["."]
@@ -67,137 +256,398 @@ class CodeIndexer:
     def init_database(self):
         """Initialize SQLite database for symbol storage."""
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        create_schema(conn)
+        conn.close()
 
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS symbols (
-                id INTEGER PRIMARY KEY,
-                name TEXT NOT NULL,
-                type TEXT NOT NULL,
-                file_path TEXT NOT NULL,
-                line_number INTEGER NOT NULL,
-                column INTEGER NOT NULL,
-                parent TEXT,
-                signature TEXT,
-                docstring TEXT,
-                file_hash TEXT NOT NULL,
-                indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(name, type, file_path, line_number)
-            )
-        """
-        )
+    @property
+    def store(self) -> SymbolStore:
+        """Long-lived batched writer shared by every indexing path."""
+        if self._store is None:
+            self._store = SymbolStore(self.db_path, batch_size=self.batch_size, on_commit=WRITE_BATCH_FILES.observe)
+        return self._store
+
+    def commit(self):
+        """Commit writes that are still pending in the current batch."""
+        if self._store is not None:
+            self._store.commit()
+        if self._embedding_updater is not None:
+            self._embedding_updater.request()
+        else:
+            self.update_embeddings()
 
-        cursor.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_symbol_name ON symbols(name)
-        """
-        )
+    def start_embedding_updates(self):
+        """Embed after commits on a background thread instead of in the committing thread.
 
-        cursor.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_symbol_type ON symbols(type)
+        The watcher calls this so its IndexWorker never waits for the
+        embedding model between batches of file events.
         """
-        )
+        if self.embeddings is not None and self._embedding_updater is None:
+            self._embedding_updater = EmbeddingUpdater(self.update_embeddings)
+            self._embedding_updater.start()
+            self._embedding_updater.request()
+
+    def update_embeddings(self) -> Optional[Dict]:
+        """Embed symbols of files changed since the last update, when embeddings are enabled."""
+        if self.embeddings is None:
+            return None
+        start = time.perf_counter()
+        summary = self.embeddings.sync()
+        if summary["symbols_embedded"]:
+            EMBEDDING_SECONDS.observe(time.perf_counter() - start)
+        return summary
+
+    def close(self):
+        """Commit pending writes and release the writer connection."""
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+        if self._embedding_updater is not None:
+            self._embedding_updater.stop()
+            self._embedding_updater.join()
+            self._embedding_updater = None
+        if self.embeddings is not None:
+            self.embeddings.close()
+            self.embeddings = None
+
+    def __getstate__(self):
+        # Pool workers receive a copy of the indexer; the writer connections stay here
+        state = self.__dict__.copy()
+        state["_store"] = None
+        state["embeddings"] = None
+        state["_embedding_updater"] = None
+        return state
 
-        cursor.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_file_path ON symbols(file_path)
-        """
-        )
+    def get_file_hash(self, file_path: Path) -> str:
+        """Get hash of file contents."""
+        with open(file_path, "rb") as f:
+            return self.hash_bytes(f.read())
 
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS file_hashes (
-                file_path TEXT PRIMARY KEY,
-                hash TEXT NOT NULL,
-                last_modified TIMESTAMP
-            )
+    def hash_bytes(self, data: bytes) -> str:
+        """Hash already-read file contents."""
+        return HASH_ALGORITHMS[self.hash_algorithm](data)
+
+    def should_reindex_file(
+        self, file_path: Path, stat: Optional[os.stat_result] = None, state: Optional[FileState] = None
+    ) -> bool:
+        """Check if file needs reindexing.
+
+        The stored (mtime, size, inode) signature is compared first; the
+        content hash is only computed when the stat differs. A file that was
+        touched without changing gets its new stat recorded so the next scan
+        skips it without hashing.
+
+        Args:
+            file_path: File to check.
+            stat: Current stat of the file, if the caller already has it.
+            state: Stored FileState, if the caller loaded states in bulk.
         """
-        )
+        if state is None:
+            state = self.store.get_file_state(file_path)
+        if state is None:
+            return True
 
-        conn.commit()
-        conn.close()
+        if stat is None:
+            stat = os.stat(file_path)
+        if state.matches(stat):
+            return False
 
-    def get_file_hash(self, file_path: Path) -> str:
-        """Get hash of file contents."""
+        if self.get_file_hash(file_path) != state.hash:
+            return True
+
+        self.store.update_file_stat(file_path, stat)
+        return False
+
+    def find_changed_files(
+        self, directory: str, walked: Optional[List[Path]] = None
+    ) -> Iterator[Tuple[Path, os.stat_result]]:
+        """Yield files under a directory that need re-indexing, with their stat.
+
+        Stored file states are loaded in one query, so a scan where nothing
+        changed costs a directory walk plus one stat per file.
+
+        Args:
+            directory: Directory to scan, relative to the project root.
+            walked: Optional list that receives every source file seen, for a
+                reconcile() after the scan without walking the tree again.
+        """
+        states = self.store.get_all_file_states()
+        for entry in self.iter_source_entries(directory):
+            file_path = Path(entry.path)
+            if walked is not None:
+                walked.append(file_path)
+            try:
+                stat = entry.stat()
+                state = states.get(str(file_path))
+                if state is None or self.should_reindex_file(file_path, stat=stat, state=state):
+                    yield file_path, stat
+            except OSError as e:
+                logger.warning("Could not check %s: %s", file_path, e)
+
+    def read_and_extract(self, file_path: Path) -> Tuple[str, ParsedFile]:
+        """Read a file once and return its content hash and parse result.
+
+        Content that was parsed before, under this or any other path, is
+        rebuilt from the extraction cache without parsing it again.
+        """
         with open(file_path, "rb") as f:
-            return hashlib.md5(f.read()).hexdigest()
+            data = f.read()
+        file_hash = self.hash_bytes(data)
+        if self.cache_max_bytes <= 0:
+            return file_hash, self.extract_python(file_path, source=data)
+
+        payload = self.store.get_cached_extraction(file_hash, EXTRACTOR_VERSION)
+        if payload is not None:
+            return file_hash, self.decode_extraction(payload, file_path)
+
+        parsed = self.extract_python(file_path, source=data)
+        self.store.put_cached_extraction(file_hash, EXTRACTOR_VERSION, self.encode_extraction(parsed, file_path))
+        return file_hash, parsed
+
+    def package_parts(self, file_path: Path) -> List[str]:
+        """Return the dotted package of a file as a list, the base for its relative imports."""
+        package = self.module_name(file_path).split(".")
+        if Path(file_path).stem != "__init__":
+            package = package[:-1]
+        return package
+
+    def encode_extraction(self, parsed: ParsedFile, file_path: Path) -> bytes:
+        """Serialize a parse result without anything that depends on the file's path.
+
+        File paths are dropped and relative imports are stored as written, so
+        the payload can be decoded for any file with the same content.
+        """
+        package = self.package_parts(file_path)
+        imports = []
+        for imp in parsed.imports:
+            module = imp.imported_module
+            if imp.level:
+                parts = module.split(".") if module else []
+                module = ".".join(parts[len(relative_import_base(package, imp.level)) :])
+            imports.append([module, imp.symbol, imp.line_number, imp.level])
+
+        data = {
+            "symbols": [
+                [s.name, s.type, s.line_number, s.column, s.parent, s.signature, s.docstring] for s in parsed.symbols
+            ],
+            "references": [[r.name, r.kind, r.line_number, r.column, r.scope] for r in parsed.references],
+            "imports": imports,
+        }
+        return zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+    def decode_extraction(self, payload: bytes, file_path: Path) -> ParsedFile:
+        """Rebuild a parse result from encode_extraction output for a given file."""
+        data = json.loads(zlib.decompress(payload))
+        path = str(file_path)
+        package = self.package_parts(file_path)
+
+        imports = []
+        for module, symbol, line_number, level in data["imports"]:
+            if level:
+                module = ".".join(relative_import_base(package, level) + ([module] if module else []))
+            imports.append(Import(imported_module=module, symbol=symbol, line_number=line_number, level=level))
+
+        return ParsedFile(
+            symbols=[
+                Symbol(name, type_, path, line_number, column, parent, signature, docstring)
+                for name, type_, line_number, column, parent, signature, docstring in data["symbols"]
+            ],
+            references=[
+                Reference(name, kind, path, line_number, column, scope)
+                for name, kind, line_number, column, scope in data["references"]
+            ],
+            imports=imports,
+        )
 
-    def should_reindex_file(self, file_path: Path) -> bool:
-        """Check if file needs reindexing based on hash."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def module_name(self, file_path: Path) -> str:
+        """Return the dotted module name of a file relative to the project root."""
+        path = Path(file_path)
+        try:
+            parts = list(path.relative_to(self.project_root).with_suffix("").parts)
+        except ValueError:
+            return path.stem
+        if len(parts) > 1 and parts[-1] == "__init__":
+            parts.pop()
+        return ".".join(parts)
 
-        cursor.execute("SELECT hash FROM file_hashes WHERE file_path = ?", (str(file_path),))
-        result = cursor.fetchone()
-        conn.close()
+    def extract_symbols_from_python(self, file_path: Path, source: Optional[bytes] = None) -> List[Symbol]:
+        """Extract symbols from Python file using AST.
 
-        if not result:
-            return True
+        Args:
+            file_path: File to parse.
+            source: Raw file contents if the caller already read them.
+        """
+        return self.extract_python(file_path, source=source).symbols
+
+    def extract_python(self, file_path: Path, source: Optional[bytes] = None) -> ParsedFile:
+        """Extract symbols, references and imports from a Python file in one AST pass.
 
-        current_hash = self.get_file_hash(file_path)
-        return current_hash != result[0]
+        Symbols are module-level functions and classes and the methods and
+        classes nested in them. References are call sites, attribute
+        accesses, name loads and imported names anywhere in the file, each
+        tagged with the dotted name of the enclosing class or function.
+        Imports are resolved to absolute module names, relative imports
+        against this file's package.
 
-    def extract_symbols_from_python(self, file_path: Path) -> List[Symbol]:
-        """Extract symbols from Python file using AST."""
+        Args:
+            file_path: File to parse.
+            source: Raw file contents if the caller already read them.
+        """
         symbols = []
+        references = []
+        imports = []
+        package = self.package_parts(file_path)
 
         try:
-            with open(file_path, encoding="utf-8") as f:
-                content = f.read()
+            if source is None:
+                with open(file_path, encoding="utf-8") as f:
+                    content = f.read()
+            else:
+                content = source.decode("utf-8")
 
             tree = ast.parse(content, filename=str(file_path))
 
             class SymbolVisitor(ast.NodeVisitor):
                 def __init__(self):
                     self.symbols = []
+                    self.references = []
+                    self.imports = []
                     self.current_class = None
+                    self.scope = []
+                    self.function_depth = 0
+
+                def add_reference(self, name, kind, line_number, column):
+                    if name in IGNORED_REFERENCE_NAMES:
+                        return
+                    self.references.append(
+                        Reference(
+                            name=name,
+                            kind=kind,
+                            file_path=str(file_path),
+                            line_number=line_number,
+                            column=column,
+                            scope=".".join(self.scope) or None,
+                        )
+                    )
+
+                def add_attribute_reference(self, node, kind):
+                    # Point at the attribute name itself, not the start of the chain
+                    self.add_reference(node.attr, kind, node.end_lineno, node.end_col_offset - len(node.attr))
+
+                def visit_scope_body(self, node):
+                    self.scope.append(node.name)
+                    for statement in node.body:
+                        self.visit(statement)
+                    self.scope.pop()
 
                 def visit_ClassDef(self, node):
-                    symbol = Symbol(
-                        name=node.name,
-                        type="class",
-                        file_path=str(file_path),
-                        line_number=node.lineno,
-                        column=node.col_offset,
-                        parent=self.current_class,  # Set parent for nested classes
-                        docstring=ast.get_docstring(node),
-                    )
-                    self.symbols.append(symbol)
+                    # Symbols are only recorded outside function bodies
+                    if self.function_depth == 0:
+                        symbol = Symbol(
+                            name=node.name,
+                            type="class",
+                            file_path=str(file_path),
+                            line_number=node.lineno,
+                            column=node.col_offset,
+                            parent=self.current_class,  # Set parent for nested classes
+                            docstring=ast.get_docstring(node),
+                        )
+                        self.symbols.append(symbol)
+
+                    # Decorators and bases are evaluated in the enclosing scope
+                    for child in node.decorator_list + node.bases + node.keywords:
+                        self.visit(child)
 
                     # Visit nested classes and methods
                     old_class = self.current_class
                     self.current_class = node.name
-                    self.generic_visit(node)
+                    self.visit_scope_body(node)
                     self.current_class = old_class
 
                 def visit_FunctionDef(self, node):
-                    # Get function signature
-                    args = []
-                    for arg in node.args.args:
-                        args.append(arg.arg)
-                    signature = f"({', '.join(args)})"
-
-                    symbol = Symbol(
-                        name=node.name,
-                        type="method" if self.current_class else "function",
-                        file_path=str(file_path),
-                        line_number=node.lineno,
-                        column=node.col_offset,
-                        parent=self.current_class,
-                        signature=signature,
-                        docstring=ast.get_docstring(node),
-                    )
-                    self.symbols.append(symbol)
+                    if self.function_depth == 0:
+                        # Get function signature
+                        args = []
+                        for arg in node.args.args:
+                            args.append(arg.arg)
+                        signature = f"({', '.join(args)})"
+
+                        symbol = Symbol(
+                            name=node.name,
+                            type="method" if self.current_class else "function",
+                            file_path=str(file_path),
+                            line_number=node.lineno,
+                            column=node.col_offset,
+                            parent=self.current_class,
+                            signature=signature,
+                            docstring=ast.get_docstring(node),
+                        )
+                        self.symbols.append(symbol)
+
+                    for child in node.decorator_list:
+                        self.visit(child)
+                    self.visit(node.args)
+                    if node.returns:
+                        self.visit(node.returns)
+
+                    self.function_depth += 1
+                    self.visit_scope_body(node)
+                    self.function_depth -= 1
 
                 def visit_AsyncFunctionDef(self, node):
                     # Treat async functions same as regular functions
                     self.visit_FunctionDef(node)
 
+                def visit_Call(self, node):
+                    func = node.func
+                    if isinstance(func, ast.Name):
+                        self.add_reference(func.id, "call", func.lineno, func.col_offset)
+                    elif isinstance(func, ast.Attribute):
+                        self.add_attribute_reference(func, "call")
+                        self.visit(func.value)
+                    else:
+                        self.visit(func)
+                    for child in node.args + node.keywords:
+                        self.visit(child)
+
+                def visit_Attribute(self, node):
+                    self.add_attribute_reference(node, "attribute")
+                    self.visit(node.value)
+
+                def visit_Name(self, node):
+                    if isinstance(node.ctx, ast.Load):
+                        self.add_reference(node.id, "name", node.lineno, node.col_offset)
+
+                def visit_Import(self, node):
+                    for alias in node.names:
+                        self.add_reference(alias.name, "import", node.lineno, node.col_offset)
+                        self.imports.append(Import(imported_module=alias.name, symbol=None, line_number=node.lineno))
+
+                def visit_ImportFrom(self, node):
+                    if node.module:
+                        self.add_reference(node.module, "import", node.lineno, node.col_offset)
+
+                    module_parts = [node.module] if node.module else []
+                    if node.level:
+                        module_parts = relative_import_base(package, node.level) + module_parts
+                    imported_module = ".".join(module_parts)
+
+                    for alias in node.names:
+                        if alias.name != "*":
+                            self.add_reference(alias.name, "import", node.lineno, node.col_offset)
+                        self.imports.append(
+                            Import(
+                                imported_module=imported_module,
+                                symbol=alias.name,
+                                line_number=node.lineno,
+                                level=node.level or 0,
+                            )
+                        )
+
             visitor = SymbolVisitor()
             visitor.visit(tree)
             symbols = visitor.symbols
+            references = visitor.references
+            imports = visitor.imports
 
         except SyntaxError as e:
             logger.warning("Syntax error in %s: %s", file_path, e)
@@ -206,7 +656,7 @@ class CodeIndexer:
         except Exception as e:
             logger.error("Error parsing %s: %s", file_path, e)
 
-        return symbols
+        return ParsedFile(symbols, references, imports)
 
     def extract_symbols_with_regex(self, file_path: Path) -> List[Symbol]:
         """Fallback regex-based symbol extraction."""
@@ -255,104 +705,442 @@ class CodeIndexer:
 
         return symbols
 
-    def index_file(self, file_path: Path):
-        """Index a single file."""
+    def index_file(self, file_path: Path, commit: bool = True, stat: Optional[os.stat_result] = None):
+        """Index a single file.
+
+        Args:
+            file_path: File to index.
+            commit: Commit immediately. Bulk callers pass False and let the
+                store commit once per batch, then call commit() at the end.
+            stat: Stat taken before reading the file, if the caller has one.
+        """
         if file_path.suffix not in self.extensions:
             return
 
         logger.debug(f"Indexing {file_path}...")
 
-        symbols = self.extract_symbols_from_python(file_path)
+        if stat is None:
+            stat = os.stat(file_path)
+        file_hash, parsed = self.read_and_extract(file_path)
+        self.write_parsed(file_path, parsed, file_hash, stat)
+
+        if commit:
+            self.commit()
+
+    def write_parsed(self, file_path: Path, parsed: ParsedFile, file_hash: str, stat: Optional[os.stat_result]):
+        """Hand one file's parse result to the store."""
+        self.store.write_file(
+            file_path,
+            parsed.symbols,
+            file_hash,
+            stat=stat,
+            references=parsed.references,
+            imports=parsed.imports,
+            module=self.module_name(file_path),
+        )
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def move_file(self, old_path: Path, new_path: Path) -> bool:
+        """Re-point a stored file to the path it was moved to, without parsing it.
 
-        # Remove old symbols for this file
-        cursor.execute("DELETE FROM symbols WHERE file_path = ?", (str(file_path),))
-
-        # Insert new symbols
-        for symbol in symbols:
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO symbols
-                (name, type, file_path, line_number, column, parent, signature, docstring, file_hash)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    symbol.name,
-                    symbol.type,
-                    symbol.file_path,
-                    symbol.line_number,
-                    symbol.column,
-                    symbol.parent,
-                    symbol.signature,
-                    symbol.docstring,
-                    self.get_file_hash(file_path),
-                ),
-            )
+        When the move changes the file's package, the targets of its
+        relative imports are rebased onto the new package from the stored
+        rows.
 
-        # Update file hash
-        cursor.execute(
-            """
-            INSERT OR REPLACE INTO file_hashes (file_path, hash, last_modified)
-            VALUES (?, ?, ?)
-        """,
-            (str(file_path), self.get_file_hash(file_path), datetime.now()),
-        )
+        Returns:
+            False if the file was not indexed, or its imports were stored
+            before relative imports were recorded and it must be parsed.
+        """
+        old_package, new_package = self.package_parts(old_path), self.package_parts(new_path)
+        imports = None
+        if old_package != new_package:
+            rows = self.store.get_imports(old_path)
+            if any(level is None for *_, level in rows):
+                return False
+            imports = []
+            for module, symbol, line_number, level in rows:
+                if level:
+                    parts = module.split(".") if module else []
+                    rest = parts[len(relative_import_base(old_package, level)) :]
+                    module = ".".join(relative_import_base(new_package, level) + rest)
+                imports.append(Import(imported_module=module, symbol=symbol, line_number=line_number, level=level))
+        return self.store.move_file(old_path, new_path, module=self.module_name(new_path), imports=imports)
+
+    def move_path(self, src: Path, dest: Path, commit: bool = True) -> Dict[str, int]:
+        """Follow a file or directory move in the index.
+
+        Stored files under src are re-pointed to dest by path rewrites. A
+        file is only parsed when its content differs from what was stored,
+        e.g. when an editor saves by renaming a temporary file over it, or
+        when it was never indexed.
 
-        conn.commit()
-        conn.close()
+        Args:
+            src: Path the file or directory was moved from.
+            dest: Path it was moved to.
+            commit: Commit immediately, as for index_file().
 
-    def index_directory(self, directory: str):
-        """Index all Python files in a directory."""
+        Returns:
+            Dictionary with the number of files moved, indexed and removed.
+        """
+        src, dest = Path(src), Path(dest)
+        moved = removed = 0
+        for old in self.store.stored_paths_under(src):
+            new = dest / Path(old).relative_to(src)
+            if self.is_source_file(new) and self.move_file(Path(old), new):
+                moved += 1
+            else:
+                self.store.delete_file(old)
+                removed += 1
+
+        counts = self.index_path(dest)
+        counts["files_moved"] = moved
+        counts["files_removed"] += removed
+        if commit:
+            self.commit()
+        return counts
+
+    def index_path(self, path: Path) -> Dict[str, int]:
+        """Index the source files at a file or directory path whose content differs from what is stored.
+
+        Does not commit; callers batch it with their other writes.
+
+        Returns:
+            Dictionary with the number of files indexed and removed.
+        """
+        path = Path(path)
+        indexed = removed = 0
+        candidates = (Path(entry.path) for entry in self.iter_source_entries(str(path))) if path.is_dir() else [path]
+        for file_path in candidates:
+            if not self.is_source_file(file_path):
+                continue
+            try:
+                stat = os.stat(file_path)
+                if self.should_reindex_file(file_path, stat=stat):
+                    self.index_file(file_path, commit=False, stat=stat)
+                    indexed += 1
+            except FileNotFoundError:
+                # Moved again or deleted since; that event follows
+                if self.store.get_file_state(file_path) is not None:
+                    self.store.delete_file(file_path)
+                    removed += 1
+        return {"files_indexed": indexed, "files_removed": removed}
+
+    def iter_source_entries(self, directory: str, threads: Optional[int] = None) -> Iterator[os.DirEntry]:
+        """Yield directory entries of indexable files, pruning excluded and gitignored trees.
+
+        Args:
+            directory: Directory to walk, relative to the project root.
+            threads: Walker threads, overriding walk_threads.
+        """
         dir_path = self.project_root / directory
         if not dir_path.exists():
             logger.warning(f"Directory {directory} not found")
             return
 
+        yield from walk_files(
+            dir_path, extensions=self.extensions, excluded_dirs=EXCLUDED_DIRS, threads=threads or self.walk_threads
+        )
+
+    def iter_source_files(self, directory: str) -> Iterator[Path]:
+        """Yield indexable Python files under a directory, skipping excluded trees."""
+        for entry in self.iter_source_entries(directory):
+            yield Path(entry.path)
+
+    def is_source_file(self, file_path: Path) -> bool:
+        """Check whether a path has an indexed extension and is outside excluded trees."""
+        if file_path.suffix not in self.extensions:
+            return False
+        try:
+            parts = file_path.relative_to(self.project_root).parts
+        except ValueError:
+            parts = file_path.parts
+        return not any(part in EXCLUDED_DIRS for part in parts)
+
+    def reconcile(self, paths: Optional[List[Path]] = None) -> Dict:
+        """Remove files that no longer exist on disk from the index.
+
+        Args:
+            paths: Source files found by a walk that just finished. When
+                omitted, the configured directories are walked here.
+
+        Returns:
+            Dictionary with the number of files and of rows removed.
+        """
+        if not self.project_root.is_dir():
+            # An unmounted or missing tree must not be mistaken for an empty one
+            logger.warning(f"Project root {self.project_root} not found, skipping reconciliation")
+            return {"files_removed": 0, "rows_removed": 0}
+
+        if paths is None:
+            paths = [path for directory in self.index_dirs for path in self.iter_source_files(directory)]
+
+        result = self.store.remove_missing_files(paths, scope=self.project_root)
+        if result["files_removed"]:
+            print(f"Removed {result['files_removed']} deleted files ({result['rows_removed']} rows) from the index")
+        return result
+
+    def index_directory(self, directory: str, walked: Optional[List[Path]] = None):
+        """Index all Python files in a directory.
+
+        Args:
+            directory: Directory to index, relative to the project root.
+            walked: Optional list that receives every source file seen.
+        """
         count = 0
-        for file_path in dir_path.rglob("*.py"):
-            # Use shared logic to check for excluded directories
-            if any(excluded in str(file_path) for excluded in ['__pycache__', 'venv', '.venv', '.git', 'node_modules']):
-                continue
-            if self.should_reindex_file(file_path):
-                self.index_file(file_path)
-                count += 1
+        for file_path, stat in self.find_changed_files(directory, walked=walked):
+            self.index_file(file_path, commit=False, stat=stat)
+            count += 1
+        self.store.commit()
 
         print(f"Indexed {count} files in {directory}")
+        return count
+
+    def index_parallel(self, workers: Optional[int] = None) -> Dict:
+        """Index all configured directories using a pool of parser processes.
+
+        Worker processes hash and parse files; this process is the single
+        writer and inserts their symbols through the store in batched
+        transactions of ``batch_size`` files. Files that disappeared since the
+        last index are removed at the end.
+
+        Args:
+            workers: Number of parser processes. Defaults to the CPU count.
+
+        Returns:
+            Dictionary with scanned/indexed/removed file counts, elapsed seconds and files/sec.
+        """
+        workers = workers or os.cpu_count() or 1
+        start = time.monotonic()
+
+        entries = [entry for directory in self.index_dirs for entry in self.iter_source_entries(directory)]
+        files = [Path(entry.path) for entry in entries]
+
+        # Stat-identical files are skipped here; the rest are hashed by the workers
+        states = self.store.get_all_file_states()
+        tasks = []
+        for entry, path in zip(entries, files):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            state = states.get(str(path))
+            if state is None or not state.matches(stat):
+                tasks.append((path, state.hash if state else None, stat))
+        chunksize = max(1, min(64, len(tasks) // (workers * 4) or 1))
+
+        indexed = 0
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_extract_worker, initargs=(self,)
+        ) as executor:
+            for file_path, file_hash, parsed, stat, payload in executor.map(
+                _extract_in_worker, tasks, chunksize=chunksize
+            ):
+                if file_hash is None:
+                    continue
+                if parsed is None:
+                    # Touched but unchanged: remember the new stat so the next scan skips it
+                    self.store.update_file_stat(file_path, stat)
+                    continue
+
+                if payload is not None:
+                    self.store.put_cached_extraction(file_hash, EXTRACTOR_VERSION, payload)
+                elif self.cache_max_bytes > 0:
+                    self.store.touch_cached_extraction(file_hash, EXTRACTOR_VERSION)
+                self.write_parsed(file_path, parsed, file_hash, stat)
+                indexed += 1
+
+        self.store.commit()
+        removed = self.reconcile(files)
+
+        elapsed = time.monotonic() - start
+        rate = len(files) / elapsed if elapsed > 0 else 0.0
+        print(
+            f"Indexed {indexed} of {len(files)} files in {elapsed:.2f}s "
+            f"({rate:.0f} files/sec, {workers} workers)"
+        )
+
+        return {
+            "files_scanned": len(files),
+            "files_indexed": indexed,
+            "files_removed": removed["files_removed"],
+            "elapsed": elapsed,
+            "files_per_sec": rate,
+        }
+
+    def index_incremental(self) -> Optional[Dict]:
+        """Bring the index up to date using git instead of walking the tree.
+
+        Only files that git reports as changed, added, deleted or untracked
+        since the last indexed commit are checked, plus files that were dirty
+        at the last run (an uncommitted edit that was since reverted does not
+        show up in the diff). A branch switch therefore costs time
+        proportional to the diff rather than to the size of the tree.
+
+        Returns:
+            Dictionary with checked/indexed/removed file counts, or None when
+            the project is not in a git work tree, has never been indexed at
+            a commit, or the last indexed commit is gone. Callers then fall
+            back to a full index.
+        """
+        repo_root = find_repo_root(self.project_root)
+        last_commit = self.store.get_meta(INDEXED_COMMIT_KEY)
+        if repo_root is None or last_commit is None:
+            return None
+
+        changes = collect_changes(repo_root, last_commit)
+        if changes is None:
+            return None
+
+        candidates = set(changes.paths)
+        candidates.update(repo_root / path for path in json.loads(self.store.get_meta(DIRTY_PATHS_KEY) or "[]"))
+
+        checked = indexed = removed = 0
+        for file_path in sorted(candidates):
+            if not self.is_source_file(file_path) or self.project_root not in file_path.parents:
+                continue
+            checked += 1
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                if self.store.get_file_state(file_path) is not None:
+                    self.store.delete_file(file_path)
+                    removed += 1
+                continue
+            if self.should_reindex_file(file_path, stat=stat):
+                self.index_file(file_path, commit=False, stat=stat)
+                indexed += 1
+
+        self.record_git_state(repo_root, changes)
+
+        print(
+            f"Incremental index from {last_commit[:12]} to {changes.head[:12]}: "
+            f"checked {checked}, indexed {indexed}, removed {removed} files"
+        )
+        return {"files_checked": checked, "files_indexed": indexed, "files_removed": removed, "commit": changes.head}
+
+    def record_git_state(self, repo_root: Optional[Path] = None, changes: Optional[GitChanges] = None):
+        """Remember HEAD and the currently dirty files as the base for the next incremental index."""
+        if repo_root is None:
+            repo_root = find_repo_root(self.project_root)
+            if repo_root is None:
+                return
+        if changes is None:
+            changes = collect_changes(repo_root)
+            if changes is None:
+                return
+
+        self.store.set_meta(INDEXED_COMMIT_KEY, changes.head)
+        self.store.set_meta(DIRTY_PATHS_KEY, json.dumps(relative_paths(repo_root, changes.dirty)))
+        self.store.commit()
+
+    def index_all(self, workers: int = 1, use_git: bool = True):
+        """Index all configured directories, then drop files deleted since the last index.
+
+        Inside a git work tree that was indexed before, only the files changed
+        since the last indexed commit are processed (see index_incremental).
+
+        Args:
+            workers: Number of parser processes. 1 indexes serially in this process.
+            use_git: Set False to force a full walk of the tree.
+        """
+        if use_git and self.index_incremental() is not None:
+            self.trim_extraction_cache()
+            self.update_embeddings()
+            return
 
-    def index_all(self):
-        """Index all configured directories."""
         print("Starting full index...")
-        for directory in self.index_dirs:
-            self.index_directory(directory)
+        if workers != 1:
+            self.index_parallel(workers=workers)
+        else:
+            walked = []
+            for directory in self.index_dirs:
+                self.index_directory(directory, walked=walked)
+            self.reconcile(walked)
+        self.record_git_state()
+        self.trim_extraction_cache()
+        self.update_embeddings()
         print("Indexing complete!")
 
+    def trim_extraction_cache(self) -> int:
+        """Evict least recently used extraction cache entries beyond the configured size."""
+        return self.store.trim_extraction_cache(max(0, self.cache_max_bytes), EXTRACTOR_VERSION)
+
     def get_stats(self):
         """Get indexing statistics."""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
-        cursor.execute("SELECT COUNT(*) FROM symbols")
-        total_symbols = cursor.fetchone()[0]
-
-        cursor.execute("SELECT type, COUNT(*) FROM symbols GROUP BY type")
+        # Symbol, file and reference counts are maintained by triggers, so no table is scanned
+        cursor.execute("SELECT name, symbol_count FROM symbol_kinds WHERE symbol_count > 0")
         type_counts = dict(cursor.fetchall())
+        total_symbols = sum(type_counts.values())
 
-        cursor.execute("SELECT COUNT(DISTINCT file_path) FROM symbols")
-        total_files = cursor.fetchone()[0]
+        counters = dict(cursor.execute("SELECT name, value FROM index_counters"))
+        total_files = counters["files"]
+        total_references = counters["references"]
 
         conn.close()
 
-        return {"total_symbols": total_symbols, "total_files": total_files, "type_counts": type_counts}
+        return {
+            "total_symbols": total_symbols,
+            "total_files": total_files,
+            "type_counts": type_counts,
+            "total_references": total_references,
+        }
 
 
 if __name__ == "__main__":
-    indexer = CodeIndexer()
-    indexer.index_all()
+    parser = argparse.ArgumentParser(description="Index Python symbols into .code_index.db")
+    parser.add_argument("project_root", nargs="?", help="Project root to index (default: parent of indexing/)")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=os.cpu_count() or 1,
+        help="Number of parser processes (default: CPU count, 1 = serial)",
+    )
+    parser.add_argument(
+        "--hash", choices=sorted(HASH_ALGORITHMS), default="md5",
+        help="Content hash used for change detection (default: md5)",
+    )
+    parser.add_argument(
+        "-b", "--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+        help=f"Files written per transaction (default: {DEFAULT_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--full", action="store_true",
+        help="Walk the whole tree even when git can tell which files changed",
+    )
+    parser.add_argument(
+        "--walk-threads", type=int, default=1,
+        help="Threads walking top-level directories concurrently (default: 1)",
+    )
+    parser.add_argument(
+        "--cache-size-mb", type=int, default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024),
+        help="Size bound of the extraction cache reused across branch switches, 0 disables it "
+        f"(default: {DEFAULT_CACHE_MAX_BYTES // (1024 * 1024)})",
+    )
+    parser.add_argument(
+        "--embeddings", action="store_true",
+        help="Also embed symbols for semantic search (needs numpy and sentence-transformers)",
+    )
+    parser.add_argument(
+        "--embedding-model", default=DEFAULT_MODEL_PATH,
+        help=f"sentence-transformers model used with --embeddings (default: {DEFAULT_MODEL_PATH})",
+    )
+    args = parser.parse_args()
+
+    indexer = CodeIndexer(
+        args.project_root,
+        batch_size=args.batch_size,
+        hash_algorithm=args.hash,
+        walk_threads=args.walk_threads,
+        cache_max_bytes=args.cache_size_mb * 1024 * 1024,
+        embeddings=args.embeddings,
+        embedding_model=args.embedding_model,
+    )
+    indexer.index_all(workers=args.workers, use_git=not args.full)
+    indexer.close()
 
     stats = indexer.get_stats()
     print("\nIndexing Statistics:")
     print(f"Total symbols: {stats['total_symbols']}")
     print(f"Total files: {stats['total_files']}")
     print(f"Symbol types: {stats['type_counts']}")
+    print(f"Total references: {stats['total_references']}")
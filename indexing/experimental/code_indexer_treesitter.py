@@ -6,11 +6,15 @@ Provides fast function/class/symbol search with automatic updates.
 
 import hashlib
 import sqlite3
+import sys
 from dataclasses import dataclass
-from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
 
+# Share the bulk ingestion layer with the main AST indexer
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from symbol_store import SymbolStore, create_schema
+
 try:
     import tree_sitter
     import tree_sitter_languages
@@ -43,6 +47,7 @@ class CodeIndexer:
         self.project_root = Path(project_root).resolve()
         self.db_path = self.project_root / ".code_index.db"
         self.init_database()
+        self.store = SymbolStore(self.db_path)
 
         if HAS_TREE_SITTER:
             self.parser = tree_sitter.Parser()
@@ -58,56 +63,7 @@ class CodeIndexer:
     def init_database(self):
         """Initialize SQLite database for symbol storage."""
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS symbols (
-                id INTEGER PRIMARY KEY,
-                name TEXT NOT NULL,
-                type TEXT NOT NULL,
-                file_path TEXT NOT NULL,
-                line_number INTEGER NOT NULL,
-                column INTEGER NOT NULL,
-                parent TEXT,
-                signature TEXT,
-                docstring TEXT,
-                file_hash TEXT NOT NULL,
-                indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(name, type, file_path, line_number)
-            )
-        """
-        )
-
-        cursor.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_symbol_name ON symbols(name)
-        """
-        )
-
-        cursor.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_symbol_type ON symbols(type)
-        """
-        )
-
-        cursor.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_file_path ON symbols(file_path)
-        """
-        )
-
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS file_hashes (
-                file_path TEXT PRIMARY KEY,
-                hash TEXT NOT NULL,
-                last_modified TIMESTAMP
-            )
-        """
-        )
-
-        conn.commit()
+        create_schema(conn)
         conn.close()
 
     def get_file_hash(self, file_path: Path) -> str:
@@ -117,18 +73,12 @@ class CodeIndexer:
 
     def should_reindex_file(self, file_path: Path) -> bool:
         """Check if file needs reindexing based on hash"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT hash FROM file_hashes WHERE file_path = ?", (str(file_path),))
-        result = cursor.fetchone()
-        conn.close()
-
-        if not result:
+        stored_hash = self.store.get_file_hash(file_path)
+        if stored_hash is None:
             return True
 
         current_hash = self.get_file_hash(file_path)
-        return current_hash != result[0]
+        return current_hash != stored_hash
 
     def extract_symbols_from_python(self, file_path: Path) -> List[Symbol]:
         """Extract symbols from Python file using tree-sitter"""
@@ -228,7 +178,7 @@ class CodeIndexer:
 
         return symbols
 
-    def index_file(self, file_path: Path):
+    def index_file(self, file_path: Path, commit: bool = True):
         """Index a single file"""
         if file_path.suffix not in self.extensions:
             return
@@ -236,45 +186,10 @@ class CodeIndexer:
         print(f"Indexing {file_path}...")
 
         symbols = self.extract_symbols_from_python(file_path)
+        self.store.write_file(file_path, symbols, self.get_file_hash(file_path))
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Remove old symbols for this file
-        cursor.execute("DELETE FROM symbols WHERE file_path = ?", (str(file_path),))
-
-        # Insert new symbols
-        for symbol in symbols:
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO symbols
-                (name, type, file_path, line_number, column, parent, signature, docstring, file_hash)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    symbol.name,
-                    symbol.type,
-                    symbol.file_path,
-                    symbol.line_number,
-                    symbol.column,
-                    symbol.parent,
-                    symbol.signature,
-                    symbol.docstring,
-                    self.get_file_hash(file_path),
-                ),
-            )
-
-        # Update file hash
-        cursor.execute(
-            """
-            INSERT OR REPLACE INTO file_hashes (file_path, hash, last_modified)
-            VALUES (?, ?, ?)
-        """,
-            (str(file_path), self.get_file_hash(file_path), datetime.now()),
-        )
-
-        conn.commit()
-        conn.close()
+        if commit:
+            self.store.commit()
 
     def index_directory(self, directory: str):
         """Index all Python files in a directory"""
@@ -287,7 +202,8 @@ class CodeIndexer:
             if "__pycache__" in str(file_path):
                 continue
             if self.should_reindex_file(file_path):
-                self.index_file(file_path)
+                self.index_file(file_path, commit=False)
+        self.store.commit()
 
     def index_all(self):
         """Index all configured directories"""
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# RULE #0: MANDATORY FIRST ACTION FOR EVERY REQUEST
+# 1. Read CLAUDE.md COMPLETELY before responding
+# 2. Setup Python venv: [ -d "venv" ] || ./setup-venv.sh && source venv/bin/activate
+# 3. Search for rules related to the request
+# 4. Only proceed after confirming no violations
+# Failure to follow Rule #0 has caused real harm. Check BEFORE acting, not AFTER making mistakes.
+#
+# GUARDS ARE SAFETY EQUIPMENT - WHEN THEY FIRE, FIX THE PROBLEM THEY FOUND
+# NEVER weaken, disable, or bypass guards - they prevent real harm
+
+"""Git queries used by CodeIndexer to index only what changed since the last run.
+
+Every function returns None when git is unavailable or the path is not
+inside a work tree, so callers can fall back to walking the tree.
+"""
+
+import logging
+import subprocess
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Set, Union
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for a single git invocation
+GIT_TIMEOUT = 60
+
+
+class GitChanges(NamedTuple):
+    """Files that may differ from what the index saw at a base commit."""
+
+    head: str
+    paths: Set[Path]  # Changed, added, deleted or untracked since the base commit
+    dirty: Set[Path]  # Differ from HEAD right now (uncommitted edits and untracked files)
+
+
+def run_git(repo_root: Union[str, Path], *args: str) -> Optional[str]:
+    """Run a git command in a repository and return its stdout, or None on failure."""
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(repo_root), *args],
+            capture_output=True,
+            text=True,
+            timeout=GIT_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.debug("git %s failed: %s", " ".join(args), e)
+        return None
+    if result.returncode != 0:
+        logger.debug("git %s failed: %s", " ".join(args), result.stderr.strip())
+        return None
+    return result.stdout
+
+
+def find_repo_root(path: Union[str, Path]) -> Optional[Path]:
+    """Return the top-level directory of the work tree containing path."""
+    output = run_git(path, "rev-parse", "--show-toplevel")
+    return Path(output.strip()).resolve() if output else None
+
+
+def head_commit(repo_root: Union[str, Path]) -> Optional[str]:
+    """Return the commit id of HEAD, or None in a repository without commits."""
+    output = run_git(repo_root, "rev-parse", "--verify", "--quiet", "HEAD^{commit}")
+    return output.strip() if output else None
+
+
+def changed_paths(repo_root: Path, base: str) -> Optional[Set[Path]]:
+    """Return tracked files that differ between a commit and the working tree.
+
+    Renames are reported as a delete plus an add so both paths are returned.
+    """
+    output = run_git(repo_root, "diff", "--name-status", "--no-renames", "-z", base, "--")
+    if output is None:
+        return None
+    # -z output alternates status and path fields
+    fields = output.split("\0")
+    return {repo_root / path for path in fields[1::2] if path}
+
+
+def untracked_paths(repo_root: Path) -> Optional[Set[Path]]:
+    """Return untracked files that are not excluded by .gitignore."""
+    output = run_git(repo_root, "ls-files", "--others", "--exclude-standard", "-z")
+    if output is None:
+        return None
+    return {repo_root / path for path in output.split("\0") if path}
+
+
+def collect_changes(repo_root: Path, base: Optional[str] = None) -> Optional[GitChanges]:
+    """Find files that may have changed since the index was built at a base commit.
+
+    Args:
+        repo_root: Top-level directory of the work tree.
+        base: Commit the index was last brought up to date with. Defaults to
+            HEAD, which only reports the files that are currently dirty.
+
+    Returns:
+        GitChanges, or None if git fails or the base commit no longer exists
+        (e.g. after a history rewrite), in which case a full walk is needed.
+    """
+    head = head_commit(repo_root)
+    if head is None:
+        return None
+
+    untracked = untracked_paths(repo_root)
+    dirty = changed_paths(repo_root, head)
+    if untracked is None or dirty is None:
+        return None
+    dirty |= untracked
+
+    if base is None or base == head:
+        return GitChanges(head=head, paths=set(dirty), dirty=dirty)
+
+    if run_git(repo_root, "cat-file", "-e", f"{base}^{{commit}}") is None:
+        logger.info("Last indexed commit %s not found, falling back to a full index", base[:12])
+        return None
+
+    since_base = changed_paths(repo_root, base)
+    if since_base is None:
+        return None
+    return GitChanges(head=head, paths=since_base | untracked, dirty=dirty)
+
+
+def relative_paths(repo_root: Path, paths: Set[Path]) -> List[str]:
+    """Return paths relative to the repository root, sorted, for storage."""
+    return sorted(path.relative_to(repo_root).as_posix() for path in paths)
@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+# RULE #0: MANDATORY FIRST ACTION FOR EVERY REQUEST
+# 1. Read CLAUDE.md COMPLETELY before responding
+# 2. Setup Python venv: [ -d "venv" ] || ./setup-venv.sh && source venv/bin/activate
+# 3. Search for rules related to the request
+# 4. Only proceed after confirming no violations
+# Failure to follow Rule #0 has caused real harm. Check BEFORE acting, not AFTER making mistakes.
+#
+# GUARDS ARE SAFETY EQUIPMENT - WHEN THEY FIRE, FIX THE PROBLEM THEY FOUND
+# NEVER weaken, disable, or bypass guards - they prevent real harm
+
+"""Debounced file event queue and the worker that applies it to the index.
+
+The watcher's observer thread only records which paths changed. Events for
+the same path coalesce into one entry, and a path is handed to the worker
+once it has been quiet for the quiet period, so an editor's save burst or a
+``git checkout`` becomes one index update per file. Moves keep their source
+path, so the worker can re-point stored rows instead of parsing the files
+again. The worker applies each batch of paths in a single store transaction.
+At startup, CatchUp feeds the queue with what changed while nothing watched.
+
+The queue is bounded: when more paths are pending than it holds, it drops
+them and asks the worker for one reconciliation rescan instead, which finds
+the same changes by walking the tree.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+src_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from indexer_metrics import REGISTRY, RateMeter
+
+logger = logging.getLogger(__name__)
+
+# Event kinds; the latest event for a path wins, except that a pending move
+# is kept so its source is not forgotten
+CHANGED = "changed"
+DELETED = "deleted"
+MOVED = "moved"
+
+# Paths held before the queue falls back to a rescan
+DEFAULT_MAX_PENDING = 10000
+
+# Seconds without events before a path is indexed
+DEFAULT_QUIET_PERIOD = 0.5
+
+# Seconds the worker waits for a batch before checking whether it was stopped
+WORKER_POLL_INTERVAL = 1.0
+
+# Threads stat-ing files during the startup catch-up, which mostly wait on the filesystem
+DEFAULT_CATCH_UP_THREADS = 8
+
+# Walked files handed to a catch-up thread at a time
+CATCH_UP_CHUNK = 256
+
+EVENTS = REGISTRY.counter("code_index_events_total", "File system events received by the watcher", labels=("kind",))
+EVENT_RATE = RateMeter(window=60)
+REGISTRY.gauge("code_index_events_per_second", "File system events received per second over the last minute",
+               function=EVENT_RATE.rate)
+PATH_SECONDS = REGISTRY.histogram(
+    "code_index_path_seconds", "Time to index, move or remove one queued path, including its parse"
+)
+RESCANS = REGISTRY.counter("code_index_rescans_total", "Reconciliation rescans of the whole tree")
+LAST_RECONCILE = REGISTRY.gauge(
+    "code_index_last_reconcile_timestamp_seconds", "Unix time of the last successful reconciliation"
+)
+
+
+class EventBatch(NamedTuple):
+    """Paths ready to be applied, or a request to rescan everything."""
+
+    paths: Dict[str, str]
+    overflowed: bool = False
+    # Destination -> source path of the MOVED entries in paths
+    sources: Dict[str, str] = {}
+
+
+class EventQueue:
+    """Bounded, per-path coalescing queue of file events with a quiet-period debounce."""
+
+    def __init__(
+        self,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        quiet_period: float = DEFAULT_QUIET_PERIOD,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Create an empty queue.
+
+        Args:
+            max_pending: Distinct paths held before events are dropped in
+                favour of a rescan.
+            quiet_period: Seconds a path must go without events before it is
+                handed out.
+            clock: Monotonic time source, replaceable in tests.
+        """
+        self.max_pending = max(1, max_pending)
+        self.quiet_period = quiet_period
+        self._clock = clock
+        # path -> (kind, time of the latest event, move source), ordered by latest event
+        self._pending: OrderedDict[str, tuple] = OrderedDict()
+        self._overflowed = False
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    @property
+    def overflowed(self) -> bool:
+        """Whether a rescan is owed for dropped events."""
+        with self._condition:
+            return self._overflowed
+
+    def put(self, path: str, kind: str = CHANGED, source: Optional[str] = None):
+        """Record an event for a path, replacing any pending event for it.
+
+        Args:
+            path: Path the event is about; the destination of a move.
+            kind: CHANGED, DELETED or MOVED.
+            source: Path a MOVED file or directory came from.
+        """
+        EVENTS.inc(kind=kind)
+        EVENT_RATE.mark()
+        with self._condition:
+            if self._overflowed:
+                # The owed rescan walks the tree and will see this change too
+                return
+            if path not in self._pending and len(self._pending) >= self.max_pending:
+                logger.warning(f"More than {self.max_pending} changed paths pending, falling back to a rescan")
+                self._pending.clear()
+                self._overflowed = True
+            else:
+                previous = self._pending.get(path)
+                if kind == MOVED:
+                    # Events pending for the source now happen at the destination
+                    moved_from = self._pending.pop(source, None)
+                    if moved_from is not None and moved_from[0] == MOVED:
+                        source = moved_from[2]
+                elif previous is not None and previous[0] == MOVED:
+                    kind, source = MOVED, previous[2]
+                self._pending[path] = (kind, self._clock(), source)
+                self._pending.move_to_end(path)
+            self._condition.notify()
+
+    def take(self, max_batch: int, timeout: Optional[float] = None) -> Optional[EventBatch]:
+        """Wait for paths that have been quiet for the quiet period and remove them.
+
+        Args:
+            max_batch: Most paths returned at once.
+            timeout: Seconds to wait; None waits until something is ready.
+
+        Returns:
+            The ready paths with their latest event kind, a batch with
+            ``overflowed`` set when a rescan is owed, or None on timeout.
+        """
+        deadline = None if timeout is None else self._clock() + timeout
+        with self._condition:
+            while True:
+                if self._overflowed:
+                    # Events from here on are queued again while the rescan runs
+                    self._overflowed = False
+                    return EventBatch({}, overflowed=True)
+
+                now = self._clock()
+                wait = None
+                if self._pending:
+                    _, last_seen, _ = next(iter(self._pending.values()))
+                    wait = last_seen + self.quiet_period - now
+                    if wait <= 0:
+                        return self._pop_ready(now, max(1, max_batch))
+
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        return None
+                    wait = remaining if wait is None else min(wait, remaining)
+                self._condition.wait(wait)
+
+    def _pop_ready(self, now: float, max_batch: int) -> EventBatch:
+        """Remove and return the oldest paths whose quiet period has passed."""
+        ready, sources = {}, {}
+        while self._pending and len(ready) < max_batch:
+            path, (kind, last_seen, source) = next(iter(self._pending.items()))
+            if last_seen + self.quiet_period > now:
+                break
+            del self._pending[path]
+            ready[path] = kind
+            if kind == MOVED:
+                sources[path] = source
+        return EventBatch(ready, sources=sources)
+
+
+def order_moves(moves: Dict[str, str]) -> Tuple[List[str], List[str]]:
+    """Order a batch of moves so that none overwrites a path another move still has to read.
+
+    A move into a path that is also the source of another move (b -> c, then
+    a -> b) waits until that move is applied. Moves that form a cycle, such as
+    two files swapped through a temporary name, cannot be ordered that way.
+
+    Args:
+        moves: Destination -> source path.
+
+    Returns:
+        Destinations in the order to apply their moves, and the destinations
+        of moves in cycles, whose content has to be parsed again instead.
+    """
+    pending = dict(moves)
+    ordered = []
+    while pending:
+        sources = set(pending.values())
+        ready = [dest for dest in pending if dest not in sources]
+        if not ready:
+            break
+        for dest in ready:
+            ordered.append(dest)
+            del pending[dest]
+    return ordered, list(pending)
+
+
+def rescan(indexer) -> Dict[str, int]:
+    """Index every changed file and drop deleted ones by walking the configured directories.
+
+    Returns:
+        Dictionary with the number of files indexed and removed.
+    """
+    changed_count = 0
+    walked = []
+
+    for directory in indexer.index_dirs:
+        for file_path, stat in indexer.find_changed_files(directory, walked=walked):
+            indexer.index_file(file_path, commit=False, stat=stat)
+            changed_count += 1
+
+    # Flush the last partial batch so searches see every change
+    indexer.commit()
+
+    # Without file events, deletions are only noticed by diffing the walk
+    removed = indexer.reconcile(walked)
+    indexer.trim_extraction_cache()
+    RESCANS.inc()
+    LAST_RECONCILE.set_to_current_time()
+    return {"files_indexed": changed_count, "files_removed": removed["files_removed"]}
+
+
+class CatchUp(threading.Thread):
+    """Background thread that queues what changed while the watcher was not running.
+
+    The configured directories are walked and stat-ed on a thread pool and
+    each file's stat is compared with the signature stored when it was last
+    indexed. Only files whose stat differs, new files and stored files that
+    are gone are queued; the IndexWorker compares content hashes before
+    parsing anything, so a touched but unchanged file costs one hash.
+
+    File events keep flowing into the same queue meanwhile, so edits made
+    during the catch-up are applied without waiting for it to finish.
+    """
+
+    def __init__(self, indexer, events: EventQueue, threads: int = DEFAULT_CATCH_UP_THREADS):
+        """Create the catch-up; call start() to run it.
+
+        Args:
+            indexer: CodeIndexer whose stored file states are compared.
+            events: Queue the IndexWorker applies.
+            threads: Threads walking directories and stat-ing files.
+        """
+        super().__init__(name="catch-up", daemon=True)
+        self.indexer = indexer
+        self.events = events
+        self.threads = max(1, threads)
+        self.state = "waiting"
+        self.files_stored = 0
+        self.files_checked = 0
+        self.files_changed = 0
+        self.files_deleted = 0
+        self.seconds = None
+        self._lock = threading.Lock()
+
+    def progress(self) -> Dict:
+        """Return the state and counts of the catch-up, for the health endpoint."""
+        with self._lock:
+            return {
+                "state": self.state,
+                "files_stored": self.files_stored,
+                "files_checked": self.files_checked,
+                "files_changed": self.files_changed,
+                "files_deleted": self.files_deleted,
+                "seconds": self.seconds,
+            }
+
+    def run(self):
+        try:
+            result = self.catch_up()
+            logger.info(
+                f"Startup catch-up checked {result['files_checked']} files in {self.seconds:.1f}s, "
+                f"queued {result['files_changed']} changed and {result['files_deleted']} deleted files"
+            )
+        except Exception as e:
+            with self._lock:
+                self.state = "failed"
+            logger.error(f"Error during startup catch-up: {e}")
+
+    def catch_up(self) -> Dict[str, int]:
+        """Queue every changed, new and deleted file.
+
+        Returns:
+            Dictionary with the number of files checked, queued as changed
+            and queued as deleted.
+        """
+        start = time.monotonic()
+        states = self.indexer.store.get_all_file_states()
+        with self._lock:
+            self.state = "running"
+            self.files_stored = len(states)
+
+        seen = set()
+        scopes = []
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            futures = []
+            for directory in self.indexer.index_dirs:
+                root = self.indexer.project_root / directory
+                if not root.is_dir():
+                    # An unmounted or missing tree must not be mistaken for an empty one
+                    logger.warning(f"Directory {root} not found, skipping its catch-up")
+                    continue
+                scopes.append(os.path.join(str(root), ""))
+                chunk = []
+                for entry in self.indexer.iter_source_entries(directory, threads=self.threads):
+                    seen.add(entry.path)
+                    chunk.append(entry)
+                    if len(chunk) >= CATCH_UP_CHUNK:
+                        futures.append(executor.submit(self._check, chunk, states))
+                        chunk = []
+                if chunk:
+                    futures.append(executor.submit(self._check, chunk, states))
+            for future in futures:
+                future.result()
+
+        deleted = [
+            path for path in states if path not in seen and any(path.startswith(scope) for scope in scopes)
+        ]
+        for path in deleted:
+            self.events.put(path, DELETED)
+
+        LAST_RECONCILE.set_to_current_time()
+        with self._lock:
+            self.files_deleted = len(deleted)
+            self.seconds = time.monotonic() - start
+            self.state = "done"
+            return {
+                "files_checked": self.files_checked,
+                "files_changed": self.files_changed,
+                "files_deleted": self.files_deleted,
+            }
+
+    def _check(self, entries: List[os.DirEntry], states: Dict):
+        """Stat a chunk of walked files and queue those that differ from their stored state."""
+        changed = 0
+        for entry in entries:
+            try:
+                state = states.get(entry.path)
+                if state is None or not state.matches(entry.stat()):
+                    self.events.put(entry.path, CHANGED)
+                    changed += 1
+            except OSError:
+                # Gone again since the walk; a file event or the next rescan covers it
+                continue
+        with self._lock:
+            self.files_checked += len(entries)
+            self.files_changed += changed
+
+
+class IndexWorker(threading.Thread):
+    """Background thread that applies queued events to the index in batches."""
+
+    def __init__(self, indexer, events: EventQueue, max_batch: Optional[int] = None):
+        """Create the worker; call start() to run it.
+
+        Args:
+            indexer: CodeIndexer whose store receives the updates.
+            events: Queue filled by the file system event handler.
+            max_batch: Paths applied per transaction. Defaults to the store's
+                batch size so a batch commits exactly once.
+        """
+        super().__init__(name="index-worker", daemon=True)
+        self.indexer = indexer
+        self.events = events
+        self.max_batch = max_batch or indexer.store.batch_size
+        self._stopped = threading.Event()
+
+    def stop(self):
+        """Ask the worker to exit after the batch it is applying."""
+        self._stopped.set()
+
+    def run(self):
+        while not self._stopped.is_set():
+            batch = self.events.take(self.max_batch, timeout=WORKER_POLL_INTERVAL)
+            if batch is None:
+                continue
+            try:
+                if batch.overflowed:
+                    result = rescan(self.indexer)
+                    logger.info(
+                        f"Rescan updated {result['files_indexed']} files, removed {result['files_removed']} deleted files"
+                    )
+                else:
+                    result = self.apply(batch.paths, batch.sources)
+                    logger.info(
+                        f"Re-indexed {result['files_indexed']} files, moved {result['files_moved']}, "
+                        f"removed {result['files_removed']}"
+                    )
+            except Exception as e:
+                logger.error(f"Error applying file events: {e}")
+
+    def apply(self, paths: Dict[str, str], sources: Optional[Dict[str, str]] = None) -> Dict[str, int]:
+        """Index, move or remove each path according to what is on disk now, then commit once.
+
+        The event kind is only a hint: a path reported deleted may have been
+        recreated since, and a changed one may be gone by the time it is read.
+        A path that is gone is removed together with any stored files below
+        it, which covers deleted directories.
+
+        Args:
+            paths: Path -> latest event kind.
+            sources: Destination -> source path of moved paths.
+
+        Returns:
+            Dictionary with the number of files indexed, moved and removed.
+        """
+        counts = {"files_indexed": 0, "files_moved": 0, "files_removed": 0}
+        sources = sources or {}
+        moves = {path: sources[path] for path, kind in paths.items() if kind == MOVED and sources.get(path)}
+        ordered, cyclic = order_moves(moves)
+        if cyclic:
+            logger.info(f"Parsing {len(cyclic)} paths moved in a cycle again")
+            # What is stored under them belongs to files now elsewhere in the cycle
+            for path in cyclic:
+                for stored in self.indexer.store.stored_paths_under(Path(path)):
+                    self.indexer.store.delete_file(stored)
+
+        steps = [(path, MOVED, moves[path]) for path in ordered]
+        steps += [(path, MOVED, None) for path in cyclic]
+        steps += [(path, kind, None) for path, kind in paths.items() if path not in moves]
+        for path, kind, source in steps:
+            file_path = Path(path)
+            try:
+                with PATH_SECONDS.time():
+                    self._apply_path(file_path, kind, source, counts)
+            except OSError as e:
+                logger.warning(f"Could not index {file_path}: {e}")
+        self.indexer.commit()
+        return counts
+
+    def _apply_path(self, file_path: Path, kind: str, source: Optional[str], counts: Dict[str, int]):
+        """Bring the index up to date with one path, adding to the counts."""
+        if kind == MOVED and source:
+            for key, value in self.indexer.move_path(Path(source), file_path, commit=False).items():
+                counts[key] += value
+            return
+        if kind == MOVED and file_path.exists():
+            # Nothing to carry over from a source, so parse whatever arrived
+            for key, value in self.indexer.index_path(file_path).items():
+                counts[key] += value
+            return
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            stat = None
+        if stat is None:
+            for stored in self.indexer.store.stored_paths_under(file_path):
+                self.indexer.store.delete_file(stored)
+                counts["files_removed"] += 1
+        elif file_path.is_dir():
+            return
+        elif self.indexer.should_reindex_file(file_path, stat=stat):
+            self.indexer.index_file(file_path, commit=False, stat=stat)
+            counts["files_indexed"] += 1
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# RULE #0: MANDATORY FIRST ACTION FOR EVERY REQUEST
+# 1. Read CLAUDE.md COMPLETELY before responding
+# 2. Setup Python venv: [ -d "venv" ] || ./setup-venv.sh && source venv/bin/activate
+# 3. Search for rules related to the request
+# 4. Only proceed after confirming no violations
+# Failure to follow Rule #0 has caused real harm. Check BEFORE acting, not AFTER making mistakes.
+#
+# GUARDS ARE SAFETY EQUIPMENT - WHEN THEY FIRE, FIX THE PROBLEM THEY FOUND
+# NEVER weaken, disable, or bypass guards - they prevent real harm
+
+"""Change detection by polling, for when file system events are unavailable.
+
+Docker bind mounts often deliver no inotify events, so the watcher falls
+back to polling. Instead of walking the whole tree each time, the poller
+caches every directory's mtime, its source files and their stat
+signatures. A poll stats each cached directory and lists only those whose
+mtime changed, which is how creations, deletions and renames show up.
+
+Files written in place do not touch their directory's mtime, so the files
+(and .gitignore) of unchanged directories are still stat-checked, but not
+all of them on every poll: directories with recent changes are checked on every poll and
+the rest in rotation, one slice per poll. A changed .gitignore changes
+which files of the whole subtree below it are indexed, so that subtree is
+listed again. Nothing is read or hashed here;
+changes go to the EventQueue, and the IndexWorker decides what to index.
+
+The interval adapts to the change rate: it drops to the minimum when a poll
+finds changes and backs off towards the maximum while the tree is quiet.
+"""
+
+import logging
+import os
+import sys
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from code_indexer import EXCLUDED_DIRS
+from index_events import CHANGED, DELETED, EventQueue
+
+src_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from directory_walker import PendingDir, scan_dir
+from indexer_metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Seconds between polls while files are changing, and the most the interval backs off to
+DEFAULT_MIN_INTERVAL = 1.0
+DEFAULT_MAX_INTERVAL = 15.0
+
+# Factor the interval grows by after a poll without changes
+BACKOFF = 1.5
+
+# Unchanged directories are stat-checked once every this many polls; with the
+# defaults, an in-place edit in a quiet tree is noticed within a minute
+DEFAULT_SWEEP_POLLS = 4
+
+# Polls a directory stays checked on every poll after one of its files changed
+HOT_POLLS = 10
+
+POLLS = REGISTRY.counter("code_index_polls_total", "Polls for changed files without file system events")
+DIRS_LISTED = REGISTRY.counter("code_index_poll_dirs_listed_total", "Directories listed again by the poller")
+POLL_INTERVAL = REGISTRY.gauge("code_index_poll_interval_seconds", "Current interval of the poller")
+
+# (st_mtime_ns, st_size, st_ino) of a file
+Signature = Tuple[int, int, int]
+
+
+def file_signature(stat: os.stat_result) -> Signature:
+    """Return the part of a stat that changes when a file is written or replaced."""
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def gitignore_signature(directory: str) -> Optional[Signature]:
+    """Return the signature of a directory's .gitignore, or None if it has none."""
+    try:
+        return file_signature(os.stat(os.path.join(directory, ".gitignore")))
+    except OSError:
+        return None
+
+
+@dataclass
+class DirState:
+    """What the poller last saw of one directory."""
+
+    pending: PendingDir  # How the walk reached the directory, for listing it again
+    mtime_ns: int
+    files: Dict[str, Signature]
+    subdirs: List[str]
+    gitignore: Optional[Signature] = None  # The rules handed down with pending came from this version
+
+
+class DirectoryPoller(threading.Thread):
+    """Background thread that queues changed, new and deleted files by polling."""
+
+    def __init__(
+        self,
+        indexer,
+        events: EventQueue,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        sweep_polls: int = DEFAULT_SWEEP_POLLS,
+    ):
+        """Create the poller; call start() to run it.
+
+        Args:
+            indexer: CodeIndexer whose directories, extensions and exclusions are polled.
+            events: Queue the IndexWorker applies.
+            min_interval: Seconds between polls while changes keep coming.
+            max_interval: Longest interval reached while nothing changes.
+            sweep_polls: Number of polls over which every unchanged directory
+                gets its files stat-checked once.
+        """
+        super().__init__(name="directory-poller", daemon=True)
+        self.indexer = indexer
+        self.events = events
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.sweep_polls = max(1, sweep_polls)
+        self.interval = min_interval
+        self._dirs: Dict[str, DirState] = {}
+        self._hot: Dict[str, int] = {}
+        self._polls = 0
+        self._stopped = threading.Event()
+        POLL_INTERVAL.set(self.interval)
+
+    def __len__(self) -> int:
+        """Number of directories being polled."""
+        return len(self._dirs)
+
+    def stop(self):
+        """Ask the poller to exit."""
+        self._stopped.set()
+
+    def prime(self):
+        """Record the current state of the configured directories without queueing anything.
+
+        Call it before the startup reconciliation so changes made while that
+        runs are still seen by the first poll.
+        """
+        self._dirs.clear()
+        self._hot.clear()
+        for directory in self.indexer.index_dirs:
+            root = self.indexer.project_root / directory
+            if root.is_dir():
+                self._add_tree((os.fspath(root), "", []))
+        logger.info(f"Polling {len(self._dirs)} directories for changes")
+
+    def run(self):
+        if not self._dirs:
+            self.prime()
+        while not self._stopped.wait(self.interval):
+            try:
+                result = self.poll()
+                if result["changes"]:
+                    logger.info(
+                        f"Poll found {result['changes']} changes, listed {result['dirs_listed']} directories"
+                    )
+            except Exception as e:
+                logger.error(f"Error polling for changes: {e}")
+
+    def poll(self) -> Dict[str, int]:
+        """Queue every change since the last poll and adapt the interval.
+
+        Returns:
+            Dictionary with the number of directories listed, files
+            stat-checked and changes queued.
+        """
+        self._polls += 1
+        counts = {"dirs_listed": 0, "files_checked": 0, "changes": 0}
+        for path in list(self._dirs):
+            state = self._dirs.get(path)
+            if state is None:
+                # Dropped together with a deleted parent during this poll
+                continue
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                if not state.pending[1]:
+                    # An unmounted or missing tree must not be mistaken for an empty one
+                    logger.warning(f"Polled directory {path} not found")
+                    continue
+                self._drop_tree(path)
+                self._report(path, DELETED, counts)
+                continue
+
+            if mtime_ns != state.mtime_ns:
+                self._relist(path, state, counts)
+            elif self._due(path):
+                self._check_files(path, state, counts)
+
+        POLLS.inc()
+        DIRS_LISTED.inc(counts["dirs_listed"])
+        self._adapt(counts["changes"])
+        return counts
+
+    def _adapt(self, changes: int):
+        """Poll quickly while files change and back off while they do not."""
+        if changes:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * BACKOFF)
+        POLL_INTERVAL.set(self.interval)
+
+    def _due(self, path: str) -> bool:
+        """Check whether the files of an unchanged directory are stat-checked in this poll."""
+        if self._polls - self._hot.get(path, -HOT_POLLS - 1) <= HOT_POLLS:
+            return True
+        # A stable hash keeps each directory in the same slice across polls
+        return zlib.crc32(path.encode("utf-8", "surrogateescape")) % self.sweep_polls == self._polls % self.sweep_polls
+
+    def _report(self, path: str, kind: str, counts: Dict[str, int]):
+        """Queue one change and keep its directory checked on every poll for a while."""
+        self.events.put(path, kind)
+        counts["changes"] += 1
+        self._hot[os.path.dirname(path)] = self._polls
+
+    def _list(self, pending: PendingDir) -> Optional[Tuple[DirState, List[PendingDir]]]:
+        """List a directory, returning its state and its subdirectories, or None if it is gone."""
+        try:
+            # Taken before listing, so an entry added meanwhile changes the mtime again
+            mtime_ns = os.stat(pending[0]).st_mtime_ns
+        except OSError:
+            return None
+        gitignore = gitignore_signature(pending[0])
+        entries, subdirs = scan_dir(pending, self.indexer.extensions, EXCLUDED_DIRS, use_gitignore=True)
+        files = {}
+        for entry in entries:
+            try:
+                files[entry.path] = file_signature(entry.stat())
+            except OSError:
+                continue
+        return DirState(pending, mtime_ns, files, [subdir[0] for subdir in subdirs], gitignore), subdirs
+
+    def _add_tree(self, start: PendingDir, counts: Optional[Dict[str, int]] = None):
+        """Cache a directory and everything below it, queueing its files when counts are given."""
+        stack = [start]
+        while stack:
+            listed = self._list(stack.pop())
+            if listed is None:
+                continue
+            state, subdirs = listed
+            self._dirs[state.pending[0]] = state
+            if counts is not None:
+                counts["dirs_listed"] += 1
+                for file_path in state.files:
+                    self._report(file_path, CHANGED, counts)
+            stack.extend(reversed(subdirs))
+
+    def _drop_tree(self, path: str):
+        """Forget a directory and everything cached below it."""
+        for cached in self._subtree(path):
+            del self._dirs[cached]
+            self._hot.pop(cached, None)
+
+    def _subtree(self, path: str) -> List[str]:
+        """Return a cached directory and the cached directories below it."""
+        prefix = path + os.sep
+        return [cached for cached in self._dirs if cached == path or cached.startswith(prefix)]
+
+    def _reload_tree(self, path: str, state: DirState, counts: Dict[str, int]):
+        """List a directory whose .gitignore changed and everything below it, queueing what differs.
+
+        Every directory below it was cached with rules from the old version,
+        and files or whole subdirectories may now be ignored or included.
+        """
+        before = {}
+        for cached in self._subtree(path):
+            before.update(self._dirs[cached].files)
+        self._drop_tree(path)
+        self._add_tree(state.pending)
+        after = {}
+        for cached in self._subtree(path):
+            after.update(self._dirs[cached].files)
+            counts["dirs_listed"] += 1
+
+        for file_path, signature in after.items():
+            if before.get(file_path) != signature:
+                self._report(file_path, CHANGED, counts)
+        for file_path in before.keys() - after.keys():
+            self._report(file_path, DELETED, counts)
+
+    def _relist(self, path: str, state: DirState, counts: Dict[str, int]):
+        """List a directory whose mtime changed and queue what differs from the cache."""
+        listed = self._list(state.pending)
+        if listed is None:
+            if not state.pending[1]:
+                logger.warning(f"Polled directory {path} not found")
+                return
+            self._drop_tree(path)
+            self._report(path, DELETED, counts)
+            return
+        new_state, subdirs = listed
+        if new_state.gitignore != state.gitignore:
+            self._reload_tree(path, state, counts)
+            return
+        counts["dirs_listed"] += 1
+        counts["files_checked"] += len(new_state.files)
+
+        for file_path, signature in new_state.files.items():
+            if state.files.get(file_path) != signature:
+                self._report(file_path, CHANGED, counts)
+        for file_path in state.files.keys() - new_state.files.keys():
+            self._report(file_path, DELETED, counts)
+
+        known = set(state.subdirs)
+        for subdir in known - set(new_state.subdirs):
+            self._drop_tree(subdir)
+            self._report(subdir, DELETED, counts)
+        self._dirs[path] = new_state
+        for pending in subdirs:
+            if pending[0] not in known:
+                self._add_tree(pending, counts)
+
+    def _check_files(self, path: str, state: DirState, counts: Dict[str, int]):
+        """Stat the cached files of an unchanged directory and queue those written in place."""
+        if gitignore_signature(path) != state.gitignore:
+            self._reload_tree(path, state, counts)
+            return
+        for file_path, signature in state.files.items():
+            counts["files_checked"] += 1
+            try:
+                current = file_signature(os.stat(file_path))
+            except OSError:
+                # Removing the file changed the directory's mtime; the next poll lists it
+                continue
+            if current != signature:
+                state.files[file_path] = current
+                self._report(file_path, CHANGED, counts)
@@ -60,7 +60,9 @@ async def main():
         server = Server("code-search")
         logger.info("✅ Server object created successfully")
 
-        # Initialize code searcher (will be created per request to ensure fresh DB)
+        # One searcher for the server's lifetime, created on the first tool call;
+        # its pooled connections see index updates without being rebuilt
+        searcher = None
         logger.info("Code Search MCP Server starting tools setup")
 
         @server.list_tools()
@@ -69,18 +71,23 @@ async def main():
             tools = [
                 Tool(
                     name="search_code",
-                    description="Search for code symbols by name, content, or file path",
+                    description=(
+                        "Search for code symbols by name, content, or file path. "
+                        "Content searches are full-text and ranked by relevance. "
+                        "Fuzzy searches find half-remembered names from abbreviations "
+                        "('gfh' for get_file_hash, 'CodeIdx' for CodeIndexer) or typos."
+                    ),
                     inputSchema={
                         "type": "object",
                         "properties": {
                             "query": {
                                 "type": "string",
-                                "description": "Search query (supports * and ? wildcards)"
+                                "description": "Search query (supports * and ? wildcards, except for fuzzy searches)"
                             },
                             "search_type": {
                                 "type": "string",
-                                "enum": ["name", "content", "file"],
-                                "description": "Type of search - 'name' (default), 'content', or 'file'"
+                                "enum": ["name", "content", "file", "fuzzy"],
+                                "description": "Type of search - 'name' (default), 'content', 'file', or 'fuzzy'"
                             },
                             "symbol_type": {
                                 "type": "string",
@@ -90,6 +97,14 @@ async def main():
                             "limit": {
                                 "type": "number",
                                 "description": "Maximum number of results (default: 50)"
+                            },
+                            "cursor": {
+                                "type": "string",
+                                "description": "Optional: next_cursor from the previous page of the same search"
+                            },
+                            "compact": {
+                                "type": "boolean",
+                                "description": "One line per result without docstrings (default: false)"
                             }
                         },
                         "required": ["query"]
@@ -109,11 +124,191 @@ async def main():
                             "limit": {
                                 "type": "number",
                                 "description": "Maximum number of results (default: 100)"
+                            },
+                            "cursor": {
+                                "type": "string",
+                                "description": "Optional: next_cursor from the previous page of the same search"
+                            },
+                            "compact": {
+                                "type": "boolean",
+                                "description": "One line per result without docstrings (default: false)"
                             }
                         },
                         "required": ["symbol_type"]
                     }
                 ),
+                Tool(
+                    name="find_references",
+                    description=(
+                        "Find every use of a name from the reference index: call sites, "
+                        "attribute accesses, name loads and imports"
+                    ),
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "name": {
+                                "type": "string",
+                                "description": "Exact name to look up (dotted module name for imports)"
+                            },
+                            "kind": {
+                                "type": "string",
+                                "enum": ["call", "attribute", "name", "import"],
+                                "description": "Optional: Only return references of this kind"
+                            },
+                            "limit": {
+                                "type": "number",
+                                "description": "Maximum number of results (default: 100)"
+                            }
+                        },
+                        "required": ["name"]
+                    }
+                ),
+                Tool(
+                    name="find_callers",
+                    description="Find the call sites of a function or method and the functions that contain them",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "name": {
+                                "type": "string",
+                                "description": "Name of the function or method (without its class)"
+                            },
+                            "limit": {
+                                "type": "number",
+                                "description": "Maximum number of results (default: 100)"
+                            }
+                        },
+                        "required": ["name"]
+                    }
+                ),
+                Tool(
+                    name="get_imports",
+                    description="List what a module imports, resolved to indexed files where possible",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "target": {
+                                "type": "string",
+                                "description": "File path, path suffix (e.g. 'pkg/module.py'), or dotted module name"
+                            },
+                            "limit": {
+                                "type": "number",
+                                "description": "Maximum number of results (default: 200)"
+                            }
+                        },
+                        "required": ["target"]
+                    }
+                ),
+                Tool(
+                    name="find_dependents",
+                    description=(
+                        "Find every file that imports a module directly or transitively - "
+                        "use for impact analysis before editing it"
+                    ),
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "target": {
+                                "type": "string",
+                                "description": "File path, path suffix (e.g. 'pkg/module.py'), or dotted module name"
+                            },
+                            "limit": {
+                                "type": "number",
+                                "description": "Maximum number of results (default: 200)"
+                            }
+                        },
+                        "required": ["target"]
+                    }
+                ),
+                Tool(
+                    name="get_file_symbols",
+                    description=(
+                        "Outline one or more files: every indexed symbol in source order. "
+                        "Use instead of search_code to see what a file defines"
+                    ),
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "file_paths": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "File paths or path suffixes (e.g. 'pkg/module.py')"
+                            },
+                            "name_pattern": {
+                                "type": "string",
+                                "description": "Optional: Only symbols whose name contains this (supports * and ? wildcards)"
+                            },
+                            "limit": {
+                                "type": "number",
+                                "description": "Maximum number of results (default: all)"
+                            }
+                        },
+                        "required": ["file_paths"]
+                    }
+                ),
+                Tool(
+                    name="semantic_search",
+                    description=(
+                        "Find code by what it does, described in plain language "
+                        "('hash the contents of a file'). Ranks symbols by embedding similarity; "
+                        "needs the indexer to run with --embeddings"
+                    ),
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "query": {
+                                "type": "string",
+                                "description": "Natural-language description of the code to find"
+                            },
+                            "symbol_type": {
+                                "type": "string",
+                                "enum": ["function", "class", "method", "variable"],
+                                "description": "Optional: Filter by symbol type"
+                            },
+                            "limit": {
+                                "type": "number",
+                                "description": "Maximum number of results (default: 10)"
+                            }
+                        },
+                        "required": ["query"]
+                    }
+                ),
+                Tool(
+                    name="batch_search",
+                    description=(
+                        "Run several independent search_code lookups in one call. "
+                        "Use instead of many separate search_code calls in a row"
+                    ),
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "queries": {
+                                "type": "array",
+                                "maxItems": 50,
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "query": {"type": "string"},
+                                        "search_type": {
+                                            "type": "string",
+                                            "enum": ["name", "content", "file", "fuzzy"]
+                                        },
+                                        "symbol_type": {
+                                            "type": "string",
+                                            "enum": ["function", "class", "method", "variable"]
+                                        },
+                                        "limit": {"type": "number"},
+                                        "cursor": {"type": "string"},
+                                        "compact": {"type": "boolean"}
+                                    },
+                                    "required": ["query"]
+                                },
+                                "description": "Searches with the same parameters as search_code (default limit: 20)"
+                            }
+                        },
+                        "required": ["queries"]
+                    }
+                ),
                 Tool(
                     name="get_search_stats",
                     description="Get statistics about the code index database",
@@ -130,19 +325,23 @@ async def main():
         @server.call_tool()
         async def handle_call_tool(name: str, arguments: dict) -> list[TextContent]:
             """Handle tool calls."""
+            nonlocal searcher
             logger.info(f"Tool called: {name} with arguments: {arguments}")
 
             try:
-                # Create searcher for each request to ensure fresh DB
-                searcher = CodeSearcher()
+                # Retried on every call until the index exists
+                if searcher is None:
+                    searcher = CodeSearcher()
 
                 if name == "search_code":
                     query = arguments.get("query", "")
                     search_type = arguments.get("search_type", "name")
                     symbol_type = arguments.get("symbol_type")
                     limit = arguments.get("limit", 50)
+                    compact = arguments.get("compact", False)
 
-                    result = searcher.search(query, search_type, symbol_type, limit)
+                    result = searcher.search(query, search_type, symbol_type, limit,
+                                             arguments.get("cursor"), compact)
 
                     # Format results for display
                     if result["success"]:
@@ -156,15 +355,24 @@ async def main():
                         if search_type == "file":
                             for item in result["results"]:
                                 output += f"- {item['file_path']} ({item['symbol_count']} symbols)\n"
+                        elif compact:
+                            for item in result["results"]:
+                                output += f"- {item['name']} ({item['type']}) `{item['location']}`\n"
                         else:
                             for item in result["results"]:
                                 output += f"## {item['name']} ({item['type']})\n"
                                 output += f"Location: `{item['location']}`\n"
                                 if item.get('signature'):
                                     output += f"Signature: `{item['signature']}`\n"
-                                if item.get('docstring'):
+                                if item.get('match'):
+                                    output += f"Match: {item['match']} (score {item['score']})\n"
+                                if item.get('snippet'):
+                                    output += f"Match: {item['snippet']}\n"
+                                elif item.get('docstring'):
                                     output += f"Docstring: {item['docstring'][:100]}...\n"
                                 output += "\n"
+                        if result.get("next_cursor"):
+                            output += f"\nMore results: call again with cursor=\"{result['next_cursor']}\"\n"
                     else:
                         output = f"Error: {result['error']}"
 
@@ -174,7 +382,9 @@ async def main():
                     symbol_type = arguments.get("symbol_type", "function")
                     limit = arguments.get("limit", 100)
 
-                    result = searcher.list_symbols(symbol_type, limit)
+                    compact = arguments.get("compact", False)
+
+                    result = searcher.list_symbols(symbol_type, limit, arguments.get("cursor"), compact)
 
                     if result["success"]:
                         output = f"# {symbol_type.title()} List\n\n"
@@ -182,8 +392,142 @@ async def main():
 
                         for item in result["results"]:
                             output += f"- **{item['name']}** in `{item['file_path']}:{item['line_number']}`\n"
-                            if item.get('signature'):
+                            if item.get('signature') and not compact:
                                 output += f"  Signature: `{item['signature']}`\n"
+                        if result.get("next_cursor"):
+                            output += f"\nMore results: call again with cursor=\"{result['next_cursor']}\"\n"
+                    else:
+                        output = f"Error: {result['error']}"
+
+                    return [TextContent(type="text", text=output)]
+
+                elif name in ("find_references", "find_callers"):
+                    ref_name = arguments.get("name", "")
+                    limit = arguments.get("limit", 100)
+
+                    if name == "find_callers":
+                        result = searcher.find_callers(ref_name, limit)
+                    else:
+                        result = searcher.find_references(ref_name, arguments.get("kind"), limit)
+
+                    if result["success"]:
+                        title = "Callers" if name == "find_callers" else "References"
+                        output = f"# {title} of `{ref_name}`\n\n"
+                        output += f"Found: {result['count']} results\n\n"
+
+                        for item in result["results"]:
+                            scope = item.get("caller") or item["scope"] or "<module>"
+                            output += f"- `{item['location']}` {item['kind']} in {scope}\n"
+                    else:
+                        output = f"Error: {result['error']}"
+
+                    return [TextContent(type="text", text=output)]
+
+                elif name in ("get_imports", "find_dependents"):
+                    target = arguments.get("target", "")
+                    limit = arguments.get("limit", 200)
+
+                    if name == "get_imports":
+                        result = searcher.get_imports(target, limit)
+                    else:
+                        result = searcher.find_dependents(target, limit)
+
+                    if not result["success"]:
+                        output = f"Error: {result['error']}"
+                    elif not result["files"]:
+                        output = f"No indexed file matches `{target}`"
+                    elif name == "get_imports":
+                        output = f"# Imports of `{target}`\n\n"
+                        output += f"Found: {result['count']} imports\n\n"
+                        for item in result["results"]:
+                            imported = item["imported_module"]
+                            if item["symbol"]:
+                                imported = f"{imported} import {item['symbol']}"
+                            resolved = f" -> `{item['resolved_path']}`" if item["resolved_path"] else ""
+                            output += f"- `{item['location']}` {imported}{resolved}\n"
+                    else:
+                        direct = sum(1 for item in result["results"] if item["direct"])
+                        output = f"# Dependents of `{target}`\n\n"
+                        output += f"Found: {result['count']} files ({direct} direct)\n\n"
+                        for item in result["results"]:
+                            output += f"- `{item['file_path']}`{' (direct)' if item['direct'] else ''}\n"
+
+                    return [TextContent(type="text", text=output)]
+
+                elif name == "get_file_symbols":
+                    file_paths = arguments.get("file_paths", [])
+                    name_pattern = arguments.get("name_pattern")
+
+                    result = searcher.search_in_files(file_paths, name_pattern, arguments.get("limit"))
+
+                    if result["success"]:
+                        output = "# File Symbols\n\n"
+                        output += f"Found: {result['count']} symbols in {len(result['files'])} files\n"
+                        for path in result["missing"]:
+                            output += f"Not indexed: `{path}`\n"
+
+                        current_file = None
+                        for item in result["results"]:
+                            if item["file_path"] != current_file:
+                                current_file = item["file_path"]
+                                output += f"\n## {current_file}\n"
+                            indent = "  " if item.get("parent") else ""
+                            output += f"{indent}- {item['line_number']}: {item['type']} **{item['name']}**"
+                            if item.get("signature"):
+                                output += f" `{item['signature']}`"
+                            output += "\n"
+                    else:
+                        output = f"Error: {result['error']}"
+
+                    return [TextContent(type="text", text=output)]
+
+                elif name == "semantic_search":
+                    query = arguments.get("query", "")
+
+                    result = searcher.semantic_search(query, arguments.get("limit", 10), arguments.get("symbol_type"))
+
+                    if result["success"]:
+                        output = "# Semantic Search Results\n\n"
+                        output += f"Query: {query}\n"
+                        output += f"Found: {result['count']} results ({result['index']} index)\n\n"
+                        for item in result["results"]:
+                            output += f"- {item['score']:.3f} **{item['name']}** ({item['type']}) `{item['location']}`"
+                            if item.get("signature"):
+                                output += f" `{item['signature']}`"
+                            output += "\n"
+                    else:
+                        output = f"Error: {result['error']}"
+
+                    return [TextContent(type="text", text=output)]
+
+                elif name == "batch_search":
+                    queries = [
+                        {"limit": 20, **spec} if isinstance(spec, dict) else spec
+                        for spec in arguments.get("queries", [])
+                    ]
+
+                    result = searcher.search_many(queries)
+
+                    if result["success"]:
+                        output = "# Batch Search Results\n"
+                        for spec, item in zip(queries, result["results"]):
+                            spec = spec if isinstance(spec, dict) else {}
+                            search_type = item.get("search_type", spec.get("search_type", "name"))
+                            output += f"\n## `{item.get('query')}` ({search_type})\n"
+                            if not item["success"]:
+                                output += f"Error: {item['error']}\n"
+                                continue
+                            output += f"Found: {item['count']} results\n"
+                            for match in item["results"]:
+                                if search_type == "file":
+                                    output += f"- {match['file_path']} ({match['symbol_count']} symbols)\n"
+                                    continue
+                                output += f"- {match['name']} ({match['type']}) `{match['location']}`"
+                                if match.get("signature") and not spec.get("compact"):
+                                    output += f" `{match['signature']}`"
+                                output += "\n"
+                            if item.get("next_cursor"):
+                                output += f"More results: cursor=\"{item['next_cursor']}\"\n"
                     else:
                         output = f"Error: {result['error']}"
 
@@ -202,6 +546,11 @@ async def main():
                         output += "\n## Symbols by Type\n"
                         for sym_type, count in stats.get('by_type', {}).items():
                             output += f"- {sym_type}: {count}\n"
+                        cache = stats.get('result_cache')
+                        if cache:
+                            output += "\n## Result Cache\n"
+                            output += f"- Hit rate: {cache['hit_rate']:.1%} ({cache['hits']} hits, {cache['misses']} misses)\n"
+                            output += f"- Entries: {cache['entries']}/{cache['max_entries']}\n"
                     else:
                         output = f"Error: {result['error']}"
 
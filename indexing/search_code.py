@@ -177,12 +177,45 @@ class CodeSearcher:
         conn.close()
         return results
 
-    def find_references(self, symbol_name: str) -> List[Tuple[str, int]]:
-        """Find potential references to a symbol (requires full text search)"""
-        # This is a placeholder - full implementation would require
-        # parsing all files and looking for uses of the symbol
-        print(f"Note: Reference search not yet implemented. Use 'rg {symbol_name}' for now.")
-        return []
+    def find_references(
+        self, symbol_name: str, kind: Optional[str] = None, limit: int = 100
+    ) -> List[Tuple[str, int]]:
+        """Find references to a symbol (calls, attribute accesses, name loads, imports)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'symbol_references'")
+        if cursor.fetchone() is None:
+            conn.close()
+            print("Note: Index has no reference data. Re-run python3 indexing/code_indexer.py to build it.")
+            return []
+
+        if kind:
+            cursor.execute(
+                """
+                SELECT DISTINCT file_path, line_number
+                FROM symbol_references
+                WHERE name = ? AND kind = ?
+                ORDER BY file_path, line_number
+                LIMIT ?
+            """,
+                (symbol_name, kind, limit),
+            )
+        else:
+            cursor.execute(
+                """
+                SELECT DISTINCT file_path, line_number
+                FROM symbol_references
+                WHERE name = ?
+                ORDER BY file_path, line_number
+                LIMIT ?
+            """,
+                (symbol_name, limit),
+            )
+
+        results = cursor.fetchall()
+        conn.close()
+        return results
 
     def get_file_symbols(self, file_path: str) -> List[SearchResult]:
         """Get all symbols in a specific file"""
@@ -242,6 +275,8 @@ def main():
     parser.add_argument("--list-classes", action="store_true", help="List all classes")
     parser.add_argument("--list-functions", action="store_true", help="List all functions")
     parser.add_argument("--file-symbols", help="List all symbols in a specific file")
+    parser.add_argument("--refs", metavar="NAME", help="List references to a name")
+    parser.add_argument("--callers", metavar="NAME", help="List call sites of a function or method")
 
     args = parser.parse_args()
 
@@ -253,6 +288,13 @@ def main():
         for result in results:
             print(f"  {result.format(show_signature=True, show_docstring=args.show_docstrings)}")
 
+    elif args.refs or args.callers:
+        name = args.refs or args.callers
+        results = searcher.find_references(name, kind="call" if args.callers else None, limit=args.limit)
+        print(f"\n{'Callers' if args.callers else 'References'} of '{name}' ({len(results)} found):")
+        for file_path, line_number in results:
+            print(f"  {file_path}:{line_number}")
+
     elif args.list_classes:
         results = searcher.search_by_type("class", limit=args.limit)
         print(f"\nClasses ({len(results)} found):")
@@ -285,6 +327,7 @@ def main():
         print("  python3 search_code.py '*_handler'        # Find all handlers")
         print("  python3 search_code.py -f sonos_server '*' # All symbols in sonos_server files")
         print("  python3 search_code.py --list-classes     # List all classes")
+        print("  python3 search_code.py --callers index_file # Where index_file is called")
 
 
 if __name__ == "__main__":
@@ -1,24 +1,118 @@
 """Code search functionality for MCP server."""
 
+import base64
+import hashlib
+import json
 import logging
 import os
+import re
 import sqlite3
+import string
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from semantic_index import VectorIndex, embeddings_path, load_encoder, normalize, require_numpy
+from symbol_matcher import SymbolNameIndex
 
 logger = logging.getLogger(__name__)
 
+# bm25 column weights for symbols_fts(name, docstring, signature, parent)
+FTS_COLUMN_WEIGHTS = (10.0, 1.0, 3.0, 2.0)
+
+# Markers wrapped around matched terms in content search snippets
+SNIPPET_START = "**"
+SNIPPET_END = "**"
+
+# Trigram indexes can only narrow LIKE patterns containing a literal run this long
+TRIGRAM_MIN_LITERAL = 3
+
+# Read-only connections kept open between queries
+DEFAULT_POOL_SIZE = 4
+
+# Compiled statements each pooled connection keeps for reuse
+STATEMENT_CACHE_SIZE = 256
+
+# Search results kept between calls, dropped whenever the index generation changes
+DEFAULT_RESULT_CACHE_SIZE = 256
+
+# index_meta key of the counter the indexer bumps on every commit that changed files
+GENERATION_KEY = "generation"
+
+# Searches paged by position in their ranking rather than by key
+RANKED_SEARCH_TYPES = ("content", "fuzzy")
+
+# Searches accepted in one search_many call
+MAX_BATCH_QUERIES = 50
+
+# Keys of a search_many query spec and their defaults
+BATCH_SPEC_DEFAULTS = {
+    "search_type": "name",
+    "symbol_type": None,
+    "limit": 50,
+    "cursor": None,
+    "compact": False,
+}
+
+# Sort key of name searches: the columns of idx_symbol_name, then the rowid every index ends with
+NAME_KEYSET = ("s.name COLLATE NOCASE", "s.file_id", "s.line_number", "s.kind", "s.id")
+
+# Most trigram candidates of a leading-wildcard name search that are fetched and sorted;
+# more than that and walking idx_symbol_name reaches limit + 1 matches sooner
+TRIGRAM_SORT_MAX = 2000
+
+# str.translate table folding ASCII letters only, as SQLite's NOCASE collation does
+ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# Names ranked per fuzzy result requested, so a symbol type filter still leaves enough rows
+FUZZY_NAME_DEPTH = 4
+
+# Neighbours fetched per semantic result requested when filtering by symbol type
+SEMANTIC_FILTER_DEPTH = 4
+
 
 class CodeSearcher:
     """Handles code search operations using the existing .code_index.db"""
 
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        result_cache_size: int = DEFAULT_RESULT_CACHE_SIZE,
+        encoder: Optional[Callable[[List[str]], Any]] = None,
+    ):
         """Initialize the code searcher.
 
         Args:
             db_path: Path to the database file. If None, searches for .code_index.db
+            pool_size: Read-only connections kept open for reuse between queries
+            result_cache_size: Search results kept for repeated queries (0 disables)
+            encoder: Function embedding semantic search queries; defaults to
+                the model the embeddings were built with, loaded on first use
         """
         self.db_path = self._find_database(db_path)
+        self.pool_size = pool_size
+        self._pool: List[sqlite3.Connection] = []
+        self._pool_key: Optional[Tuple[str, int, int]] = None
+        self._pool_lock = threading.Lock()
+        self.result_cache_size = result_cache_size
+        self._results: OrderedDict = OrderedDict()
+        self._results_generation: Optional[str] = None
+        self._results_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._generation: Optional[str] = None
+        self._generation_fingerprint: Optional[Tuple] = None
+        self._name_index = SymbolNameIndex()
+        self._name_index_key: Optional[Tuple[str, int, int]] = None
+        self._name_index_lock = threading.Lock()
+        self._vector_index: Optional[VectorIndex] = None
+        self._vector_index_key: Optional[Tuple[str, int, int]] = None
+        self._vector_lock = threading.Lock()
+        self._encoder = encoder
+        self._encoder_model: Optional[str] = None
         logger.info(f"Using database at: {self.db_path}")
 
     def _find_database(self, db_path: Optional[str] = None) -> str:
@@ -48,43 +142,308 @@ class CodeSearcher:
             "You can start it with: ./start-indexer.sh"
         )
 
+    @contextmanager
+    def _connection(self, conn: Optional[sqlite3.Connection] = None) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled read-only connection for the duration of a query.
+
+        Connections stay open between calls so their statement caches stay
+        warm; changes committed by the indexer are visible to the next read
+        without reopening. The pool is discarded when db_path changes or the
+        file is replaced (e.g. deleted and rebuilt), which the connections
+        would otherwise keep reading from.
+
+        A connection passed in by the caller (already borrowed for a batch)
+        is used as is and left open.
+        """
+        if conn is not None:
+            yield conn
+            return
+
+        stat = os.stat(self.db_path)
+        key = (self.db_path, stat.st_dev, stat.st_ino)
+        with self._pool_lock:
+            if key != self._pool_key:
+                self._close_pool()
+                self._pool_key = key
+            conn = self._pool.pop() if self._pool else None
+
+        if conn is None:
+            conn = sqlite3.connect(
+                f"{Path(self.db_path).resolve().as_uri()}?mode=ro",
+                uri=True,
+                cached_statements=STATEMENT_CACHE_SIZE,
+                check_same_thread=False,
+            )
+            conn.row_factory = sqlite3.Row
+
+        try:
+            yield conn
+        except Exception:
+            conn.close()
+            raise
+
+        with self._pool_lock:
+            if key == self._pool_key and len(self._pool) < self.pool_size:
+                self._pool.append(conn)
+                return
+        conn.close()
+
+    def _close_pool(self):
+        """Close every idle pooled connection; the caller holds the pool lock."""
+        for conn in self._pool:
+            conn.close()
+        self._pool = []
+
+    def close(self):
+        """Close the pooled connections."""
+        with self._pool_lock:
+            self._close_pool()
+            self._pool_key = None
+
+    def _index_generation(self) -> Optional[str]:
+        """Return the index generation, or None if the database does not record one.
+
+        The generation is only re-read when the database or its WAL file
+        changed on disk since the last call, so checking it between index
+        updates costs two stat calls and no query.
+        """
+        fingerprint: List[Any] = [self.db_path]
+        for path in (self.db_path, f"{self.db_path}-wal"):
+            try:
+                stat = os.stat(path)
+                fingerprint.append((stat.st_ino, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                fingerprint.append(None)
+
+        if fingerprint != self._generation_fingerprint:
+            try:
+                with self._connection() as conn:
+                    row = conn.execute("SELECT value FROM index_meta WHERE key = ?", (GENERATION_KEY,)).fetchone()
+            except (sqlite3.Error, OSError):
+                row = None
+            self._generation = row[0] if row else None
+            self._generation_fingerprint = fingerprint
+        return self._generation
+
+    def _cached_result(self, key: Tuple, generation: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return a copy of a cached result for the current generation, counting the hit or miss."""
+        with self._results_lock:
+            if generation is None or self.result_cache_size <= 0:
+                self._cache_misses += 1
+                return None
+            if generation != self._results_generation:
+                self._results.clear()
+                self._results_generation = generation
+            result = self._results.get(key)
+            if result is None:
+                self._cache_misses += 1
+                return None
+            self._results.move_to_end(key)
+            self._cache_hits += 1
+        return self._copy_result(result)
+
+    def _store_result(self, key: Tuple, generation: Optional[str], result: Dict[str, Any]):
+        """Cache a successful result computed at a generation, evicting the least recently used."""
+        if not result.get("success") or generation is None or self.result_cache_size <= 0:
+            return
+        with self._results_lock:
+            if generation != self._results_generation:
+                return
+            self._results[key] = self._copy_result(result)
+            self._results.move_to_end(key)
+            while len(self._results) > self.result_cache_size:
+                self._results.popitem(last=False)
+
+    def _cached(self, key: Tuple, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the cached result for key, computing and caching it on a miss."""
+        generation = self._index_generation()
+        result = self._cached_result(key, generation)
+        if result is None:
+            result = compute()
+            self._store_result(key, generation, result)
+        return result
+
+    @staticmethod
+    def _copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy a result deeply enough that callers can edit it without touching the cache."""
+        return {**result, "results": [dict(item) for item in result["results"]]}
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return hit and miss counts of the search result cache."""
+        with self._results_lock:
+            lookups = self._cache_hits + self._cache_misses
+            return {
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "hit_rate": self._cache_hits / lookups if lookups else 0.0,
+                "entries": len(self._results),
+                "max_entries": self.result_cache_size,
+            }
+
     def search(self, query: str, search_type: str = "name",
-               symbol_type: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+               symbol_type: Optional[str] = None, limit: int = 50,
+               cursor: Optional[str] = None, compact: bool = False) -> Dict[str, Any]:
         """Search for code symbols.
 
+        Repeated searches are answered from an LRU cache until the indexer
+        commits a change, without querying the database.
+
+        Results come in pages of at most limit. Name and file searches
+        continue from the last row of the previous page through the index
+        (keyset pagination), so every page costs the same; ranked content
+        and fuzzy searches continue from a position in the ranking.
+
         Args:
-            query: Search query (supports * and ? wildcards)
-            search_type: Type of search - 'name', 'content', or 'file'
+            query: Search query (supports * and ? wildcards, except for 'fuzzy')
+            search_type: Type of search - 'name', 'content', 'file', or 'fuzzy'
+                (abbreviations like 'gfh' or 'CodeIdx' and misspelled names,
+                ranked by score)
             symbol_type: Filter by symbol type - 'function', 'class', 'method', or 'variable'
             limit: Maximum number of results
+            cursor: next_cursor of the previous page of the same search
+            compact: Leave docstrings out of the results; they are then not
+                read from the database at all
 
         Returns:
-            Dictionary with search results
+            Dictionary with search results; next_cursor is set when more
+            results follow
+        """
+        return self._cached(
+            ("search", query, search_type, symbol_type, limit, cursor, compact),
+            lambda: self._search(query, search_type, symbol_type, limit, cursor, compact),
+        )
+
+    def search_many(self, queries: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """Run several independent searches in one read transaction.
+
+        Searches that are not cached share one pooled connection and see the
+        same snapshot of the index, so a batch costs one connection checkout
+        instead of one per search.
+
+        Args:
+            queries: Search specs, each a dict with 'query' and optionally
+                'search_type', 'symbol_type', 'limit', 'cursor' and 'compact'
+                as accepted by search()
+
+        Returns:
+            Dictionary whose results hold one search result per spec, in order;
+            an invalid spec or failing search only fails its own entry
         """
+        if len(queries) > MAX_BATCH_QUERIES:
+            return {
+                "success": False,
+                "error": f"At most {MAX_BATCH_QUERIES} queries per batch, got {len(queries)}",
+                "count": 0,
+                "results": []
+            }
+
+        generation = self._index_generation()
+        results: List[Optional[Dict[str, Any]]] = []
+        pending = []
+        for spec in queries:
+            try:
+                args = self._batch_search_args(spec)
+            except (TypeError, ValueError) as e:
+                query = spec.get("query") if isinstance(spec, dict) else None
+                results.append({"success": False, "error": str(e), "query": query})
+                continue
+            key = ("search",) + args
+            results.append(self._cached_result(key, generation))
+            if results[-1] is None:
+                pending.append((len(results) - 1, key, args))
+
+        if pending:
+            try:
+                with self._connection() as conn:
+                    conn.execute("BEGIN")
+                    try:
+                        for index, key, args in pending:
+                            results[index] = self._search(*args, conn=conn)
+                            self._store_result(key, generation, results[index])
+                    finally:
+                        conn.rollback()
+            except Exception as e:
+                logger.error(f"Batch search error: {e}")
+                return {"success": False, "error": str(e), "count": 0, "results": []}
+
+        return {"success": True, "count": len(results), "results": results}
+
+    @staticmethod
+    def _batch_search_args(spec: Any) -> Tuple:
+        """Validate a search_many spec and return its search() arguments in order."""
+        if not isinstance(spec, dict) or not isinstance(spec.get("query"), str):
+            raise ValueError("Each query must be an object with a 'query' string")
+        unknown = set(spec) - set(BATCH_SPEC_DEFAULTS) - {"query"}
+        if unknown:
+            raise ValueError(f"Unknown query keys: {', '.join(sorted(unknown))}")
+        options = {**BATCH_SPEC_DEFAULTS, **spec}
+        return (spec["query"], options["search_type"], options["symbol_type"], int(options["limit"]),
+                options["cursor"], bool(options["compact"]))
+
+    def _search(self, query: str, search_type: str, symbol_type: Optional[str], limit: int,
+                cursor: Optional[str], compact: bool,
+                conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
+        """Run a search against the database, on conn when the caller holds one."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
+            position = self._decode_cursor(cursor, query, search_type, symbol_type)
 
-            # Convert wildcards to SQL LIKE pattern
-            pattern = query.replace('*', '%').replace('?', '_')
+            with self._connection(conn) as conn:
+                if search_type == "fuzzy":
+                    results = self._search_fuzzy(conn, query, symbol_type, position + limit + 1, compact)
+                    if isinstance(results, dict):
+                        return results
+                    return self._page(query, search_type, symbol_type, limit, results[position:],
+                                      lambda page: position + len(page), ranking="fuzzy")
 
-            # Build SQL query based on search type
-            if search_type == "file":
-                sql = """
-                    SELECT DISTINCT file_path, COUNT(*) as symbol_count
-                    FROM symbols
-                    WHERE file_path LIKE ?
-                    GROUP BY file_path
-                    ORDER BY file_path
-                    LIMIT ?
-                """
-                params = [f"%{pattern}%", limit]
+                if search_type == "content":
+                    results = self._search_content_fts(conn, query, symbol_type, limit + 1, position, compact)
+                    if results is not None:
+                        return self._page(query, search_type, symbol_type, limit, results,
+                                          lambda page: position + len(page), ranking="bm25")
+
+                if search_type == "name":
+                    result = self._search_names(conn, query, symbol_type, limit, position, compact)
+                    if result is not None:
+                        return result
+
+                # Convert wildcards to SQL LIKE pattern
+                pattern = query.replace('*', '%').replace('?', '_')
+
+                # Build SQL query based on search type
+                if search_type == "file":
+                    if self._use_trigram(conn, "file_paths_trigram", pattern):
+                        path_filter = """file_path IN (
+                            SELECT file_path FROM file_hashes WHERE rowid IN (
+                                SELECT rowid FROM file_paths_trigram WHERE file_path LIKE ?))"""
+                    else:
+                        path_filter = "file_path LIKE ?"
+                    params: List[Any] = [f"%{pattern}%"]
+                    if position is not None:
+                        path_filter += " AND file_path > ?"
+                        params.append(position[0])
+                    sql = f"""
+                        SELECT DISTINCT file_path, COUNT(*) as symbol_count
+                        FROM symbols
+                        WHERE {path_filter}
+                        GROUP BY file_path
+                        ORDER BY file_path
+                        LIMIT ?
+                    """
+                    params.append(limit + 1)
+
+                    results = []
+                    for row in conn.execute(sql, params):
+                        results.append({
+                            "file_path": row["file_path"],
+                            "symbol_count": row["symbol_count"]
+                        })
+                    return self._page(query, search_type, symbol_type, limit, results,
+                                      lambda page: [page[-1]["file_path"]])
 
-            else:
                 # Use structured query building with predefined templates
-                base_query = """
+                base_query = f"""
                     SELECT name, type, file_path, line_number, column,
-                           parent, signature, docstring
+                           parent, signature{"" if compact else ", docstring"}
                     FROM symbols
                     WHERE 1=1
                 """
@@ -94,7 +453,10 @@ class CodeSearcher:
 
                 # Add search conditions based on type
                 if search_type == "name":
-                    conditions.append("name LIKE ?")
+                    if self._use_trigram(conn, "symbol_names_trigram", pattern):
+                        conditions.append("id IN (SELECT rowid FROM symbol_names_trigram WHERE name LIKE ?)")
+                    else:
+                        conditions.append("name LIKE ?")
                     params.append(pattern)
                 elif search_type == "content":
                     conditions.append("(name LIKE ? OR docstring LIKE ? OR signature LIKE ?)")
@@ -105,69 +467,707 @@ class CodeSearcher:
                     conditions.append("type = ?")
                     params.append(symbol_type)
 
+                # Continue after the last row of the previous page; LIKE content
+                # searches stand in for a ranking and page by position instead
+                keyset = search_type != "content"
+                if keyset and position is not None:
+                    conditions.append("(name, file_path, line_number, type) > (?, ?, ?, ?)")
+                    params.extend(position)
+
                 # Build final query using structured approach
                 if conditions:
                     sql = base_query + " AND " + " AND ".join(conditions)
                 else:
                     sql = base_query
 
-                sql += " ORDER BY name, file_path LIMIT ?"
-                params.append(limit)
+                sql += " ORDER BY name, file_path, line_number, type LIMIT ?"
+                params.append(limit + 1)
+                if not keyset:
+                    sql += " OFFSET ?"
+                    params.append(position)
+
+                rows = conn.execute(sql, params).fetchall()
+                results = [self._symbol_result(row, compact) for row in rows]
+
+                if keyset:
+                    def next_position(page: List[Dict[str, Any]]) -> Any:
+                        row = rows[len(page) - 1]
+                        return [row["name"], row["file_path"], row["line_number"], row["type"]]
+                else:
+                    def next_position(page: List[Dict[str, Any]]) -> Any:
+                        return position + len(page)
+
+                return self._page(query, search_type, symbol_type, limit, results, next_position)
+
+        except Exception as e:
+            logger.error(f"Search error: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "query": query,
+                "search_type": search_type
+            }
+
+    def _page(self, query: str, search_type: str, symbol_type: Optional[str], limit: int,
+              results: List[Dict[str, Any]], next_position: Callable[[List[Dict[str, Any]]], Any],
+              ranking: Optional[str] = None) -> Dict[str, Any]:
+        """Build a search result from up to limit + 1 rows, with a cursor when rows remain.
+
+        Args:
+            next_position: Returns the position after a page, from the page itself
+            ranking: Ranking reported for ranked searches
+        """
+        page = results[:limit]
+        next_cursor = None
+        if len(results) > limit and page:
+            next_cursor = self._encode_cursor(next_position(page), query, search_type, symbol_type)
+
+        result = {
+            "success": True,
+            "query": query,
+            "search_type": search_type,
+            "symbol_type": symbol_type,
+            "count": len(page),
+            "results": page,
+            "next_cursor": next_cursor,
+        }
+        if ranking:
+            result["ranking"] = ranking
+        return result
+
+    @staticmethod
+    def _cursor_scope(query: str, search_type: str, symbol_type: Optional[str]) -> str:
+        """Fingerprint of the search a cursor belongs to."""
+        return hashlib.sha1(f"{search_type}\0{symbol_type}\0{query}".encode()).hexdigest()[:12]
+
+    def _encode_cursor(self, position: Any, query: str, search_type: str, symbol_type: Optional[str]) -> str:
+        """Encode a page position as an opaque cursor tied to its search."""
+        payload = json.dumps([self._cursor_scope(query, search_type, symbol_type), position])
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def _decode_cursor(self, cursor: Optional[str], query: str, search_type: str,
+                       symbol_type: Optional[str]) -> Any:
+        """Decode a cursor into a page position.
+
+        Returns:
+            None without a cursor for keyset searches, otherwise the last key
+            of the previous page; for ranked searches the number of results
+            already returned (0 without a cursor)
+
+        Raises:
+            ValueError: If the cursor is malformed or belongs to another search
+        """
+        ranked = search_type in RANKED_SEARCH_TYPES
+        if not cursor:
+            return 0 if ranked else None
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            scope, position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+        if scope != self._cursor_scope(query, search_type, symbol_type):
+            raise ValueError("Cursor belongs to a different search; repeat the original query with it")
+        if ranked != isinstance(position, int):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        return position
+
+    @staticmethod
+    def _symbol_result(row: sqlite3.Row, compact: bool = False) -> Dict[str, Any]:
+        """Convert a symbols row to a search result, without the docstring when compact."""
+        result = {
+            "name": row["name"],
+            "type": row["type"],
+            "file_path": row["file_path"],
+            "line_number": row["line_number"],
+            "column": row["column"],
+            "parent": row["parent"],
+            "signature": row["signature"],
+            "location": f"{row['file_path']}:{row['line_number']}"
+        }
+        if not compact:
+            result["docstring"] = row["docstring"]
+        return result
+
+    def _search_content_fts(self, conn: sqlite3.Connection, query: str, symbol_type: Optional[str],
+                            limit: int, offset: int = 0,
+                            compact: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """Run a content search against the symbols_fts index.
+
+        Returns:
+            Results ranked by bm25 with highlighted snippets, or None when the
+            index is missing, unusable, or the query has no searchable terms,
+            in which case the caller falls back to LIKE scans.
+        """
+        match = self._build_fts_query(query)
+        if match is None:
+            return None
 
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'symbols_fts'").fetchone():
+            return None
+
+        weights = ", ".join(str(weight) for weight in FTS_COLUMN_WEIGHTS)
+        sql = f"""
+            SELECT s.name, s.type, s.file_path, s.line_number, s.column,
+                   s.parent, s.signature{"" if compact else ", s.docstring"},
+                   bm25(symbols_fts, {weights}) AS rank,
+                   snippet(symbols_fts, -1, ?, ?, '...', 12) AS snippet
+            FROM symbols_fts
+            JOIN symbols s ON s.id = symbols_fts.rowid
+            WHERE symbols_fts MATCH ?
+        """
+        params: List[Any] = [SNIPPET_START, SNIPPET_END, match]
+        if symbol_type:
+            sql += " AND s.type = ?"
+            params.append(symbol_type)
+        sql += " ORDER BY rank, s.name, s.id LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+
+        try:
             cursor = conn.execute(sql, params)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS content search unavailable, falling back to LIKE: {e}")
+            return None
+
+        results = []
+        for row in cursor:
+            result = self._symbol_result(row, compact)
+            result["score"] = -row["rank"]
+            result["snippet"] = row["snippet"]
+            results.append(result)
+        return results
+
+    def _search_names(self, conn: sqlite3.Connection, query: str, symbol_type: Optional[str], limit: int,
+                      position: Optional[List[Any]], compact: bool) -> Optional[Dict[str, Any]]:
+        """Page through the symbols whose names match a wildcard query, in idx_symbol_name order.
+
+        Rows come ordered by (name COLLATE NOCASE, file_id, line_number,
+        kind, id), which idx_symbol_name (or idx_symbol_kind with a type
+        filter) yields without sorting, and the last row's key is where the
+        next page starts. A literal prefix becomes a range on the index, so
+        SQLite reads little more than the limit + 1 rows it returns. Leading
+        wildcards walk the index with the LIKE filter, unless the trigram
+        index holds at most TRIGRAM_SORT_MAX candidates; those are then
+        fetched by rowid and sorted.
+
+        Returns:
+            The page, or None for databases without the normalized symbol
+            tables, which are searched through the symbols view instead
+        """
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'symbol_rows'").fetchone():
+            return None
+        if position is not None and (not isinstance(position, list) or len(position) != len(NAME_KEYSET)):
+            raise ValueError("Invalid cursor for a name search")
+
+        conditions: List[str] = []
+        params: List[Any] = []
+        if symbol_type:
+            row = conn.execute("SELECT id FROM symbol_kinds WHERE name = ?", (symbol_type,)).fetchone()
+            if row is None:
+                return self._page(query, "name", symbol_type, limit, [], lambda page: None)
+            conditions.append("s.kind = ?")
+            params.append(row[0])
+
+        prefix = re.split(r"[*?]", query, maxsplit=1)[0]
+        if prefix == query:
+            conditions.append("s.name COLLATE NOCASE = ?")
+            params.append(query)
+        else:
+            # Only * and ? are wildcards; % and _ in the query are literal
+            escaped = re.sub(r"([\\%_])", r"\\\1", query)
+            conditions.append("s.name LIKE ? ESCAPE '\\'")
+            params.append(escaped.replace("*", "%").replace("?", "_"))
+            if prefix:
+                # NOCASE folds only ASCII letters, like LIKE; the bound after the
+                # prefix is its last character plus one, once folded
+                folded = prefix.translate(ASCII_LOWER)
+                conditions.append("s.name COLLATE NOCASE >= ?")
+                params.append(folded)
+                if ord(folded[-1]) < 0xD7FF:
+                    conditions.append("s.name COLLATE NOCASE < ?")
+                    params.append(folded[:-1] + chr(ord(folded[-1]) + 1))
+            else:
+                # The trigram index has no ESCAPE; % and _ as wildcards only widen the candidates
+                candidates = query.replace("*", "%").replace("?", "_")
+                if self._use_trigram(conn, "symbol_names_trigram", candidates) and conn.execute(
+                    "SELECT COUNT(*) FROM (SELECT 1 FROM symbol_names_trigram WHERE name LIKE ? LIMIT ?)",
+                    (candidates, TRIGRAM_SORT_MAX + 1),
+                ).fetchone()[0] <= TRIGRAM_SORT_MAX:
+                    conditions.append("s.id IN (SELECT rowid FROM symbol_names_trigram WHERE name LIKE ?)")
+                    params.append(candidates)
+
+        if position is not None:
+            # SQLite does not seek an index on a row value; the bound on its first column does
+            conditions.append("s.name COLLATE NOCASE >= ?")
+            conditions.append(f"({', '.join(NAME_KEYSET)}) > ({', '.join('?' for _ in NAME_KEYSET)})")
+            params.append(position[0])
+            params.extend(position)
+
+        docstring = "" if compact else ", (SELECT docstring FROM docstrings WHERE symbol_id = s.id) AS docstring"
+        sql = f"""
+            SELECT s.id, s.name, k.name AS type, f.path AS file_path, s.line_number, s.column,
+                   s.parent, s.signature, s.file_id, s.kind{docstring}
+            FROM symbol_rows s
+            JOIN files f ON f.id = s.file_id
+            JOIN symbol_kinds k ON k.id = s.kind
+            WHERE {" AND ".join(conditions)}
+            ORDER BY {", ".join(NAME_KEYSET)}
+            LIMIT ?
+        """
+        params.append(limit + 1)
+        rows = conn.execute(sql, params).fetchall()
+
+        def next_position(page: List[Dict[str, Any]]) -> List[Any]:
+            row = rows[len(page) - 1]
+            return [row["name"], row["file_id"], row["line_number"], row["kind"], row["id"]]
+
+        return self._page(query, "name", symbol_type, limit, [self._symbol_result(row, compact) for row in rows],
+                          next_position)
+
+    def _search_fuzzy(self, conn: sqlite3.Connection, query: str, symbol_type: Optional[str],
+                      limit: int, compact: bool = False) -> Any:
+        """Rank symbols whose names are abbreviated or misspelled by the query.
+
+        Names are matched in the in-memory SymbolNameIndex, refreshed from the
+        files written since the last index generation; the symbols of the best
+        names are then read from the database in rank order, stopping as soon
+        as limit rows were read.
+
+        Returns:
+            Up to limit results, or an error result for databases without the
+            normalized symbol tables
+        """
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'symbol_rows'").fetchone():
+            return {
+                "success": False,
+                "error": "Fuzzy search needs the current index format. Re-run the code indexer.",
+                "query": query,
+                "search_type": "fuzzy"
+            }
+
+        with self._name_index_lock:
+            # File ids of a rebuilt database say nothing about the names loaded from the old one
+            if self._pool_key != self._name_index_key:
+                self._name_index = SymbolNameIndex()
+                self._name_index_key = self._pool_key
+            self._name_index.refresh(conn, self._index_generation())
+            matches = self._name_index.match(query, max(limit, 1) * FUZZY_NAME_DEPTH)
+
+        kind = None
+        if symbol_type:
+            row = conn.execute("SELECT id FROM symbol_kinds WHERE name = ?", (symbol_type,)).fetchone()
+            if row is None:
+                return []
+            kind = row[0]
+
+        # One query per name, best name first: idx_symbol_name yields each name's rows
+        # in (file_id, line_number) order, so no query reads more rows than it returns
+        docstring = "" if compact else ", (SELECT docstring FROM docstrings WHERE symbol_id = s.id) AS docstring"
+        sql = f"""
+            SELECT s.name, k.name AS type, f.path AS file_path, s.line_number, s.column,
+                   s.parent, s.signature{docstring}
+            FROM symbol_rows s
+            JOIN files f ON f.id = s.file_id
+            JOIN symbol_kinds k ON k.id = s.kind
+            WHERE s.name COLLATE NOCASE = ? AND s.name = ?{"" if kind is None else " AND s.kind = ?"}
+            ORDER BY s.name COLLATE NOCASE, s.file_id, s.line_number
+            LIMIT ?
+        """
+        results: List[Dict[str, Any]] = []
+        for match in matches:
+            if len(results) >= limit:
+                break
+            params: List[Any] = [match.name, match.name]
+            if kind is not None:
+                params.append(kind)
+            params.append(limit - len(results))
+            for row in conn.execute(sql, params):
+                result = self._symbol_result(row, compact)
+                result["score"] = match.score
+                result["match"] = match.match
+                results.append(result)
+
+        return results
+
+    def semantic_search(self, query: str, limit: int = 10,
+                        symbol_type: Optional[str] = None) -> Dict[str, Any]:
+        """Find symbols whose code or documentation matches a description.
+
+        The query is embedded with the model the indexer used for the
+        symbols (see code_indexer.py --embeddings) and compared with every
+        symbol vector in an in-memory index, which follows the indexer's
+        updates incrementally.
+
+        Args:
+            query: Natural-language description, e.g. 'hash the contents of a file'
+            limit: Maximum number of results
+            symbol_type: Filter by symbol type - 'function', 'class', 'method', or 'variable'
+
+        Returns:
+            Dictionary with results ranked by cosine similarity, each with a score
+        """
+        try:
+            require_numpy()
+            path = embeddings_path(self.db_path)
+            if not path.exists():
+                raise FileNotFoundError(
+                    f"No embeddings at {path}. Run the code indexer with --embeddings first."
+                )
+
+            conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+            try:
+                with self._vector_lock:
+                    # Row ids of a rebuilt sidecar say nothing about the vectors loaded from the old one
+                    stat = os.stat(path)
+                    key = (str(path), stat.st_dev, stat.st_ino)
+                    if self._vector_index is None or key != self._vector_index_key:
+                        self._vector_index = VectorIndex()
+                        self._vector_index_key = key
+                    index = self._vector_index
+                    index.refresh(conn)
+                    matches = []
+                    if len(index):
+                        vector = normalize(self._query_encoder(index.model)([query]))[0]
+                        matches = index.search(vector, limit * SEMANTIC_FILTER_DEPTH if symbol_type else limit)
+                    approximate = index.approximate
+
+                placeholders = ", ".join("?" for _ in matches)
+                rows = {
+                    row[0]: row
+                    for row in conn.execute(
+                        f"""SELECT id, name, type, file_path, line_number, parent, signature
+                            FROM symbol_embeddings WHERE id IN ({placeholders})""",
+                        [symbol_id for symbol_id, _ in matches],
+                    )
+                }
+            finally:
+                conn.close()
+
             results = []
+            for symbol_id, score in matches:
+                row = rows.get(symbol_id)
+                if row is None or (symbol_type and row[2] != symbol_type):
+                    continue
+                results.append({
+                    "name": row[1],
+                    "type": row[2],
+                    "file_path": row[3],
+                    "line_number": row[4],
+                    "parent": row[5],
+                    "signature": row[6],
+                    "location": f"{row[3]}:{row[4]}",
+                    "score": round(score, 4)
+                })
+                if len(results) == limit:
+                    break
+
+            return {
+                "success": True,
+                "query": query,
+                "search_type": "semantic",
+                "symbol_type": symbol_type,
+                "ranking": "cosine",
+                "index": "approximate" if approximate else "exact",
+                "count": len(results),
+                "results": results
+            }
+
+        except Exception as e:
+            logger.error(f"Semantic search error: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "query": query,
+                "search_type": "semantic"
+            }
+
+    def _query_encoder(self, model: Optional[str]) -> Callable[[List[str]], Any]:
+        """Return the encoder for queries against vectors built with model; the caller holds the vector lock."""
+        if self._encoder is None or (self._encoder_model is not None and self._encoder_model != model):
+            self._encoder = load_encoder(model) if model else load_encoder()
+            self._encoder_model = model
+        return self._encoder
 
-            if search_type == "file":
-                for row in cursor:
+    @staticmethod
+    def _use_trigram(conn: sqlite3.Connection, index_name: str, like_pattern: str) -> bool:
+        """Decide whether a LIKE pattern should be answered from a trigram index.
+
+        The trigram index returns exactly the rows LIKE would, but can only
+        narrow the search when the pattern holds at least three consecutive
+        literal characters; shorter patterns stay on the plain scan.
+        """
+        literal_runs = re.split(r"[%_]", like_pattern)
+        if max((len(run) for run in literal_runs), default=0) < TRIGRAM_MIN_LITERAL:
+            return False
+        return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (index_name,)).fetchone() is not None
+
+    @staticmethod
+    def _build_fts_query(query: str) -> Optional[str]:
+        """Convert a user query into an FTS5 MATCH expression.
+
+        Each word becomes a quoted prefix term and all terms must match, so
+        'parse conf*' finds symbols mentioning words starting with 'parse'
+        and 'conf'. Returns None when the query has no words (e.g. '*').
+        """
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return None
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def find_references(self, name: str, kind: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+        """Find every recorded use of a name.
+
+        Answers from the symbol_references index built by the indexer, so
+        lookups cost one indexed query instead of a grep over the tree.
+
+        Args:
+            name: Exact name to look up - a function, class, attribute or
+                variable name, or a dotted module name for imports
+            kind: Optional filter - 'call', 'attribute', 'name', or 'import'
+            limit: Maximum number of results
+
+        Returns:
+            Dictionary with reference locations and the enclosing scope of each
+        """
+        try:
+            with self._connection() as conn:
+                if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'symbol_references'").fetchone():
+                    return {
+                        "success": False,
+                        "error": "Reference index not found. Re-run the code indexer to build it.",
+                        "name": name,
+                        "kind": kind
+                    }
+
+                sql = """
+                    SELECT name, kind, file_path, line_number, column, scope
+                    FROM symbol_references
+                    WHERE name = ?
+                """
+                params: List[Any] = [name]
+                if kind:
+                    sql += " AND kind = ?"
+                    params.append(kind)
+                sql += " ORDER BY file_path, line_number, column LIMIT ?"
+                params.append(limit)
+
+                results = []
+                for row in conn.execute(sql, params):
                     results.append({
+                        "name": row["name"],
+                        "kind": row["kind"],
                         "file_path": row["file_path"],
-                        "symbol_count": row["symbol_count"]
+                        "line_number": row["line_number"],
+                        "column": row["column"],
+                        "scope": row["scope"],
+                        "location": f"{row['file_path']}:{row['line_number']}"
                     })
-            else:
-                for row in cursor:
+
+                return {
+                    "success": True,
+                    "name": name,
+                    "kind": kind,
+                    "count": len(results),
+                    "results": results
+                }
+
+        except Exception as e:
+            logger.error(f"Reference search error: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "name": name,
+                "kind": kind
+            }
+
+    def find_callers(self, name: str, limit: int = 100) -> Dict[str, Any]:
+        """Find the call sites of a function or method.
+
+        Args:
+            name: Name of the called function or method (without its class)
+            limit: Maximum number of results
+
+        Returns:
+            Dictionary with call sites; each result's 'caller' is the dotted
+            name of the calling function, or '<module>' for top-level calls
+        """
+        result = self.find_references(name, kind="call", limit=limit)
+        for item in result.get("results", []):
+            item["caller"] = item["scope"] or "<module>"
+        return result
+
+    def get_imports(self, target: str, limit: int = 200) -> Dict[str, Any]:
+        """List what a module imports, resolved to indexed files where possible.
+
+        Args:
+            target: Indexed file path, path suffix (e.g. 'indexing/code_indexer.py'),
+                or dotted module name
+            limit: Maximum number of results
+
+        Returns:
+            Dictionary with one result per imported module or name; resolved_path
+            is None for imports outside the index (stdlib, third-party)
+        """
+        try:
+            with self._connection() as conn:
+                files = self._resolve_module_files(conn, target)
+                if files is None:
+                    return self._missing_import_index(target)
+
+                placeholders = ", ".join("?" for _ in files)
+                sql = f"""
+                    SELECT i.file_path, i.imported_module, i.symbol, i.line_number,
+                           COALESCE(
+                               (SELECT file_path FROM modules WHERE module = i.target ORDER BY rank LIMIT 1),
+                               (SELECT file_path FROM modules WHERE module = i.imported_module ORDER BY rank LIMIT 1)
+                           ) AS resolved_path
+                    FROM imports i
+                    WHERE i.file_path IN ({placeholders})
+                    ORDER BY i.file_path, i.line_number
+                    LIMIT ?
+                """
+
+                results = []
+                for row in conn.execute(sql, [*files, limit]):
                     results.append({
-                        "name": row["name"],
-                        "type": row["type"],
                         "file_path": row["file_path"],
+                        "imported_module": row["imported_module"],
+                        "symbol": row["symbol"],
                         "line_number": row["line_number"],
-                        "column": row["column"],
-                        "parent": row["parent"],
-                        "signature": row["signature"],
-                        "docstring": row["docstring"],
+                        "resolved_path": row["resolved_path"],
                         "location": f"{row['file_path']}:{row['line_number']}"
                     })
 
-            conn.close()
+                return {
+                    "success": True,
+                    "target": target,
+                    "files": files,
+                    "count": len(results),
+                    "results": results
+                }
 
+        except Exception as e:
+            logger.error(f"Import lookup error: {e}")
             return {
-                "success": True,
-                "query": query,
-                "search_type": search_type,
-                "symbol_type": symbol_type,
-                "count": len(results),
-                "results": results
+                "success": False,
+                "error": str(e),
+                "target": target
             }
 
+    def find_dependents(self, target: str, limit: int = 200) -> Dict[str, Any]:
+        """Find every indexed file that imports a module directly or transitively.
+
+        The reverse import closure is computed by one recursive query that
+        walks from the target's module names to the imports of them, so
+        cycles terminate and each file is visited once.
+
+        Args:
+            target: Indexed file path, path suffix, or dotted module name
+            limit: Maximum number of results
+
+        Returns:
+            Dictionary of dependent files; direct importers come first and are
+            flagged with direct=True
+        """
+        try:
+            with self._connection() as conn:
+                files = self._resolve_module_files(conn, target)
+                if files is None:
+                    return self._missing_import_index(target)
+
+                # Each step follows imports of a file's module names, counting only the
+                # best-ranked file for each name so a bare 'utils' does not match every utils.py
+                placeholders = ", ".join("?" for _ in files)
+                sql = f"""
+                    WITH RECURSIVE dependents(file_path) AS (
+                        SELECT file_path FROM modules WHERE file_path IN ({placeholders})
+                        UNION
+                        SELECT i.file_path
+                        FROM dependents d
+                        JOIN modules m ON m.file_path = d.file_path
+                        JOIN imports i ON i.target = m.module OR i.imported_module = m.module
+                        WHERE m.rank = (SELECT MIN(rank) FROM modules WHERE module = m.module)
+                    ),
+                    direct(file_path) AS (
+                        SELECT i.file_path
+                        FROM modules m
+                        JOIN imports i ON i.target = m.module OR i.imported_module = m.module
+                        WHERE m.file_path IN ({placeholders})
+                          AND m.rank = (SELECT MIN(rank) FROM modules WHERE module = m.module)
+                    )
+                    SELECT file_path, file_path IN (SELECT file_path FROM direct) AS is_direct
+                    FROM dependents
+                    WHERE file_path NOT IN ({placeholders})
+                    ORDER BY is_direct DESC, file_path
+                    LIMIT ?
+                """
+
+                results = []
+                for row in conn.execute(sql, [*files, *files, *files, limit]):
+                    results.append({"file_path": row["file_path"], "direct": bool(row["is_direct"])})
+
+                return {
+                    "success": True,
+                    "target": target,
+                    "files": files,
+                    "count": len(results),
+                    "results": results
+                }
+
         except Exception as e:
-            logger.error(f"Search error: {e}")
+            logger.error(f"Dependents lookup error: {e}")
             return {
                 "success": False,
                 "error": str(e),
-                "query": query,
-                "search_type": search_type
+                "target": target
             }
 
-    def list_symbols(self, symbol_type: str, limit: int = 100) -> Dict[str, Any]:
+    @staticmethod
+    def _resolve_module_files(conn: sqlite3.Connection, target: str) -> Optional[List[str]]:
+        """Map a file path, path suffix or module name to indexed file paths.
+
+        Returns:
+            Matching file paths (possibly empty), or None when the database
+            has no import graph.
+        """
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'modules'").fetchone():
+            return None
+
+        rows = conn.execute("SELECT DISTINCT file_path FROM modules WHERE file_path = ?", (target,)).fetchall()
+        if not rows:
+            rows = conn.execute("""
+                SELECT file_path FROM modules
+                WHERE module = ? AND rank = (SELECT MIN(rank) FROM modules WHERE module = ?)
+            """, (target, target)).fetchall()
+        if not rows:
+            rows = conn.execute(
+                "SELECT DISTINCT file_path FROM modules WHERE file_path LIKE ?", (f"%/{target.lstrip('/')}",)
+            ).fetchall()
+        return sorted(row[0] for row in rows)
+
+    @staticmethod
+    def _missing_import_index(target: str) -> Dict[str, Any]:
+        """Error result for databases built before imports were indexed."""
+        return {
+            "success": False,
+            "error": "Import graph not found. Re-run the code indexer to build it.",
+            "target": target
+        }
+
+    def list_symbols(self, symbol_type: str, limit: int = 100,
+                     cursor: Optional[str] = None, compact: bool = False) -> Dict[str, Any]:
         """List all symbols of a specific type.
 
         Args:
             symbol_type: Type of symbol - 'function', 'class', 'method', or 'variable'
             limit: Maximum number of results
+            cursor: next_cursor of the previous page
+            compact: Leave docstrings out of the results
 
         Returns:
             Dictionary with symbol list
         """
-        return self.search("*", search_type="name", symbol_type=symbol_type, limit=limit)
+        return self.search("*", search_type="name", symbol_type=symbol_type, limit=limit,
+                           cursor=cursor, compact=compact)
 
     def get_stats(self) -> Dict[str, Any]:
         """Get database statistics.
@@ -176,38 +1176,55 @@ class CodeSearcher:
             Dictionary with database stats
         """
         try:
-            conn = sqlite3.connect(self.db_path)
+            with self._connection() as conn:
+                stats = {}
 
-            stats = {}
+                # Indexes built with maintained counters answer without scanning
+                counted = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'index_counters'"
+                ).fetchone()
 
-            # Total symbols
-            cursor = conn.execute("SELECT COUNT(*) FROM symbols")
-            stats["total_symbols"] = cursor.fetchone()[0]
+                if counted:
+                    cursor = conn.execute("SELECT name, symbol_count FROM symbol_kinds WHERE symbol_count > 0")
+                    stats["by_type"] = {row[0]: row[1] for row in cursor}
+                    stats["total_symbols"] = sum(stats["by_type"].values())
+                    cursor = conn.execute("SELECT value FROM index_counters WHERE name = 'files'")
+                    stats["total_files"] = cursor.fetchone()[0]
+                    cursor = conn.execute("""
+                        SELECT COALESCE(
+                            (SELECT value FROM index_meta WHERE key = 'last_indexed'),
+                            (SELECT MAX(last_modified) FROM file_hashes)
+                        )
+                    """)
+                else:
+                    # Total symbols
+                    cursor = conn.execute("SELECT COUNT(*) FROM symbols")
+                    stats["total_symbols"] = cursor.fetchone()[0]
 
-            # Symbols by type
-            cursor = conn.execute("""
-                SELECT type, COUNT(*) as count
-                FROM symbols
-                GROUP BY type
-            """)
-            stats["by_type"] = {row[0]: row[1] for row in cursor}
+                    # Symbols by type
+                    cursor = conn.execute("""
+                        SELECT type, COUNT(*) as count
+                        FROM symbols
+                        GROUP BY type
+                    """)
+                    stats["by_type"] = {row[0]: row[1] for row in cursor}
 
-            # Total files
-            cursor = conn.execute("SELECT COUNT(DISTINCT file_path) FROM symbols")
-            stats["total_files"] = cursor.fetchone()[0]
+                    # Total files
+                    cursor = conn.execute("SELECT COUNT(DISTINCT file_path) FROM symbols")
+                    stats["total_files"] = cursor.fetchone()[0]
 
-            # Get last indexed time from symbols table
-            cursor = conn.execute("SELECT MAX(indexed_at) FROM symbols")
-            row = cursor.fetchone()
-            if row and row[0]:
-                stats["last_indexed"] = row[0]
+                    # Get last indexed time
+                    cursor = conn.execute("SELECT MAX(indexed_at) FROM symbols")
+                row = cursor.fetchone()
+                if row and row[0]:
+                    stats["last_indexed"] = row[0]
 
-            conn.close()
+                stats["result_cache"] = self.cache_stats()
 
-            return {
-                "success": True,
-                "stats": stats
-            }
+                return {
+                    "success": True,
+                    "stats": stats
+                }
 
         except Exception as e:
             logger.error(f"Stats error: {e}")
@@ -233,6 +1250,9 @@ class CodeSearcher:
     def search_by_content(self, query: str, symbol_type: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
         """Search for symbols by content (name, docstring, signature).
 
+        Uses the FTS5 index with bm25 relevance ranking when the database has
+        one, otherwise falls back to LIKE scans sorted by name.
+
         Args:
             query: Search query (supports * and ? wildcards)
             symbol_type: Filter by symbol type - 'function', 'class', 'method', or 'variable'
@@ -266,24 +1286,119 @@ class CodeSearcher:
         Returns:
             Dictionary with search results
         """
-        # Search by content and filter by file path
-        if name_pattern:
-            query = name_pattern
-        else:
-            query = "*"  # Match all symbols in the file
+        return self.search_in_files([file_path], name_pattern, limit)
 
-        result = self.search(query, "content", None, limit)
+    def search_in_files(self, file_paths: Sequence[str], name_pattern: Optional[str] = None,
+                        limit: Optional[int] = None) -> Dict[str, Any]:
+        """Return the symbols of one or more files in source order.
 
-        if result.get("success") and result.get("results"):
-            # Filter results to only include symbols from the specified file
-            filtered_results = [
-                r for r in result["results"]
-                if r.get("file_path") == file_path
-            ]
-            result["results"] = filtered_results
-            result["count"] = len(filtered_results)
+        Only the requested files are read, through the (file_id, line_number)
+        prefix of the symbol rows' unique index, so the result never depends
+        on how many symbols other files have.
 
-        return result
+        Args:
+            file_paths: Indexed file paths or path suffixes (e.g. 'indexing/code_indexer.py');
+                a suffix matching several files returns all of them
+            name_pattern: Optional name filter; * and ? are wildcards, a pattern
+                without them matches names containing it
+            limit: Maximum number of results, None for every symbol
+
+        Returns:
+            Dictionary with results ordered by file then line, the matched
+            files, and the requested paths that matched no indexed file
+        """
+        if isinstance(file_paths, str):
+            file_paths = [file_paths]
+        paths = tuple(file_paths)
+        return self._cached(
+            ("files", paths, name_pattern, limit),
+            lambda: self._search_in_files(paths, name_pattern, limit),
+        )
+
+    def _search_in_files(self, file_paths: Sequence[str], name_pattern: Optional[str],
+                         limit: Optional[int]) -> Dict[str, Any]:
+        """Run a file-scoped symbol query against the database."""
+        try:
+            with self._connection() as conn:
+                files, missing = self._resolve_files(conn, file_paths)
+
+                results = []
+                if files:
+                    placeholders = ", ".join("?" for _ in files)
+                    sql = f"""
+                        SELECT name, type, file_path, line_number, column,
+                               parent, signature, docstring
+                        FROM symbols
+                        WHERE file_path IN ({placeholders})
+                    """
+                    params: List[Any] = list(files)
+                    if name_pattern:
+                        pattern = name_pattern.replace('*', '%').replace('?', '_')
+                        if pattern == name_pattern:
+                            pattern = f"%{pattern}%"
+                        sql += " AND name LIKE ?"
+                        params.append(pattern)
+                    sql += " ORDER BY file_path, line_number, column"
+                    if limit is not None:
+                        sql += " LIMIT ?"
+                        params.append(limit)
+
+                    for row in conn.execute(sql, params):
+                        results.append({
+                            "name": row["name"],
+                            "type": row["type"],
+                            "file_path": row["file_path"],
+                            "line_number": row["line_number"],
+                            "column": row["column"],
+                            "parent": row["parent"],
+                            "signature": row["signature"],
+                            "docstring": row["docstring"],
+                            "location": f"{row['file_path']}:{row['line_number']}"
+                        })
+
+                return {
+                    "success": True,
+                    "files": files,
+                    "missing": missing,
+                    "name_pattern": name_pattern,
+                    "count": len(results),
+                    "results": results
+                }
+
+        except Exception as e:
+            logger.error(f"File symbol lookup error: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "files": list(file_paths)
+            }
+
+    @staticmethod
+    def _resolve_files(conn: sqlite3.Connection, file_paths: Sequence[str]) -> Tuple[List[str], List[str]]:
+        """Map file paths or path suffixes to indexed file paths.
+
+        Returns:
+            The matching indexed paths, and the requested paths matching none
+        """
+        normalized = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'files'").fetchone()
+        if normalized:
+            exact_sql = "SELECT path FROM files WHERE path = ?"
+            suffix_sql = "SELECT path FROM files WHERE path LIKE ?"
+        else:
+            exact_sql = "SELECT DISTINCT file_path FROM symbols WHERE file_path = ?"
+            suffix_sql = "SELECT DISTINCT file_path FROM symbols WHERE file_path LIKE ?"
+
+        files: Dict[str, None] = {}
+        missing = []
+        for path in file_paths:
+            rows = conn.execute(exact_sql, (path,)).fetchall()
+            if not rows:
+                suffix = path[2:] if path.startswith("./") else path.lstrip("/")
+                rows = conn.execute(suffix_sql, (f"%/{suffix}",)).fetchall()
+            if not rows:
+                missing.append(path)
+            files.update((row[0], None) for row in rows)
+        return sorted(files), missing
 
     def get_file_symbols(self, file_path: str) -> Dict[str, Any]:
         """Get all symbols from a specific file.
@@ -294,7 +1409,7 @@ class CodeSearcher:
         Returns:
             Dictionary with search results
         """
-        return self.search_in_file(file_path)
+        return self.search_in_files([file_path])
 
     def search_by_type(self, symbol_type: str, limit: int = 50) -> Dict[str, Any]:
         """Search for symbols by type only (alias for list_symbols).
@@ -0,0 +1,231 @@
+# RULE #0: MANDATORY FIRST ACTION FOR EVERY REQUEST
+# 1. Read CLAUDE.md COMPLETELY before responding
+# 2. Setup Python venv: [ -d "venv" ] || ./setup-venv.sh && source venv/bin/activate
+# 3. Search for rules related to the request
+# 4. Only proceed after confirming no violations
+# Failure to follow Rule #0 has caused real harm. Check BEFORE acting, not AFTER making mistakes.
+#
+# GUARDS ARE SAFETY EQUIPMENT - WHEN THEY FIRE, FIX THE PROBLEM THEY FOUND
+# NEVER weaken, disable, or bypass guards - they prevent real harm
+
+"""Shared os.scandir-based directory walker for every scanner.
+
+Excluded and gitignored directories are pruned before they are entered, so
+node_modules or .venv trees cost one directory entry instead of a full
+traversal. Files are yielded as os.DirEntry objects, whose type checks come
+from the directory listing itself and whose stat() result is cached.
+"""
+
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Collection, Iterator, List, NamedTuple, Optional, Pattern, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Directory names never worth descending into
+DEFAULT_EXCLUDED_DIRS = frozenset({".git", "node_modules", "venv", ".venv", "__pycache__"})
+
+
+class IgnoreRule(NamedTuple):
+    """One parsed .gitignore pattern."""
+
+    regex: Pattern
+    negated: bool
+    dir_only: bool
+    base: str  # Directory holding the .gitignore, relative to the walk root ('' for the root)
+
+
+# Directory waiting to be scanned: (absolute path, path relative to the walk root, rules in effect)
+PendingDir = Tuple[str, str, List[IgnoreRule]]
+
+
+def _glob_to_regex(glob: str) -> str:
+    """Translate a gitignore glob into a regex body where '*' stops at '/'."""
+    parts = []
+    i = 0
+    while i < len(glob):
+        char = glob[i]
+        if glob.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+            continue
+        if glob.startswith("**", i):
+            parts.append(".*")
+            i += 2
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[" and "]" in glob[i + 1 :]:
+            end = glob.index("]", i + 1)
+            char_class = glob[i + 1 : end].replace("\\", "\\\\")
+            if char_class.startswith("!"):
+                char_class = "^" + char_class[1:]
+            parts.append(f"[{char_class}]")
+            i = end
+        elif char == "\\" and i + 1 < len(glob):
+            i += 1
+            parts.append(re.escape(glob[i]))
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return "".join(parts)
+
+
+def parse_gitignore(text: str, base: str = "") -> List[IgnoreRule]:
+    """Parse the contents of a .gitignore file.
+
+    Args:
+        text: File contents.
+        base: Directory of the .gitignore relative to the walk root.
+    """
+    rules = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+
+        negated = line.startswith("!")
+        if negated or line.startswith("\\"):
+            line = line[1:]
+
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+
+        # A slash anywhere but the end anchors the pattern to the .gitignore's directory
+        anchored = "/" in line
+        prefix = "" if anchored else "(?:.*/)?"
+        regex = re.compile(prefix + _glob_to_regex(line.lstrip("/")))
+        rules.append(IgnoreRule(regex=regex, negated=negated, dir_only=dir_only, base=base))
+    return rules
+
+
+def is_ignored(rel_path: str, is_dir: bool, rules: List[IgnoreRule]) -> bool:
+    """Check a path relative to the walk root against gitignore rules; the last match wins."""
+    ignored = False
+    for rule in rules:
+        if rule.dir_only and not is_dir:
+            continue
+        path = rel_path
+        if rule.base:
+            if not rel_path.startswith(rule.base + "/"):
+                continue
+            path = rel_path[len(rule.base) + 1 :]
+        if rule.regex.fullmatch(path):
+            ignored = not rule.negated
+    return ignored
+
+
+def _load_gitignore(path: str, base: str) -> List[IgnoreRule]:
+    """Read and parse one .gitignore file, returning no rules if it is unreadable."""
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return parse_gitignore(f.read(), base)
+    except OSError as e:
+        logger.warning(f"Could not read {path}: {e}")
+        return []
+
+
+def scan_dir(
+    pending: PendingDir,
+    extensions: Optional[Collection[str]],
+    excluded_dirs: Collection[str],
+    use_gitignore: bool,
+) -> Tuple[List[os.DirEntry], List[PendingDir]]:
+    """List one directory, returning its wanted files and the subdirectories to descend into.
+
+    The .gitignore of the directory is read here and added to the rules
+    handed down to its subdirectories, so any directory of a walk can be
+    listed again on its own from the PendingDir it was reached with.
+    """
+    path, rel_dir, rules = pending
+    try:
+        with os.scandir(path) as iterator:
+            entries = list(iterator)
+    except OSError as e:
+        logger.warning(f"Cannot scan {path}: {e}")
+        return [], []
+
+    if use_gitignore:
+        for entry in entries:
+            if entry.name == ".gitignore" and entry.is_file():
+                rules = rules + _load_gitignore(entry.path, rel_dir)
+
+    files = []
+    subdirs = []
+    for entry in entries:
+        rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+        try:
+            # Symlinked directories are not followed, which also rules out cycles
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in excluded_dirs or (rules and is_ignored(rel_path, True, rules)):
+                    continue
+                subdirs.append((entry.path, rel_path, rules))
+                continue
+
+            if extensions is not None and os.path.splitext(entry.name)[1] not in extensions:
+                continue
+            if rules and is_ignored(rel_path, False, rules):
+                continue
+            if entry.is_file():
+                files.append(entry)
+        except OSError as e:
+            logger.debug(f"Skipping {entry.path}: {e}")
+
+    return files, subdirs
+
+
+def _walk_tree(
+    start: PendingDir,
+    extensions: Optional[Collection[str]],
+    excluded_dirs: Collection[str],
+    use_gitignore: bool,
+) -> Iterator[os.DirEntry]:
+    """Depth-first walk from one directory without recursion."""
+    stack = [start]
+    while stack:
+        files, subdirs = scan_dir(stack.pop(), extensions, excluded_dirs, use_gitignore)
+        yield from files
+        stack.extend(reversed(subdirs))
+
+
+def walk_files(
+    root: Union[str, os.PathLike],
+    extensions: Optional[Collection[str]] = None,
+    excluded_dirs: Collection[str] = DEFAULT_EXCLUDED_DIRS,
+    use_gitignore: bool = True,
+    threads: int = 1,
+) -> Iterator[os.DirEntry]:
+    """Yield every file under root, pruning excluded and gitignored directories.
+
+    Args:
+        root: Directory to walk.
+        extensions: File suffixes to yield (e.g. {'.py'}), or None for all files.
+        excluded_dirs: Directory names that are never entered.
+        use_gitignore: Honour .gitignore files in root and every visited directory.
+        threads: Walk each top-level directory in its own thread when greater
+            than 1. Files of one top-level directory are yielded together, in
+            top-level directory order.
+
+    Yields:
+        os.DirEntry objects for regular files (and symlinks to them).
+    """
+    start = (os.fspath(root), "", [])
+    if threads <= 1:
+        yield from _walk_tree(start, extensions, excluded_dirs, use_gitignore)
+        return
+
+    files, subdirs = scan_dir(start, extensions, excluded_dirs, use_gitignore)
+    yield from files
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [
+            executor.submit(lambda subdir: list(_walk_tree(subdir, extensions, excluded_dirs, use_gitignore)), subdir)
+            for subdir in subdirs
+        ]
+        for future in futures:
+            yield from future.result()
@@ -20,6 +20,8 @@ import re
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from directory_walker import walk_files
+
 logger = logging.getLogger(__name__)
 
 
@@ -110,33 +112,25 @@ class FileCollector:
         return self.collected_files
 
     def _collect_recursive(self, path: Path, gitignore_patterns: List[str]) -> None:
-        """Recursively collect files from directory."""
+        """Collect files under a directory, pruning excluded and gitignored subtrees."""
         try:
-            for item in path.iterdir():
-                if item.is_dir():
-                    # Skip excluded directories
-                    if item.name in self.EXCLUDED_DIRS:
-                        logger.debug(f"Skipping excluded directory: {item}")
-                        continue
-
-                    # Check gitignore
-                    if self._matches_gitignore(item, gitignore_patterns):
-                        logger.debug(f"Skipping gitignored directory: {item}")
-                        continue
-
-                    # Recurse into subdirectory
-                    self._collect_recursive(item, gitignore_patterns)
-
-                elif item.is_file():
-                    self._process_file(item, gitignore_patterns)
-
+            for entry in walk_files(path, excluded_dirs=self.EXCLUDED_DIRS):
+                self._process_file(Path(entry.path), gitignore_patterns, entry)
         except PermissionError:
             logger.warning(f"Permission denied accessing: {path}")
         except Exception as e:
             logger.error(f"Error processing {path}: {e}")
 
-    def _process_file(self, file_path: Path, gitignore_patterns: List[str]) -> None:
-        """Process a single file."""
+    def _process_file(
+        self, file_path: Path, gitignore_patterns: List[str], entry: Optional[os.DirEntry] = None
+    ) -> None:
+        """Process a single file.
+
+        Args:
+            file_path: File to collect.
+            gitignore_patterns: Patterns from the scanned directory's .gitignore.
+            entry: Directory entry from the walk, whose cached stat avoids a syscall.
+        """
         # Check if file should be included
         if not self._should_include_file(file_path):
             return
@@ -148,7 +142,8 @@ class FileCollector:
 
         # Check file size
         try:
-            if file_path.stat().st_size > self.max_file_size:
+            size = entry.stat().st_size if entry is not None else file_path.stat().st_size
+            if size > self.max_file_size:
                 self.skipped_files.append(f"{file_path} (too large)")
                 logger.debug(f"Skipping large file: {file_path}")
                 return
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# RULE #0: MANDATORY FIRST ACTION FOR EVERY REQUEST
+# 1. Read CLAUDE.md COMPLETELY before responding
+# 2. Setup Python venv: [ -d "venv" ] || ./setup-venv.sh && source venv/bin/activate
+# 3. Search for rules related to the request
+# 4. Only proceed after confirming no violations
+# Failure to follow Rule #0 has caused real harm. Check BEFORE acting, not AFTER making mistakes.
+#
+# GUARDS ARE SAFETY EQUIPMENT - WHEN THEY FIRE, FIX THE PROBLEM THEY FOUND
+# NEVER weaken, disable, or bypass guards - they prevent real harm
+
+"""Prometheus-style metrics and the health server of the indexer daemons.
+
+Counters, gauges and histograms are registered on a MetricsRegistry, by
+default the module-level REGISTRY, where the code that records them is
+defined. start_health_server() answers ``/health`` with "OK", or with
+JSON details when given a status function, and ``/metrics`` with every
+registered metric in the Prometheus text exposition format. The server handles each request on its own thread, so a
+slow scrape never holds up indexing or health checks.
+
+Shared by the code index watcher and the duplicate prevention watcher; no
+client library is required.
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds for latency histograms
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds for histograms of item counts, such as files per transaction
+SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value the way Prometheus writes it."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Format a label set, escaping values."""
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Metric:
+    """Base class holding the name, help text and lock of a metric."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        """Return label values in declaration order, rejecting unknown or missing labels."""
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """Return (suffixed name, formatted labels, value) of every sample."""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        """Return the exposition lines of this metric."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples())
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing count, optionally split by labels."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple[str, ...], float] = {} if labels else {(): 0.0}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        """Add a non-negative amount to the count of a label set."""
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Return the current count of a label set."""
+        with self._lock:
+            return self._values.get(self._label_values(labels), 0.0)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            return [
+                (self.name, _format_labels(self.label_names, key), value) for key, value in sorted(self._values.items())
+            ]
+
+
+class Gauge(Metric):
+    """Value that goes up and down, either set directly or read from a function at scrape time."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, help_text: str, function: Optional[Callable[[], float]] = None):
+        super().__init__(name, help_text)
+        self.function = function
+        self._value = 0.0
+
+    def set(self, value: float):
+        """Set the gauge to a value."""
+        with self._lock:
+            self._value = float(value)
+
+    def set_to_current_time(self):
+        """Set the gauge to the current Unix time."""
+        self.set(time.time())
+
+    def value(self) -> float:
+        """Return the current value, calling the function if one is attached."""
+        if self.function is not None:
+            return float(self.function())
+        with self._lock:
+            return self._value
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        return [(self.name, "", self.value())]
+
+
+class Histogram(Metric):
+    """Distribution of observed values over fixed cumulative buckets."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * len(self.buckets)
+        self._sum = 0.0
+        self._count = 0
+
+    def observe(self, value: float):
+        """Record one observation."""
+        with self._lock:
+            self._sum += value
+            self._count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+                    break
+
+    def time(self) -> "_Timer":
+        """Return a context manager that observes the seconds spent inside it."""
+        return _Timer(self)
+
+    @property
+    def count(self) -> int:
+        """Number of observations so far."""
+        with self._lock:
+            return self._count
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            samples = []
+            cumulative = 0
+            for bound, count in zip(self.buckets, self._counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", _format_labels(("le",), (_format_value(bound),)), cumulative))
+            samples.append((f"{self.name}_bucket", '{le="+Inf"}', self._count))
+            samples.append((f"{self.name}_sum", "", self._sum))
+            samples.append((f"{self.name}_count", "", self._count))
+            return samples
+
+
+class _Timer:
+    """Context manager behind Histogram.time()."""
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class RateMeter:
+    """Events per second over a sliding window, kept in one-second buckets."""
+
+    def __init__(self, window: int = 60, clock: Callable[[], float] = time.monotonic):
+        self.window = max(1, window)
+        self._clock = clock
+        self._buckets: deque[List[float]] = deque()
+        self._lock = threading.Lock()
+
+    def mark(self, count: int = 1):
+        """Record events happening now."""
+        second = int(self._clock())
+        with self._lock:
+            if self._buckets and self._buckets[-1][0] == second:
+                self._buckets[-1][1] += count
+            else:
+                self._buckets.append([second, count])
+            self._expire(second)
+
+    def rate(self) -> float:
+        """Return the average events per second over the window."""
+        with self._lock:
+            self._expire(int(self._clock()))
+            return sum(count for _, count in self._buckets) / self.window
+
+    def _expire(self, now: int):
+        """Drop buckets older than the window."""
+        while self._buckets and self._buckets[0][0] <= now - self.window:
+            self._buckets.popleft()
+
+
+class MetricsRegistry:
+    """Named metrics rendered together for a scrape.
+
+    Registering a name again returns the existing metric, so modules and
+    repeated setup code can declare what they record without coordination.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is None:
+                self._metrics[metric.name] = metric
+                return metric
+            if type(existing) is not type(metric):
+                raise ValueError(f"Metric {metric.name} is already registered as a {existing.type_name}")
+            return existing
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        """Register or return a counter."""
+        return self._register(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, function: Optional[Callable[[], float]] = None) -> Gauge:
+        """Register or return a gauge; a given function replaces the one attached before."""
+        gauge = self._register(Gauge(name, help_text))
+        if function is not None:
+            gauge.function = function
+        return gauge
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        """Register or return a histogram."""
+        return self._register(Histogram(name, help_text, buckets))
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                # A failing gauge function must not take the other metrics down
+                logger.warning(f"Could not collect metric {metric.name}: {e}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class HealthCheckHandler(BaseHTTPRequestHandler):
+    """HTTP handler for /health and /metrics."""
+
+    registry = REGISTRY
+    status: Optional[Callable[[], Dict]] = None
+
+    def do_GET(self):
+        if self.path == "/health" and self.status is not None:
+            body = {"status": "ok"}
+            body.update(type(self).status())
+            self._reply(json.dumps(body).encode("utf-8"), "application/json")
+        elif self.path == "/health":
+            self._reply(b"OK", "text/plain")
+        elif self.path == "/metrics":
+            self._reply(self.registry.render().encode("utf-8"), CONTENT_TYPE)
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+    def _reply(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Suppress health check and scrape logs
+        if "/health" not in args[0] and "/metrics" not in args[0]:
+            super().log_message(format, *args)
+
+
+def make_health_server(
+    port: int = 9999, registry: MetricsRegistry = REGISTRY, status: Optional[Callable[[], Dict]] = None
+) -> ThreadingHTTPServer:
+    """Create the threaded health and metrics server without starting it.
+
+    Args:
+        port: Port to listen on; 0 picks a free one.
+        registry: Metrics rendered on /metrics.
+        status: Function returning details, such as startup progress, that
+            /health reports as JSON next to ``"status": "ok"``. Without it
+            /health answers a plain "OK".
+    """
+    handler = type("HealthCheckHandler", (HealthCheckHandler,), {"registry": registry, "status": status})
+    httpd = ThreadingHTTPServer(("", port), handler)
+    httpd.daemon_threads = True
+    return httpd
+
+
+def start_health_server(
+    port: int = 9999, registry: MetricsRegistry = REGISTRY, status: Optional[Callable[[], Dict]] = None
+):
+    """Serve /health and /metrics until the process exits."""
+    httpd = make_health_server(port, registry, status)
+    logger.info(f"Health check server started on port {port}")
+    httpd.serve_forever()
@@ -0,0 +1,604 @@
+# RULE #0: MANDATORY FIRST ACTION FOR EVERY REQUEST
+# 1. Read CLAUDE.md COMPLETELY before responding
+# 2. Setup Python venv: [ -d "venv" ] || ./setup-venv.sh && source venv/bin/activate
+# 3. Search for rules related to the request
+# 4. Only proceed after confirming no violations
+# Failure to follow Rule #0 has caused real harm. Check BEFORE acting, not AFTER making mistakes.
+#
+# GUARDS ARE SAFETY EQUIPMENT - WHEN THEY FIRE, FIX THE PROBLEM THEY FOUND
+# NEVER weaken, disable, or bypass guards - they prevent real harm
+
+"""Local semantic search over the symbol index.
+
+Each indexed symbol's signature, docstring and the first lines of its body
+are embedded with the duplicate prevention EmbeddingGenerator and stored as
+float32 vectors in a sidecar database next to .code_index.db
+(.code_index.embeddings.db). EmbeddingStore keeps the sidecar in step with
+the symbol index by re-embedding only files whose content hash changed.
+
+VectorIndex answers queries in process without a vector database: small
+indexes are scanned exactly with one matrix product, large ones through an
+inverted file of k-means clusters of which only the nearest few are scanned.
+"""
+
+import logging
+import math
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+logger = logging.getLogger(__name__)
+
+# Function turning texts into one embedding vector each
+Encoder = Callable[[List[str]], Sequence[Sequence[float]]]
+
+# sentence-transformers model embedded with when none is configured
+DEFAULT_MODEL_PATH = "all-MiniLM-L6-v2"
+
+# Lines of a symbol's body embedded after its signature and docstring
+BODY_MAX_LINES = 40
+
+# Characters of text embedded per symbol; longer texts are truncated by the model anyway
+TEXT_MAX_CHARS = 2000
+
+# Symbols embedded per encoder call and written per sidecar transaction
+EMBED_BATCH_SIZE = 256
+
+# Largest index scanned exactly; bigger ones are clustered into an inverted file
+EXACT_SEARCH_MAX_VECTORS = 50000
+
+# Training vectors sampled per cluster, and k-means passes over the sample
+IVF_SAMPLE_PER_LIST = 32
+IVF_TRAIN_ITERATIONS = 10
+
+# Clusters scanned per query, as a fraction of all clusters
+IVF_PROBE_FRACTION = 1 / 16
+IVF_MIN_PROBES = 8
+
+# Vectors assigned to clusters per matrix product, bounding memory use
+ASSIGN_CHUNK_SIZE = 65536
+
+# embedding_meta keys: sidecar generation, index generation last synced, model used
+GENERATION_KEY = "generation"
+INDEX_GENERATION_KEY = "index_generation"
+MODEL_KEY = "model"
+
+# embedding_meta key: file_hashes.last_modified up to which files were embedded
+WATERMARK_KEY = "watermark"
+
+# Paths looked up per query, below SQLite's default limit of bound parameters
+QUERY_CHUNK_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embedding_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS embedded_files (
+    file_path TEXT PRIMARY KEY,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS symbol_embeddings (
+    id INTEGER PRIMARY KEY,
+    file_path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    line_number INTEGER NOT NULL,
+    parent TEXT,
+    signature TEXT,
+    generation INTEGER NOT NULL,
+    vector BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_symbol_embeddings_file ON symbol_embeddings(file_path);
+CREATE INDEX IF NOT EXISTS idx_symbol_embeddings_generation ON symbol_embeddings(generation);
+"""
+
+
+def embeddings_path(db_path: Union[str, Path]) -> Path:
+    """Return the sidecar database holding the embeddings of an index database."""
+    path = Path(db_path)
+    return path.with_name(f"{path.stem}.embeddings.db")
+
+
+def load_encoder(model_path: str = DEFAULT_MODEL_PATH) -> Encoder:
+    """Return a batch encoder backed by the duplicate prevention EmbeddingGenerator.
+
+    The model is loaded on first use. Installed servers find
+    embedding_generator.py next to this module; inside the repository it is
+    imported from duplicate_prevention/.
+    """
+    try:
+        from embedding_generator import EmbeddingGenerator
+    except ImportError:
+        repo_root = str(Path(__file__).resolve().parents[2])
+        if repo_root not in sys.path:
+            sys.path.append(repo_root)
+        from duplicate_prevention.embedding_generator import EmbeddingGenerator
+
+    generator = EmbeddingGenerator(model_path=model_path, preprocess=False, extract_metadata=False)
+    return generator.model.encode_batch
+
+
+def require_numpy():
+    """Raise ImportError with install instructions when NumPy is missing."""
+    if not HAS_NUMPY:
+        raise ImportError("Semantic search needs numpy: pip install numpy sentence-transformers")
+
+
+def normalize(vectors: "np.ndarray") -> "np.ndarray":
+    """Scale float32 row vectors to unit length so dot products are cosine similarities."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def symbol_text(row: sqlite3.Row, lines: List[str], end_line: int) -> str:
+    """Build the text embedded for one symbol: kind, qualified name, signature, docstring, body."""
+    name = f"{row['parent']}.{row['name']}" if row["parent"] else row["name"]
+    parts = [f"{row['type']} {name}"]
+    if row["signature"]:
+        parts.append(row["signature"])
+    if row["docstring"]:
+        parts.append(row["docstring"])
+    start = row["line_number"] - 1
+    parts.append("\n".join(lines[start:min(end_line, start + BODY_MAX_LINES)]))
+    return "\n".join(parts)[:TEXT_MAX_CHARS]
+
+
+def create_embedding_schema(conn: sqlite3.Connection):
+    """Create the sidecar tables when they do not exist yet."""
+    conn.executescript(SCHEMA)
+
+
+class EmbeddingStore:
+    """Keeps the sidecar embeddings in step with the symbol index.
+
+    The indexer calls sync() after its commits, directly or through an
+    EmbeddingUpdater; files modified since the last sync whose hash in
+    file_hashes differs from the hash they were embedded at are re-embedded,
+    and files gone from the index lose their vectors. A sync is a single
+    index_meta lookup when the index has not changed since the last one.
+    """
+
+    def __init__(self, db_path: Union[str, Path], encoder: Optional[Encoder] = None,
+                 model_path: str = DEFAULT_MODEL_PATH):
+        """Open (creating if needed) the sidecar of an index database.
+
+        Args:
+            db_path: Path of the .code_index.db whose symbols are embedded
+            encoder: Function embedding a list of texts; defaults to
+                EmbeddingGenerator with model_path, loaded on first use
+            model_path: Model recorded with the vectors; changing it
+                re-embeds every symbol on the next sync
+        """
+        require_numpy()
+        self.db_path = Path(db_path)
+        self.path = embeddings_path(db_path)
+        self.model_path = model_path
+        self._encoder = encoder
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        # sync() may run on a background EmbeddingUpdater as well as the caller's thread
+        self._lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        create_embedding_schema(self.conn)
+        self.conn.commit()
+
+    @property
+    def encoder(self) -> Encoder:
+        """Encoder used for symbol texts, loaded on first use."""
+        if self._encoder is None:
+            self._encoder = load_encoder(self.model_path)
+        return self._encoder
+
+    def get_meta(self, key: str) -> Optional[str]:
+        """Read an embedding_meta value."""
+        row = self.conn.execute("SELECT value FROM embedding_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: Optional[str]):
+        """Write an embedding_meta value in the current transaction."""
+        self.conn.execute("INSERT OR REPLACE INTO embedding_meta (key, value) VALUES (?, ?)", (key, value))
+
+    def close(self):
+        """Close the sidecar connection."""
+        self.conn.close()
+
+    def sync(self) -> Dict[str, int]:
+        """Embed the symbols of files changed in the index since the last sync.
+
+        Only files whose file_hashes.last_modified is at or after the
+        watermark of the previous sync are read. Removed files are looked
+        for only when the number of embedded files says some are left over.
+
+        Returns:
+            Dictionary with the number of files and symbols embedded and of
+            files moved and removed.
+        """
+        summary = {"files_embedded": 0, "symbols_embedded": 0, "files_moved": 0, "files_removed": 0}
+        with self._lock:
+            index = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True)
+            index.row_factory = sqlite3.Row
+            try:
+                self._sync(index, summary)
+            finally:
+                index.close()
+
+        if summary["files_embedded"] or summary["files_removed"]:
+            logger.info(
+                f"Embedded {summary['symbols_embedded']} symbols from {summary['files_embedded']} files, "
+                f"removed {summary['files_removed']} files"
+            )
+        return summary
+
+    def _sync(self, index: sqlite3.Connection, summary: Dict[str, int]):
+        """Bring the sidecar up to date with an open index connection, adding to the summary."""
+        if self.get_meta(MODEL_KEY) != self.model_path:
+            # Vectors of different models cannot be compared; start over
+            with self.conn:
+                self.conn.execute("DELETE FROM symbol_embeddings")
+                self.conn.execute("DELETE FROM embedded_files")
+                self.set_meta(MODEL_KEY, self.model_path)
+                self.set_meta(INDEX_GENERATION_KEY, None)
+                self.set_meta(WATERMARK_KEY, None)
+
+        row = index.execute("SELECT value FROM index_meta WHERE key = 'generation'").fetchone()
+        index_generation = row[0] if row else None
+        if index_generation is not None and index_generation == self.get_meta(INDEX_GENERATION_KEY):
+            return
+
+        # Read before the rows, so writes racing the sync are embedded next time
+        watermark = index.execute("SELECT MAX(last_modified) FROM file_hashes").fetchone()[0]
+        since = self.get_meta(WATERMARK_KEY)
+        if since is None:
+            modified = index.execute("SELECT file_path, hash FROM file_hashes")
+        else:
+            modified = index.execute("SELECT file_path, hash FROM file_hashes WHERE last_modified >= ?", (since,))
+        modified = dict(modified.fetchall())
+        embedded = self._embedded_hashes(modified)
+        changed = {path: file_hash for path, file_hash in modified.items() if embedded.get(path) != file_hash}
+
+        removed = self._removed_files(index, len(modified) - len(embedded))
+        summary["files_moved"] = self._follow_moves(removed, changed, embedded)
+        if removed:
+            with self.conn:
+                self.conn.executemany("DELETE FROM symbol_embeddings WHERE file_path = ?",
+                                      [(path,) for path in removed])
+                self.conn.executemany("DELETE FROM embedded_files WHERE file_path = ?",
+                                      [(path,) for path in removed])
+                self._bump_generation()
+            summary["files_removed"] = len(removed)
+
+        pending: List[Tuple[str, str, List[sqlite3.Row], List[str]]] = []
+        pending_symbols = 0
+        for file_path, file_hash in changed.items():
+            rows, texts = self._file_symbols(index, file_path)
+            pending.append((file_path, file_hash, rows, texts))
+            pending_symbols += len(rows)
+            if pending_symbols >= EMBED_BATCH_SIZE:
+                summary["symbols_embedded"] += self._write(pending)
+                summary["files_embedded"] += len(pending)
+                pending, pending_symbols = [], 0
+        if pending:
+            summary["symbols_embedded"] += self._write(pending)
+            summary["files_embedded"] += len(pending)
+
+        with self.conn:
+            self.set_meta(INDEX_GENERATION_KEY, index_generation)
+            self.set_meta(WATERMARK_KEY, watermark)
+
+    def _embedded_hashes(self, paths: Iterable[str]) -> Dict[str, str]:
+        """Return the hash each of the given files was embedded at, leaving out files never embedded."""
+        paths = list(paths)
+        embedded: Dict[str, str] = {}
+        for start in range(0, len(paths), QUERY_CHUNK_SIZE):
+            chunk = paths[start:start + QUERY_CHUNK_SIZE]
+            placeholders = ", ".join("?" for _ in chunk)
+            embedded.update(
+                self.conn.execute(f"SELECT file_path, hash FROM embedded_files WHERE file_path IN ({placeholders})",
+                                  chunk)
+            )
+        return embedded
+
+    def _removed_files(self, index: sqlite3.Connection, added: int) -> Dict[str, str]:
+        """Return path -> embedded hash of embedded files that are no longer in the index.
+
+        Every indexed file not modified since the last sync is embedded, so
+        embedded files beyond the indexed ones minus those about to be added
+        can only be removed files. The sidecar is searched for them only
+        when that count is positive.
+
+        Args:
+            index: Read-only connection to the index database.
+            added: Number of modified files that have never been embedded.
+        """
+        embedded_count = self.conn.execute("SELECT COUNT(*) FROM embedded_files").fetchone()[0]
+        indexed_count = index.execute("SELECT COUNT(*) FROM file_hashes").fetchone()[0]
+        if embedded_count + added <= indexed_count:
+            return {}
+
+        index.execute("ATTACH DATABASE ? AS sidecar", (f"{self.path.resolve().as_uri()}?mode=ro",))
+        try:
+            return dict(
+                index.execute(
+                    """SELECT e.file_path, e.hash FROM sidecar.embedded_files e
+                       WHERE NOT EXISTS (SELECT 1 FROM main.file_hashes h WHERE h.file_path = e.file_path)"""
+                ).fetchall()
+            )
+        finally:
+            index.execute("DETACH DATABASE sidecar")
+
+    def _follow_moves(self, removed: Dict[str, str], changed: Dict[str, str], embedded: Dict[str, str]) -> int:
+        """Re-point the vectors of removed files whose content reappeared under a new path.
+
+        The vectors do not depend on the path, so a renamed or moved file
+        keeps them instead of being embedded again. Moved files are taken
+        out of removed and changed.
+
+        Returns:
+            Number of files moved.
+        """
+        by_hash: Dict[str, List[str]] = {}
+        for path, file_hash in removed.items():
+            by_hash.setdefault(file_hash, []).append(path)
+        moves = []
+        for path, file_hash in changed.items():
+            if path not in embedded and by_hash.get(file_hash):
+                moves.append((by_hash[file_hash].pop(), path))
+        if not moves:
+            return 0
+
+        with self.conn:
+            for old, new in moves:
+                self.conn.execute("UPDATE symbol_embeddings SET file_path = ? WHERE file_path = ?", (new, old))
+                self.conn.execute("UPDATE embedded_files SET file_path = ? WHERE file_path = ?", (new, old))
+                del removed[old]
+                del changed[new]
+            self._bump_generation()
+        return len(moves)
+
+    def _file_symbols(self, index: sqlite3.Connection, file_path: str) -> Tuple[List[sqlite3.Row], List[str]]:
+        """Read one file's symbols from the index and build their texts.
+
+        A symbol's body runs until the next symbol starts, so a class
+        contributes its header and docstring and each method its own code.
+        """
+        rows = index.execute(
+            """SELECT name, type, line_number, parent, signature, docstring
+               FROM symbols WHERE file_path = ? ORDER BY line_number""",
+            (file_path,),
+        ).fetchall()
+        try:
+            with open(file_path, encoding="utf-8", errors="replace") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            lines = []
+
+        # Walk backwards so each symbol knows where the next one starts
+        texts: List[str] = []
+        end_line, following = len(lines), None
+        for row in reversed(rows):
+            if following is not None and following > row["line_number"]:
+                end_line = following - 1
+            texts.append(symbol_text(row, lines, end_line))
+            following = row["line_number"]
+        texts.reverse()
+        return rows, texts
+
+    def _write(self, files: List[Tuple[str, str, List[sqlite3.Row], List[str]]]) -> int:
+        """Embed and store the symbols of a batch of files in one transaction."""
+        texts = [text for _, _, _, file_texts in files for text in file_texts]
+        vectors = normalize(self.encoder(texts)) if texts else []
+
+        with self.conn:
+            generation = self._bump_generation()
+            position = 0
+            for file_path, file_hash, rows, _ in files:
+                self.conn.execute("DELETE FROM symbol_embeddings WHERE file_path = ?", (file_path,))
+                self.conn.executemany(
+                    """INSERT INTO symbol_embeddings
+                       (file_path, name, type, line_number, parent, signature, generation, vector)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                    [
+                        (file_path, row["name"], row["type"], row["line_number"], row["parent"],
+                         row["signature"], generation, vectors[position + offset].tobytes())
+                        for offset, row in enumerate(rows)
+                    ],
+                )
+                position += len(rows)
+                self.conn.execute("INSERT OR REPLACE INTO embedded_files (file_path, hash) VALUES (?, ?)",
+                                  (file_path, file_hash))
+        return len(texts)
+
+    def _bump_generation(self) -> int:
+        """Advance the sidecar generation inside the current transaction and return it."""
+        generation = int(self.get_meta(GENERATION_KEY) or 0) + 1
+        self.set_meta(GENERATION_KEY, str(generation))
+        return generation
+
+
+class EmbeddingUpdater(threading.Thread):
+    """Background thread that runs EmbeddingStore syncs requested by commits.
+
+    Embedding a batch of files takes far longer than writing it, so the
+    watcher's writer thread only calls request() and goes on applying file
+    events. Requests made while a sync runs are folded into one more sync.
+    """
+
+    def __init__(self, sync: Callable[[], object]):
+        """Create the updater; call start() to run it.
+
+        Args:
+            sync: Function bringing the embeddings up to date.
+        """
+        super().__init__(name="embedding-updater", daemon=True)
+        self._sync = sync
+        self._requested = threading.Event()
+        self._stopped = threading.Event()
+
+    def request(self):
+        """Ask for a sync without waiting for it."""
+        self._requested.set()
+
+    def stop(self):
+        """Ask the updater to exit after one last sync, so no commit is left unembedded."""
+        self._stopped.set()
+        self._requested.set()
+
+    def run(self):
+        while True:
+            self._requested.wait()
+            self._requested.clear()
+            stopping = self._stopped.is_set()
+            try:
+                self._sync()
+            except Exception as e:
+                logger.error(f"Error updating embeddings: {e}")
+            if stopping:
+                return
+
+
+class VectorIndex:
+    """In-memory nearest neighbour index over the sidecar vectors.
+
+    refresh() loads only rows written since the generation it last saw and
+    drops rows that disappeared, so following the indexer costs little more
+    than the changed symbols. Up to EXACT_SEARCH_MAX_VECTORS vectors are
+    scanned exactly; beyond that they are grouped into about sqrt(n) k-means
+    clusters and a query scans only the clusters nearest to it. Clusters are
+    retrained when the index has doubled since they were trained; vectors
+    added in between join their nearest existing cluster.
+    """
+
+    def __init__(self):
+        """Create an empty index."""
+        require_numpy()
+        self._clear()
+
+    def _clear(self):
+        """Drop every vector, as before the first refresh."""
+        self.generation: Optional[int] = None
+        self.model: Optional[str] = None
+        self.ids = np.empty(0, dtype=np.int64)
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.empty(0, dtype=np.int64)
+        self._trained_size = 0
+        self._order = np.empty(0, dtype=np.int64)
+        self._offsets = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def approximate(self) -> bool:
+        """Whether queries scan clusters instead of every vector."""
+        return self._centroids is not None
+
+    def refresh(self, conn: sqlite3.Connection):
+        """Bring the index up to date with a sidecar connection."""
+        meta = dict(conn.execute("SELECT key, value FROM embedding_meta"))
+        generation = int(meta.get(GENERATION_KEY) or 0)
+        model = meta.get(MODEL_KEY)
+        if generation == self.generation and model == self.model:
+            return
+
+        since = self.generation if model == self.model and self.generation is not None else None
+        if since is None:
+            self._clear()
+        rows = conn.execute(
+            "SELECT id, vector FROM symbol_embeddings WHERE generation > ? ORDER BY id", (since or 0,)
+        ).fetchall()
+        new_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        new_vectors = (
+            np.frombuffer(b"".join(row[1] for row in rows), dtype=np.float32).reshape(len(rows), -1)
+            if rows else np.empty((0, self.vectors.shape[1]), dtype=np.float32)
+        )
+
+        if len(self.ids):
+            current = np.fromiter((row[0] for row in conn.execute("SELECT id FROM symbol_embeddings")), dtype=np.int64)
+            keep = np.isin(self.ids, current) & ~np.isin(self.ids, new_ids)
+            self.ids = np.concatenate([self.ids[keep], new_ids])
+            self.vectors = np.concatenate([self.vectors[keep], new_vectors])
+            kept_assignments = self._assignments[keep] if self.approximate else None
+        else:
+            self.ids, self.vectors = new_ids, new_vectors
+            kept_assignments = None
+
+        self._update_clusters(kept_assignments, len(new_ids))
+        self.generation, self.model = generation, model
+
+    def _update_clusters(self, kept_assignments: Optional["np.ndarray"], added: int):
+        """Train, extend or drop the inverted file after the vectors changed."""
+        size = len(self.ids)
+        if size <= EXACT_SEARCH_MAX_VECTORS:
+            self._centroids = None
+            return
+
+        if self._centroids is None or size > 2 * self._trained_size:
+            self._train(size)
+            self._assignments = self._assign(self.vectors)
+        else:
+            self._assignments = np.concatenate([kept_assignments, self._assign(self.vectors[size - added:])])
+
+        self._order = np.argsort(self._assignments, kind="stable")
+        self._offsets = np.searchsorted(self._assignments[self._order], np.arange(len(self._centroids) + 1))
+
+    def _train(self, size: int):
+        """Cluster a sample of the vectors with spherical k-means."""
+        lists = int(math.sqrt(size))
+        rng = np.random.default_rng(0)
+        sample = self.vectors[rng.choice(size, min(size, lists * IVF_SAMPLE_PER_LIST), replace=False)]
+        centroids = sample[rng.choice(len(sample), lists, replace=False)].copy()
+        for _ in range(IVF_TRAIN_ITERATIONS):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            filled = np.bincount(assignments, minlength=lists) > 0
+            # Empty clusters keep their previous centroid
+            centroids[filled] = normalize(sums[filled])
+        self._centroids = centroids
+        self._trained_size = size
+
+    def _assign(self, vectors: "np.ndarray") -> "np.ndarray":
+        """Return the nearest cluster of each vector."""
+        assignments = [
+            np.argmax(vectors[start:start + ASSIGN_CHUNK_SIZE] @ self._centroids.T, axis=1)
+            for start in range(0, len(vectors), ASSIGN_CHUNK_SIZE)
+        ]
+        return np.concatenate(assignments) if assignments else np.empty(0, dtype=np.int64)
+
+    def search(self, query: "np.ndarray", limit: int) -> List[Tuple[int, float]]:
+        """Return up to limit (id, cosine similarity) pairs, most similar first.
+
+        Args:
+            query: Unit-length query vector
+            limit: Number of neighbours to return
+        """
+        if not len(self.ids) or limit <= 0:
+            return []
+
+        if self.approximate:
+            probes = max(IVF_MIN_PROBES, int(len(self._centroids) * IVF_PROBE_FRACTION))
+            nearest = np.argpartition(-(self._centroids @ query), min(probes, len(self._centroids)) - 1)[:probes]
+            candidates = np.concatenate([self._order[self._offsets[c]:self._offsets[c + 1]] for c in nearest])
+        else:
+            candidates = np.arange(len(self.ids))
+
+        scores = self.vectors[candidates] @ query
+        if len(candidates) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(self.ids[candidates[i]]), float(scores[i])) for i in top]
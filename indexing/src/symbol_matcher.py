@@ -0,0 +1,442 @@
+# RULE #0: MANDATORY FIRST ACTION FOR EVERY REQUEST
+# 1. Read CLAUDE.md COMPLETELY before responding
+# 2. Setup Python venv: [ -d "venv" ] || ./setup-venv.sh && source venv/bin/activate
+# 3. Search for rules related to the request
+# 4. Only proceed after confirming no violations
+# Failure to follow Rule #0 has caused real harm. Check BEFORE acting, not AFTER making mistakes.
+#
+# GUARDS ARE SAFETY EQUIPMENT - WHEN THEY FIRE, FIX THE PROBLEM THEY FOUND
+# NEVER weaken, disable, or bypass guards - they prevent real harm
+
+"""In-memory symbol name index for fuzzy and abbreviation matching.
+
+Names are loaded once from the normalized symbol tables and matched three
+ways: exactly (ignoring case), as abbreviations of their camelCase or
+snake_case words ('gfh' or 'GetFH' for get_file_hash, 'CodeIdx' for
+CodeIndexer), and within a small edit distance ('hnadler' for handler).
+Every lookup is a dictionary probe followed by checks of a bounded set of
+candidates, so query time does not grow with the number of symbols.
+"""
+
+import bisect
+import functools
+import heapq
+import re
+import sqlite3
+from typing import Dict, Iterable, List, NamedTuple, Optional, Pattern, Set, Tuple
+
+# Leading characters of each name whose single-character deletions are indexed
+# to find typo candidates, and trailing characters compared the same way before
+# computing a candidate's edit distance
+DELETE_PREFIX_LENGTH = 6
+
+# Queries this short only match exactly or as abbreviations
+MIN_EDIT_QUERY_LENGTH = 3
+
+# Longest query treated as one initial per word ('gfh')
+MAX_INITIALS_LENGTH = 8
+
+# Candidates verified per lookup strategy, bounding the cost of very common prefixes
+MAX_CANDIDATES = 2000
+
+# Files whose names are reloaded per statement during incremental refreshes
+REFRESH_CHUNK_SIZE = 500
+
+# Match scores before the length penalty; higher ranks first
+EXACT_SCORE = 1.0
+CASE_INSENSITIVE_SCORE = 0.95
+ABBREVIATION_SCORE = 0.85
+TRAILING_WORD_PENALTY = 0.05
+EDIT_SCORE = 0.75
+EDIT_DISTANCE_PENALTY = 0.15
+
+WORD_PATTERN = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+
+
+class NameMatch(NamedTuple):
+    """One ranked match of a query against an indexed name."""
+
+    name: str
+    score: float
+    match: str  # 'exact', 'abbreviation' or 'edit'
+
+
+def split_words(name: str) -> List[str]:
+    """Split a camelCase, PascalCase or snake_case name into lowercase words.
+
+    Runs of capitals form one word, so 'HTTPServer' splits into 'http' and
+    'server'.
+    """
+    return [word.lower() for word in WORD_PATTERN.findall(name)]
+
+
+def max_edit_distance(query: str) -> int:
+    """Return the number of edits tolerated for a query of this length."""
+    if len(query) < MIN_EDIT_QUERY_LENGTH:
+        return 0
+    return 1 if len(query) <= 5 else 2
+
+
+def edit_distance(pattern_masks: Dict[str, int], pattern_length: int, text: str) -> int:
+    """Return the Levenshtein distance between a pattern and a text.
+
+    Uses Hyyrö's bit-parallel form of Myers' algorithm: the pattern's
+    character positions are precomputed as bit masks, so each text
+    character costs a handful of integer operations.
+
+    Args:
+        pattern_masks: Bit mask of the positions of each pattern character,
+            from pattern_bitmasks.
+        pattern_length: Length of the pattern.
+        text: String compared against the pattern.
+    """
+    if not pattern_length:
+        return len(text)
+    full = (1 << pattern_length) - 1
+    last = 1 << (pattern_length - 1)
+    positive, negative = full, 0
+    distance = pattern_length
+    for char in text:
+        equal = pattern_masks.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        horizontal_positive = negative | ~(horizontal | positive)
+        horizontal_negative = positive & horizontal
+        if horizontal_positive & last:
+            distance += 1
+        elif horizontal_negative & last:
+            distance -= 1
+        horizontal_positive = ((horizontal_positive << 1) | 1) & full
+        horizontal_negative = (horizontal_negative << 1) & full
+        positive = (horizontal_negative | ~(vertical | horizontal_positive)) & full
+        negative = horizontal_positive & vertical
+    return distance
+
+
+def pattern_bitmasks(pattern: str) -> Dict[str, int]:
+    """Return the position bit mask of each character of a pattern for edit_distance."""
+    masks: Dict[str, int] = {}
+    for position, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << position)
+    return masks
+
+
+def spell_words(words: List[str]) -> str:
+    """Return the form of a name that abbreviation patterns match: each word prefixed by '_'."""
+    return "".join(f"_{word}" for word in words)
+
+
+def abbreviation_pattern(query: str) -> Optional[Pattern]:
+    """Compile a query into a regex matching the names it abbreviates.
+
+    The regex runs against spell_words forms. The first query character
+    must start the name, each later one is the next occurrence in the
+    current name word or starts the next word ('idx' abbreviates 'indexer',
+    'gfh' spans get, file and hash), and the query's own camelCase or
+    underscore boundaries must start a new name word. Name words may only
+    be left over at the end; group 1 captures them.
+
+    Returns:
+        The compiled pattern, or None if the query has no word characters.
+    """
+    query_words = split_words(query)
+    if not query_words:
+        return None
+    parts = []
+    for query_word in query_words:
+        for offset, char in enumerate(query_word):
+            char = re.escape(char)
+            if not parts:
+                parts.append(f"_{char}")
+            elif offset == 0:
+                parts.append(f"[^_]*_{char}")
+            else:
+                # Leftmost occurrence in the current word, so failures do not backtrack within it
+                parts.append(f"(?:[^_{char}]*{char}|[^_]*_{char})")
+    return re.compile("".join(parts) + "[^_]*(.*)")
+
+
+def _prefixed(keys: List[str], buckets: Dict[str, List[int]], prefix: str) -> List[int]:
+    """Return the ids stored under sorted keys starting with a prefix, the prefix itself first."""
+    found: List[int] = []
+    position = bisect.bisect_left(keys, prefix)
+    while position < len(keys) and len(found) < MAX_CANDIDATES:
+        key = keys[position]
+        if not key.startswith(prefix):
+            break
+        found.extend(buckets[key])
+        position += 1
+    return found[:MAX_CANDIDATES]
+
+
+def _merge_sorted(keys: List[str], new_keys: List[str]):
+    """Add new keys to a sorted list, re-sorting once when many arrive together."""
+    if len(new_keys) > len(keys) // 16:
+        keys.extend(new_keys)
+        keys.sort()
+    else:
+        for key in new_keys:
+            bisect.insort(keys, key)
+
+
+def _deletes(key: str) -> Set[str]:
+    """Return a key and every string one character deletion away from it."""
+    return {key} | {key[:i] + key[i + 1:] for i in range(len(key))}
+
+
+def _drops_one(longer: str, shorter: str) -> bool:
+    """Return True if deleting one character of longer gives shorter."""
+    if len(longer) != len(shorter) + 1:
+        return False
+    i = 0
+    while i < len(shorter) and longer[i] == shorter[i]:
+        i += 1
+    return longer[i + 1:] == shorter[i:]
+
+
+def _one_delete_apart(a: str, b: str) -> bool:
+    """Return True if _deletes(a) and _deletes(b) intersect, without building them."""
+    i = 0
+    shared = min(len(a), len(b))
+    while i < shared and a[i] == b[i]:
+        i += 1
+    a, b = a[i:], b[i:]
+    if a == b or a[1:] == b[1:] or a[1:] == b or a == b[1:]:
+        return True
+    return _drops_one(b, a[1:]) or _drops_one(a, b[1:])
+
+
+@functools.lru_cache(maxsize=65536)
+def _prefix_deletes(prefix: str) -> Tuple[str, ...]:
+    """Return _deletes of a name prefix; names share few distinct prefixes, so these repeat."""
+    return tuple(_deletes(prefix))
+
+
+def _delete_keys(lower: str, length: int) -> List[str]:
+    """Return the typo lookup keys of a name's prefix, qualified by the name's length."""
+    suffix = f":{length}"
+    return [key + suffix for key in _prefix_deletes(lower[:DELETE_PREFIX_LENGTH])]
+
+
+class SymbolNameIndex:
+    """Distinct symbol names with the lookup tables used for fuzzy matching.
+
+    Names are counted per file so an incremental refresh only reloads the
+    files written since the previous one. Names whose last symbol is gone
+    stay in the lookup tables with a zero count and are skipped, until they
+    outnumber the live names and the index is rebuilt.
+    """
+
+    def __init__(self):
+        """Create an empty index; refresh loads it."""
+        self.generation: Optional[str] = None
+        self._reset()
+
+    def _reset(self):
+        """Drop every loaded name."""
+        self._names: List[str] = []
+        self._spelled: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._counts: List[int] = []
+        self._live = 0
+        self._by_lower: Dict[str, List[int]] = {}
+        self._by_initials: Dict[str, List[int]] = {}
+        self._initial_keys: List[str] = []
+        self._lower_keys: List[str] = []
+        self._new_keys: Tuple[List[str], List[str]] = ([], [])
+        self._by_delete: Dict[str, List[int]] = {}
+        self._file_names: Dict[int, List[int]] = {}
+        self._watermark: Optional[str] = None
+        self.loaded = False
+
+    def __len__(self) -> int:
+        """Return the number of distinct names that still have symbols."""
+        return self._live
+
+    def refresh(self, conn: sqlite3.Connection, generation: Optional[str]):
+        """Bring the index up to date with the database.
+
+        The first call loads every name; later calls for a new generation
+        reload only files modified since the last refresh and drop files
+        that no longer exist.
+
+        Args:
+            conn: Connection to a database with the normalized symbol tables.
+            generation: Index generation the database reports, or None when
+                it records none (then every call refreshes).
+        """
+        if self.loaded and generation is not None and generation == self.generation:
+            return
+        # Read before the rows, so writes racing the refresh are reloaded next time
+        watermark = conn.execute("SELECT MAX(last_modified) FROM file_hashes").fetchone()[0]
+
+        if not self.loaded or len(self._names) > 2 * max(self._live, 1):
+            self._reset()
+            self._load_files(conn.execute("SELECT file_id, name FROM symbol_rows"))
+        else:
+            current = {row[0] for row in conn.execute("SELECT id FROM files")}
+            for file_id in set(self._file_names) - current:
+                self._drop_file(file_id)
+            changed = current - set(self._file_names)
+            if self._watermark is not None:
+                changed.update(
+                    row[0]
+                    for row in conn.execute(
+                        """
+                        SELECT f.id FROM files f JOIN file_hashes h ON h.file_path = f.path
+                        WHERE h.last_modified >= ?
+                    """,
+                        (self._watermark,),
+                    )
+                )
+            changed_ids = sorted(changed)
+            for file_id in changed_ids:
+                self._drop_file(file_id)
+            for start in range(0, len(changed_ids), REFRESH_CHUNK_SIZE):
+                chunk = changed_ids[start:start + REFRESH_CHUNK_SIZE]
+                placeholders = ", ".join("?" for _ in chunk)
+                self._load_files(
+                    conn.execute(f"SELECT file_id, name FROM symbol_rows WHERE file_id IN ({placeholders})", chunk)
+                )
+
+        for keys, new_keys in zip((self._initial_keys, self._lower_keys), self._new_keys):
+            _merge_sorted(keys, new_keys)
+            new_keys.clear()
+        self._watermark = watermark
+        self.generation = generation
+        self.loaded = True
+
+    def _load_files(self, rows: Iterable[Tuple[int, str]]):
+        """Add (file_id, name) rows, counting each name once per symbol."""
+        for file_id, name in rows:
+            name_id = self._ids.get(name)
+            if name_id is None:
+                name_id = self._add_name(name)
+            if not self._counts[name_id]:
+                self._live += 1
+            self._counts[name_id] += 1
+            self._file_names.setdefault(file_id, []).append(name_id)
+
+    def _drop_file(self, file_id: int):
+        """Uncount the names of a file that changed or was removed."""
+        for name_id in self._file_names.pop(file_id, ()):
+            self._counts[name_id] -= 1
+            if not self._counts[name_id]:
+                self._live -= 1
+
+    def _add_name(self, name: str) -> int:
+        """Register a name seen for the first time in every lookup table."""
+        name_id = len(self._names)
+        words = split_words(name)
+        lower = name.lower()
+        self._names.append(name)
+        self._spelled.append(spell_words(words))
+        self._ids[name] = name_id
+        self._counts.append(0)
+        bucket = self._by_lower.get(lower)
+        if bucket is None:
+            bucket = self._by_lower[lower] = []
+            self._new_keys[1].append(lower)
+        bucket.append(name_id)
+        if words:
+            initials = "".join(word[0] for word in words)
+            bucket = self._by_initials.get(initials)
+            if bucket is None:
+                bucket = self._by_initials[initials] = []
+                self._new_keys[0].append(initials)
+            bucket.append(name_id)
+        for key in _delete_keys(lower, len(lower)):
+            self._by_delete.setdefault(key, []).append(name_id)
+        return name_id
+
+    def match(self, query: str, limit: Optional[int] = None) -> List[NameMatch]:
+        """Rank the indexed names matching a query.
+
+        Args:
+            query: Exact name, abbreviation or misspelling of a name.
+            limit: Maximum number of names returned, None for all.
+
+        Returns:
+            Matches ordered by score, then by shorter name.
+        """
+        lower = query.lower()
+        counts = self._counts
+        best: Dict[int, Tuple[float, str]] = {}
+
+        for name_id in self._by_lower.get(lower, ()):
+            if counts[name_id]:
+                best[name_id] = (EXACT_SCORE if self._names[name_id] == query else CASE_INSENSITIVE_SCORE, "exact")
+
+        query_words = split_words(query)
+        pattern = abbreviation_pattern(query)
+        if pattern is not None:
+            compact = sum(len(word) for word in query_words)
+            candidates = self._abbreviation_candidates(query_words)
+            if len(lower) >= MIN_EDIT_QUERY_LENGTH:
+                candidates.extend(_prefixed(self._lower_keys, self._by_lower, lower))
+            for name_id in candidates:
+                if name_id in best or not counts[name_id]:
+                    continue
+                spelled = self._spelled[name_id]
+                found = pattern.match(spelled)
+                if found is not None:
+                    # Prefer names with fewer words left over and more of their letters typed
+                    trailing = found.group(1).count("_")
+                    coverage = compact / (len(spelled) - spelled.count("_"))
+                    score = ABBREVIATION_SCORE - TRAILING_WORD_PENALTY * trailing - 0.1 * (1 - coverage)
+                    best[name_id] = (score, "abbreviation")
+
+        max_distance = max_edit_distance(lower)
+        if max_distance:
+            masks = pattern_bitmasks(lower)
+            suffix = lower[-DELETE_PREFIX_LENGTH:]
+            for name_id in self._edit_candidates(lower, max_distance):
+                if not counts[name_id]:
+                    continue
+                name_lower = self._names[name_id].lower()
+                # The candidate's prefix is close to the query's; its suffix has to be as well
+                if not _one_delete_apart(suffix, name_lower[-DELETE_PREFIX_LENGTH:]):
+                    continue
+                distance = edit_distance(masks, len(lower), name_lower)
+                score = EDIT_SCORE - EDIT_DISTANCE_PENALTY * distance
+                if distance <= max_distance and score > best.get(name_id, (0.0, ""))[0]:
+                    best[name_id] = (score, "edit")
+
+        names = self._names
+
+        def rank(item: Tuple[int, Tuple[float, str]]) -> Tuple[float, int, str]:
+            """Order by score, then shorter name, then name."""
+            return (-item[1][0], len(names[item[0]]), names[item[0]])
+
+        if limit is None:
+            ranked = sorted(best.items(), key=rank)
+        else:
+            ranked = heapq.nsmallest(limit, best.items(), key=rank)
+        return [NameMatch(names[name_id], round(score, 3), kind) for name_id, (score, kind) in ranked]
+
+    def _abbreviation_candidates(self, query_words: List[str]) -> List[int]:
+        """Return names whose word initials start with the query's.
+
+        A query typed as several words ('CodeIdx') gives one initial per
+        word; a short single word ('gfh') is also tried as one initial per
+        character.
+        """
+        if len(query_words) > 1:
+            prefix = "".join(word[0] for word in query_words)
+        elif 1 < len(query_words[0]) <= MAX_INITIALS_LENGTH:
+            prefix = query_words[0]
+        else:
+            return []
+        return _prefixed(self._initial_keys, self._by_initials, prefix)
+
+    def _edit_candidates(self, lower: str, max_distance: int) -> Set[int]:
+        """Return names of a reachable length whose prefix is within one deletion on each side of the query's."""
+        candidates: Set[int] = set()
+        for length in range(len(lower) - max_distance, len(lower) + max_distance + 1):
+            for key in _delete_keys(lower, length):
+                bucket = self._by_delete.get(key)
+                if bucket:
+                    candidates.update(bucket[:MAX_CANDIDATES])
+                if len(candidates) >= MAX_CANDIDATES:
+                    return candidates
+        return candidates
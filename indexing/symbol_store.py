@@ -0,0 +1,1019 @@
+#!/usr/bin/env python3
+# RULE #0: MANDATORY FIRST ACTION FOR EVERY REQUEST
+# 1. Read CLAUDE.md COMPLETELY before responding
+# 2. Setup Python venv: [ -d "venv" ] || ./setup-venv.sh && source venv/bin/activate
+# 3. Search for rules related to the request
+# 4. Only proceed after confirming no violations
+# Failure to follow Rule #0 has caused real harm. Check BEFORE acting, not AFTER making mistakes.
+#
+# GUARDS ARE SAFETY EQUIPMENT - WHEN THEY FIRE, FIX THE PROBLEM THEY FOUND
+# NEVER weaken, disable, or bypass guards - they prevent real harm
+
+"""Bulk ingestion layer for the symbol index.
+
+Every indexer write path (CodeIndexer, the watcher's periodic scan and the
+tree-sitter indexer) goes through SymbolStore, which keeps one long-lived
+WAL-mode connection and commits in batches instead of once per file.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Number of files written per transaction before an automatic commit
+DEFAULT_BATCH_SIZE = 200
+
+# Connection settings tuned for a single writer with concurrent readers
+WRITER_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -65536,  # 64 MB
+    "mmap_size": 268435456,  # 256 MB
+    "busy_timeout": 30000,
+    # REPLACE conflict deletes must fire the FTS delete triggers
+    "recursive_triggers": "ON",
+}
+
+# Stat columns added to file_hashes after the original schema shipped
+FILE_STAT_COLUMNS = {"st_mtime_ns": "INTEGER", "st_size": "INTEGER", "inode": "INTEGER"}
+
+# Tables keyed by file_path, deleted together when a file leaves the index.
+# Symbols are keyed by file id instead and deleted separately.
+FILE_TABLES = ("symbol_references", "imports", "modules", "file_hashes")
+
+# Symbol types stored as small integers in symbol_rows.kind; types not listed
+# here are added to symbol_kinds the first time they are written
+SYMBOL_KINDS = ("function", "class", "method", "variable")
+
+# index_meta key of the counter bumped by every commit that changed indexed files,
+# which searchers compare to invalidate cached results
+GENERATION_KEY = "generation"
+
+# index_meta key of the time of the last such commit
+LAST_INDEXED_KEY = "last_indexed"
+
+# Default upper bound on the compressed size of cached extraction results
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Files modified this recently may change again within the same mtime tick,
+# so their stat is not trusted and the next scan re-hashes them
+RACY_WINDOW_NS = 2_000_000_000
+
+
+class FileState(NamedTuple):
+    """Stored hash and stat signature of one indexed file."""
+
+    hash: str
+    st_mtime_ns: Optional[int]
+    st_size: Optional[int]
+    inode: Optional[int]
+
+    def matches(self, stat: os.stat_result) -> bool:
+        """Return True if the stored stat signature equals the file's current stat."""
+        return (
+            self.st_mtime_ns is not None
+            and self.st_mtime_ns == stat.st_mtime_ns
+            and self.st_size == stat.st_size
+            and self.inode == stat.st_ino
+        )
+
+
+def stat_signature(stat: Optional[os.stat_result]):
+    """Return the (mtime_ns, size, inode) values to store for a stat result.
+
+    Stats that are missing or too recent to trust are stored as NULLs, which
+    never match, so the next scan falls back to comparing content hashes.
+    """
+    if stat is None or stat.st_mtime_ns >= time.time_ns() - RACY_WINDOW_NS:
+        return (None, None, None)
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def create_schema(conn: sqlite3.Connection):
+    """Create the symbol index tables and indexes if they do not exist."""
+    cursor = conn.cursor()
+
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS file_hashes (
+            file_path TEXT PRIMARY KEY,
+            hash TEXT NOT NULL,
+            last_modified TIMESTAMP,
+            st_mtime_ns INTEGER,
+            st_size INTEGER,
+            inode INTEGER
+        )
+    """
+    )
+
+    # Databases created before stat tracking get the columns added in place
+    existing = {row[1] for row in cursor.execute("PRAGMA table_info(file_hashes)")}
+    for column, column_type in FILE_STAT_COLUMNS.items():
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE file_hashes ADD COLUMN {column} {column_type}")
+    # Incremental readers fetch the files modified since their last watermark
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_file_hashes_modified ON file_hashes(last_modified)")
+
+    create_symbol_tables(conn)
+
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS index_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    """
+    )
+    cursor.execute("INSERT OR IGNORE INTO index_meta (key, value) VALUES (?, '0')", (GENERATION_KEY,))
+
+    # Parse results keyed by file content, so content seen before under any
+    # path (a branch switch back, a moved file) is never parsed again
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS extraction_cache (
+            content_hash TEXT NOT NULL,
+            extractor_version INTEGER NOT NULL,
+            payload BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            last_used INTEGER NOT NULL,
+            PRIMARY KEY (content_hash, extractor_version)
+        ) WITHOUT ROWID
+    """
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_extraction_cache_last_used ON extraction_cache(last_used)")
+
+    create_reference_index(conn)
+    create_import_index(conn)
+    create_fts_index(conn)
+    create_trigram_indexes(conn)
+
+    conn.commit()
+
+
+def create_symbol_tables(conn: sqlite3.Connection):
+    """Create the normalized symbol tables and the symbols view over them.
+
+    Each file path is stored once in files and symbols refer to it by id,
+    symbol types are small integers from symbol_kinds, and docstrings live
+    in a side table that is only read when a query selects them (the view
+    reads it through a scalar subquery, which SQLite skips for unused
+    columns even in aggregates, unlike a LEFT JOIN). The
+    symbols view presents the original flat columns (including file_hash
+    and indexed_at from file_hashes), so readers are unchanged. An index
+    built with the original symbols table is migrated in place, keeping
+    symbol ids so the full-text indexes stay valid.
+
+    Triggers keep the number of symbols of each kind in symbol_kinds and
+    the number of files in index_counters, so statistics are read without
+    scanning.
+    """
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE)")
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS symbol_kinds (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            symbol_count INTEGER NOT NULL DEFAULT 0
+        )
+    """
+    )
+    counted = "symbol_count" in {row[1] for row in cursor.execute("PRAGMA table_info(symbol_kinds)")}
+    if not counted:
+        cursor.execute("ALTER TABLE symbol_kinds ADD COLUMN symbol_count INTEGER NOT NULL DEFAULT 0")
+    cursor.executemany(
+        "INSERT OR IGNORE INTO symbol_kinds (id, name) VALUES (?, ?)",
+        [(kind_id, name) for kind_id, name in enumerate(SYMBOL_KINDS, start=1)],
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS symbol_rows (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            kind INTEGER NOT NULL,
+            file_id INTEGER NOT NULL,
+            line_number INTEGER NOT NULL,
+            column INTEGER NOT NULL,
+            parent TEXT,
+            signature TEXT,
+            UNIQUE(file_id, line_number, name, kind)
+        )
+    """
+    )
+    # The unique constraint's index leads with (file_id, line_number), so it also
+    # serves file outlines in source order and per-file deletes; no separate index
+    cursor.execute("CREATE TABLE IF NOT EXISTS docstrings (symbol_id INTEGER PRIMARY KEY, docstring TEXT NOT NULL)")
+    # BEFORE DELETE triggers (the full-text indexes) still see the docstring
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS symbol_rows_docstring_delete AFTER DELETE ON symbol_rows BEGIN
+            DELETE FROM docstrings WHERE symbol_id = old.id;
+        END
+    """
+    )
+
+    create_counters(cursor, backfill=not counted)
+
+    legacy = cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'symbols' AND type = 'table'").fetchone()
+    if legacy:
+        _migrate_symbols_table(cursor)
+
+    # Case-insensitive so name prefixes and LIKE patterns can range over it; the trailing
+    # columns hand out name search pages, and the rows of one name, without a sort.
+    # idx_symbol_kind does the same for name searches filtered by symbol type
+    for index_name, columns in (
+        ("idx_symbol_name", "name COLLATE NOCASE, file_id, line_number, kind"),
+        ("idx_symbol_kind", "kind, name COLLATE NOCASE, file_id, line_number"),
+    ):
+        existing = cursor.execute("SELECT sql FROM sqlite_master WHERE name = ?", (index_name,)).fetchone()
+        if existing is not None and "file_id" not in existing[0]:
+            cursor.execute(f"DROP INDEX {index_name}")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON symbol_rows({columns})")
+    cursor.execute(
+        """
+        CREATE VIEW IF NOT EXISTS symbols AS
+        SELECT s.id, s.name, k.name AS type, f.path AS file_path, s.line_number, s.column, s.parent, s.signature,
+               (SELECT docstring FROM docstrings WHERE symbol_id = s.id) AS docstring,
+               (SELECT hash FROM file_hashes WHERE file_path = f.path) AS file_hash,
+               (SELECT last_modified FROM file_hashes WHERE file_path = f.path) AS indexed_at
+        FROM symbol_rows s
+        JOIN files f ON f.id = s.file_id
+        JOIN symbol_kinds k ON k.id = s.kind
+    """
+    )
+
+
+def create_counters(cursor: sqlite3.Cursor, backfill: bool):
+    """Create index_counters and the triggers maintaining symbol and file counts.
+
+    Args:
+        cursor: Cursor on the index database.
+        backfill: Recount existing rows, for databases created before the
+            counts were maintained.
+    """
+    cursor.execute("CREATE TABLE IF NOT EXISTS index_counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+    cursor.execute("INSERT OR IGNORE INTO index_counters (name, value) VALUES ('files', 0)")
+    triggers = {
+        "symbol_rows_count_insert": """AFTER INSERT ON symbol_rows BEGIN
+            UPDATE symbol_kinds SET symbol_count = symbol_count + 1 WHERE id = new.kind;
+        END""",
+        "symbol_rows_count_delete": """AFTER DELETE ON symbol_rows BEGIN
+            UPDATE symbol_kinds SET symbol_count = symbol_count - 1 WHERE id = old.kind;
+        END""",
+        "symbol_rows_count_update": """AFTER UPDATE OF kind ON symbol_rows BEGIN
+            UPDATE symbol_kinds SET symbol_count = symbol_count - 1 WHERE id = old.kind;
+            UPDATE symbol_kinds SET symbol_count = symbol_count + 1 WHERE id = new.kind;
+        END""",
+        "files_count_insert": """AFTER INSERT ON files BEGIN
+            UPDATE index_counters SET value = value + 1 WHERE name = 'files';
+        END""",
+        "files_count_delete": """AFTER DELETE ON files BEGIN
+            UPDATE index_counters SET value = value - 1 WHERE name = 'files';
+        END""",
+    }
+    for name, body in triggers.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+    if backfill:
+        cursor.execute(
+            "UPDATE symbol_kinds SET symbol_count = (SELECT COUNT(*) FROM symbol_rows WHERE kind = symbol_kinds.id)"
+        )
+        cursor.execute("UPDATE index_counters SET value = (SELECT COUNT(*) FROM files) WHERE name = 'files'")
+
+
+def _migrate_symbols_table(cursor: sqlite3.Cursor):
+    """Move rows from the original flat symbols table into the normalized tables."""
+    count = cursor.execute("SELECT COUNT(*) FROM symbols").fetchone()[0]
+    logger.info("Migrating %d symbols to the normalized schema", count)
+
+    cursor.execute("INSERT OR IGNORE INTO files (path) SELECT DISTINCT file_path FROM symbols")
+    cursor.execute("INSERT OR IGNORE INTO symbol_kinds (name) SELECT DISTINCT type FROM symbols")
+    cursor.execute(
+        """
+        INSERT OR REPLACE INTO symbol_rows (id, name, kind, file_id, line_number, column, parent, signature)
+        SELECT s.id, s.name, k.id, f.id, s.line_number, s.column, s.parent, s.signature
+        FROM symbols s
+        JOIN files f ON f.path = s.file_path
+        JOIN symbol_kinds k ON k.name = s.type
+    """
+    )
+    cursor.execute(
+        "INSERT OR REPLACE INTO docstrings (symbol_id, docstring) SELECT id, docstring FROM symbols WHERE docstring IS NOT NULL"
+    )
+    # Its indexes and full-text triggers go with it; create_fts_index and
+    # create_trigram_indexes recreate the triggers on symbol_rows
+    cursor.execute("DROP TABLE symbols")
+
+
+def create_reference_index(conn: sqlite3.Connection):
+    """Create the symbol_references table of call sites, attribute accesses, name loads and imports.
+
+    Files indexed before references were recorded have their stored hash
+    cleared, so the next scan re-parses each of them once. Triggers keep the
+    number of references in index_counters, next to the number of files.
+    """
+    cursor = conn.cursor()
+    if not cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'symbol_references'").fetchone():
+        cursor.execute(
+            """
+            CREATE TABLE symbol_references (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                line_number INTEGER NOT NULL,
+                column INTEGER NOT NULL,
+                scope TEXT
+            )
+        """
+        )
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_reference_name ON symbol_references(name, kind)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_reference_file ON symbol_references(file_path)")
+        _force_reparse(cursor)
+
+    # Databases created before the count was maintained are recounted once
+    if cursor.execute("INSERT OR IGNORE INTO index_counters (name, value) VALUES ('references', 0)").rowcount:
+        cursor.execute(
+            "UPDATE index_counters SET value = (SELECT COUNT(*) FROM symbol_references) WHERE name = 'references'"
+        )
+    triggers = {
+        "references_count_insert": """AFTER INSERT ON symbol_references BEGIN
+            UPDATE index_counters SET value = value + 1 WHERE name = 'references';
+        END""",
+        "references_count_delete": """AFTER DELETE ON symbol_references BEGIN
+            UPDATE index_counters SET value = value - 1 WHERE name = 'references';
+        END""",
+    }
+    for name, body in triggers.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+
+
+def create_import_index(conn: sqlite3.Connection):
+    """Create the imports and modules tables behind the module import graph.
+
+    imports holds one row per imported module or name. target is the most
+    specific dotted name an import can refer to ('pkg.name' for
+    'from pkg import name'). modules maps every dotted suffix of an indexed
+    file's module name to that file ('indexing.src.code_searcher',
+    'src.code_searcher' and 'code_searcher'), so imports made through
+    sys.path entries resolve as well as package-relative ones; rank counts
+    the leading components dropped and the lowest rank wins.
+
+    level is the number of leading dots of a relative import, so its
+    target can be rebased when the file moves to another package; rows
+    stored before the column existed have NULL there.
+
+    Files indexed before imports were recorded are re-parsed once.
+    """
+    cursor = conn.cursor()
+    if cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'imports'").fetchone():
+        if "level" not in {row[1] for row in cursor.execute("PRAGMA table_info(imports)")}:
+            cursor.execute("ALTER TABLE imports ADD COLUMN level INTEGER")
+        return
+
+    cursor.execute(
+        """
+        CREATE TABLE imports (
+            id INTEGER PRIMARY KEY,
+            file_path TEXT NOT NULL,
+            module TEXT NOT NULL,
+            imported_module TEXT NOT NULL,
+            symbol TEXT,
+            target TEXT NOT NULL,
+            line_number INTEGER NOT NULL,
+            level INTEGER
+        )
+    """
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_import_file ON imports(file_path)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_import_module ON imports(imported_module)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_import_target ON imports(target)")
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS modules (
+            module TEXT NOT NULL,
+            file_path TEXT NOT NULL,
+            rank INTEGER NOT NULL,
+            PRIMARY KEY (module, file_path)
+        ) WITHOUT ROWID
+    """
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_module_file ON modules(file_path)")
+    _force_reparse(cursor)
+
+
+def _force_reparse(cursor: sqlite3.Cursor):
+    """Clear stored hashes so every indexed file is parsed again on the next scan."""
+    cursor.execute("UPDATE file_hashes SET hash = '', st_mtime_ns = NULL, st_size = NULL, inode = NULL")
+
+
+def module_suffixes(module: str):
+    """Return (suffix, rank) pairs for every dotted suffix of a module name."""
+    parts = module.split(".")
+    return [(".".join(parts[rank:]), rank) for rank in range(len(parts))]
+
+
+def create_fts_index(conn: sqlite3.Connection) -> bool:
+    """Create the symbols_fts full-text index and the triggers that keep it in sync.
+
+    symbols_fts is an external-content FTS5 table over symbols, so it stores
+    only the inverted index. A newly created index is backfilled from any
+    existing rows.
+
+    Returns:
+        True if the index exists, False if this SQLite build lacks FTS5.
+    """
+    cursor = conn.cursor()
+    exists = cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'symbols_fts'").fetchone()
+    if not exists:
+        try:
+            cursor.execute(
+                """
+                CREATE VIRTUAL TABLE symbols_fts USING fts5(
+                    name, docstring, signature, parent,
+                    content='symbols', content_rowid='id', prefix='2 3'
+                )
+            """
+            )
+        except sqlite3.OperationalError as e:
+            logger.warning("FTS5 unavailable, content search will use LIKE scans: %s", e)
+            return False
+
+    # The writer stores a symbol's docstring before its row, so the insert
+    # trigger can read it; deletes run before the docstring is removed
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS symbols_fts_insert AFTER INSERT ON symbol_rows BEGIN
+            INSERT INTO symbols_fts(rowid, name, docstring, signature, parent)
+            VALUES (new.id, new.name, (SELECT docstring FROM docstrings WHERE symbol_id = new.id),
+                    new.signature, new.parent);
+        END
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS symbols_fts_delete BEFORE DELETE ON symbol_rows BEGIN
+            INSERT INTO symbols_fts(symbols_fts, rowid, name, docstring, signature, parent)
+            VALUES ('delete', old.id, old.name, (SELECT docstring FROM docstrings WHERE symbol_id = old.id),
+                    old.signature, old.parent);
+        END
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS symbols_fts_update AFTER UPDATE ON symbol_rows BEGIN
+            INSERT INTO symbols_fts(symbols_fts, rowid, name, docstring, signature, parent)
+            VALUES ('delete', old.id, old.name, (SELECT docstring FROM docstrings WHERE symbol_id = old.id),
+                    old.signature, old.parent);
+            INSERT INTO symbols_fts(rowid, name, docstring, signature, parent)
+            VALUES (new.id, new.name, (SELECT docstring FROM docstrings WHERE symbol_id = new.id),
+                    new.signature, new.parent);
+        END
+    """
+    )
+    if not exists:
+        cursor.execute("INSERT INTO symbols_fts(symbols_fts) VALUES ('rebuild')")
+    return True
+
+
+def create_trigram_indexes(conn: sqlite3.Connection) -> bool:
+    """Create trigram indexes for substring and glob matching on names and paths.
+
+    symbol_names_trigram covers symbol names and file_paths_trigram covers
+    file_hashes.file_path. Both are external-content FTS5 tables using the
+    trigram tokenizer, which lets SQLite answer LIKE patterns with a leading
+    wildcard from the index instead of scanning every row.
+
+    Returns:
+        True if both indexes exist, False if the trigram tokenizer is
+        unavailable (SQLite older than 3.34 or built without FTS5).
+    """
+    cursor = conn.cursor()
+    existing = {
+        row[0]
+        for row in cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN ('symbol_names_trigram', 'file_paths_trigram')"
+        )
+    }
+
+    try:
+        if "symbol_names_trigram" not in existing:
+            cursor.execute(
+                """
+                CREATE VIRTUAL TABLE symbol_names_trigram USING fts5(
+                    name, content='symbol_rows', content_rowid='id', tokenize='trigram'
+                )
+            """
+            )
+            cursor.execute("INSERT INTO symbol_names_trigram(symbol_names_trigram) VALUES ('rebuild')")
+        # Triggers are ensured separately: migrating from the original symbols
+        # table drops the ones that were attached to it
+        cursor.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS symbol_names_trigram_insert AFTER INSERT ON symbol_rows BEGIN
+                INSERT INTO symbol_names_trigram(rowid, name) VALUES (new.id, new.name);
+            END
+        """
+        )
+        cursor.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS symbol_names_trigram_delete AFTER DELETE ON symbol_rows BEGIN
+                INSERT INTO symbol_names_trigram(symbol_names_trigram, rowid, name)
+                VALUES ('delete', old.id, old.name);
+            END
+        """
+        )
+        cursor.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS symbol_names_trigram_update AFTER UPDATE OF name ON symbol_rows BEGIN
+                INSERT INTO symbol_names_trigram(symbol_names_trigram, rowid, name)
+                VALUES ('delete', old.id, old.name);
+                INSERT INTO symbol_names_trigram(rowid, name) VALUES (new.id, new.name);
+            END
+        """
+        )
+
+        if "file_paths_trigram" not in existing:
+            cursor.execute(
+                """
+                CREATE VIRTUAL TABLE file_paths_trigram USING fts5(
+                    file_path, content='file_hashes', content_rowid='rowid', tokenize='trigram'
+                )
+            """
+            )
+            cursor.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS file_paths_trigram_insert AFTER INSERT ON file_hashes BEGIN
+                    INSERT INTO file_paths_trigram(rowid, file_path) VALUES (new.rowid, new.file_path);
+                END
+            """
+            )
+            cursor.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS file_paths_trigram_delete AFTER DELETE ON file_hashes BEGIN
+                    INSERT INTO file_paths_trigram(file_paths_trigram, rowid, file_path)
+                    VALUES ('delete', old.rowid, old.file_path);
+                END
+            """
+            )
+            cursor.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS file_paths_trigram_update AFTER UPDATE OF file_path ON file_hashes BEGIN
+                    INSERT INTO file_paths_trigram(file_paths_trigram, rowid, file_path)
+                    VALUES ('delete', old.rowid, old.file_path);
+                    INSERT INTO file_paths_trigram(rowid, file_path) VALUES (new.rowid, new.file_path);
+                END
+            """
+            )
+            cursor.execute("INSERT INTO file_paths_trigram(file_paths_trigram) VALUES ('rebuild')")
+    except sqlite3.OperationalError as e:
+        logger.warning("Trigram tokenizer unavailable, wildcard searches will scan: %s", e)
+        return False
+
+    return True
+
+
+def read_cached_extraction(conn: sqlite3.Connection, content_hash: str, extractor_version: int) -> Optional[bytes]:
+    """Return the cached extraction payload for file content, or None on a miss."""
+    row = conn.execute(
+        "SELECT payload FROM extraction_cache WHERE content_hash = ? AND extractor_version = ?",
+        (content_hash, extractor_version),
+    ).fetchone()
+    return row[0] if row else None
+
+
+class SymbolStore:
+    """Batched writer for symbols and file hashes.
+
+    Writes are grouped into transactions of ``batch_size`` files. Callers
+    that need a write to be visible immediately call ``commit()``.
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        on_commit: Optional[Callable[[int], None]] = None,
+    ):
+        """Open the writer connection and ensure the schema exists.
+
+        Args:
+            db_path: Path to the SQLite index database.
+            batch_size: Number of files written per transaction.
+            on_commit: Called with the number of files of every committed
+                transaction that changed any, e.g. to record batch sizes.
+        """
+        self.db_path = Path(db_path)
+        self.batch_size = max(1, batch_size)
+        self.on_commit = on_commit
+        self.pending = 0
+        self._lock = threading.RLock()
+
+        # Shared by the watcher's observer thread and the main thread, guarded by _lock
+        self.conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        for pragma, value in WRITER_PRAGMAS.items():
+            self.conn.execute(f"PRAGMA {pragma} = {value}")
+        create_schema(self.conn)
+        self._kind_ids = {name: kind_id for kind_id, name in self.conn.execute("SELECT id, name FROM symbol_kinds")}
+
+    def write_file(
+        self,
+        file_path: Union[str, Path],
+        symbols: Iterable,
+        file_hash: str,
+        stat: Optional[os.stat_result] = None,
+        references: Iterable = (),
+        imports: Iterable = (),
+        module: Optional[str] = None,
+    ):
+        """Replace the stored symbols, references, imports, hash and stat signature of one file.
+
+        Args:
+            file_path: Path of the indexed file.
+            symbols: Objects with name, type, file_path, line_number, column,
+                parent, signature and docstring attributes.
+            file_hash: Content hash of the file, computed once by the caller.
+            stat: Stat taken before the file was read, used by later scans to
+                skip hashing unchanged files.
+            references: Objects with name, kind, line_number, column and scope
+                attributes recorded for the file.
+            imports: Objects with imported_module, symbol, target and
+                line_number attributes recorded for the file.
+            module: Dotted module name of the file, used to resolve imports
+                of it from other files.
+        """
+        symbols = list(symbols)
+        reference_rows = [
+            (ref.name, ref.kind, str(file_path), ref.line_number, ref.column, ref.scope) for ref in references
+        ]
+        import_rows = [
+            (str(file_path), module or "", imp.imported_module, imp.symbol, imp.target, imp.line_number, imp.level)
+            for imp in imports
+        ]
+        module_rows = [(suffix, str(file_path), rank) for suffix, rank in module_suffixes(module)] if module else []
+
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("DELETE FROM symbol_rows WHERE file_id = (SELECT id FROM files WHERE path = ?)", (str(file_path),))
+            if symbols:
+                cursor.execute("INSERT OR IGNORE INTO files (path) VALUES (?)", (str(file_path),))
+                file_id = cursor.execute("SELECT id FROM files WHERE path = ?", (str(file_path),)).fetchone()[0]
+                # Ids are assigned here so docstrings can be stored before their
+                # rows, where the full-text insert trigger expects them
+                first_id = cursor.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM symbol_rows").fetchone()[0]
+                rows = []
+                docstring_rows = []
+                for symbol_id, symbol in enumerate(symbols, start=first_id):
+                    rows.append(
+                        (
+                            symbol_id,
+                            symbol.name,
+                            self._kind_id(symbol.type),
+                            file_id,
+                            symbol.line_number,
+                            symbol.column,
+                            symbol.parent,
+                            symbol.signature,
+                        )
+                    )
+                    if symbol.docstring is not None:
+                        docstring_rows.append((symbol_id, symbol.docstring))
+                cursor.executemany(
+                    "INSERT OR REPLACE INTO docstrings (symbol_id, docstring) VALUES (?, ?)", docstring_rows
+                )
+                cursor.executemany(
+                    """
+                    INSERT OR REPLACE INTO symbol_rows
+                    (id, name, kind, file_id, line_number, column, parent, signature)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                    rows,
+                )
+            else:
+                cursor.execute("DELETE FROM files WHERE path = ?", (str(file_path),))
+            cursor.execute("DELETE FROM symbol_references WHERE file_path = ?", (str(file_path),))
+            cursor.executemany(
+                """
+                INSERT INTO symbol_references (name, kind, file_path, line_number, column, scope)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """,
+                reference_rows,
+            )
+            cursor.execute("DELETE FROM imports WHERE file_path = ?", (str(file_path),))
+            cursor.executemany(
+                """
+                INSERT INTO imports (file_path, module, imported_module, symbol, target, line_number, level)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+                import_rows,
+            )
+            cursor.execute("DELETE FROM modules WHERE file_path = ?", (str(file_path),))
+            cursor.executemany("INSERT OR IGNORE INTO modules (module, file_path, rank) VALUES (?, ?, ?)", module_rows)
+            cursor.execute(
+                """
+                INSERT OR REPLACE INTO file_hashes (file_path, hash, last_modified, st_mtime_ns, st_size, inode)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """,
+                (str(file_path), file_hash, datetime.now(), *stat_signature(stat)),
+            )
+            self._mark_pending()
+
+    def _kind_id(self, kind: str) -> int:
+        """Return the symbol_kinds id of a symbol type, adding types seen for the first time."""
+        kind_id = self._kind_ids.get(kind)
+        if kind_id is None:
+            self.conn.execute("INSERT OR IGNORE INTO symbol_kinds (name) VALUES (?)", (kind,))
+            kind_id = self.conn.execute("SELECT id FROM symbol_kinds WHERE name = ?", (kind,)).fetchone()[0]
+            self._kind_ids[kind] = kind_id
+        return kind_id
+
+    def update_file_stat(self, file_path: Union[str, Path], stat: os.stat_result):
+        """Record a new stat signature for a file whose content did not change."""
+        with self._lock:
+            self.conn.execute(
+                "UPDATE file_hashes SET st_mtime_ns = ?, st_size = ?, inode = ? WHERE file_path = ?",
+                (*stat_signature(stat), str(file_path)),
+            )
+            self._mark_pending()
+
+    def delete_file(self, file_path: Union[str, Path]):
+        """Remove all symbols, references, imports and the stored hash of one file."""
+        with self._lock:
+            self.conn.execute(
+                "DELETE FROM symbol_rows WHERE file_id = (SELECT id FROM files WHERE path = ?)", (str(file_path),)
+            )
+            self.conn.execute("DELETE FROM files WHERE path = ?", (str(file_path),))
+            for table in FILE_TABLES:
+                self.conn.execute(f"DELETE FROM {table} WHERE file_path = ?", (str(file_path),))
+            self._mark_pending()
+
+    def move_file(
+        self,
+        old_path: Union[str, Path],
+        new_path: Union[str, Path],
+        module: Optional[str] = None,
+        imports: Optional[Iterable] = None,
+    ) -> bool:
+        """Re-point every stored row of a file to a new path without re-parsing it.
+
+        Rows already stored under the new path, left by a file the move
+        replaced, are deleted first.
+
+        Args:
+            old_path: Path the file was indexed under.
+            new_path: Path the file was moved to.
+            module: Dotted module name of the file at its new path.
+            imports: Replacement import rows, for moves that change the
+                package relative imports resolve against. None keeps the
+                stored rows.
+
+        Returns:
+            False if nothing is stored under old_path.
+        """
+        old, new = str(old_path), str(new_path)
+        with self._lock:
+            if not self.conn.execute("SELECT 1 FROM file_hashes WHERE file_path = ?", (old,)).fetchone():
+                return False
+            if old == new:
+                return True
+            self.delete_file(new)
+
+            cursor = self.conn.cursor()
+            cursor.execute("UPDATE files SET path = ? WHERE path = ?", (new, old))
+            cursor.execute("UPDATE symbol_references SET file_path = ? WHERE file_path = ?", (new, old))
+            # A new last_modified lets watermark readers such as the embedding sync see the new path
+            cursor.execute(
+                "UPDATE file_hashes SET file_path = ?, last_modified = ? WHERE file_path = ?", (new, datetime.now(), old)
+            )
+            if imports is None:
+                cursor.execute("UPDATE imports SET file_path = ?, module = ? WHERE file_path = ?", (new, module or "", old))
+            else:
+                cursor.execute("DELETE FROM imports WHERE file_path = ?", (old,))
+                cursor.executemany(
+                    """
+                    INSERT INTO imports (file_path, module, imported_module, symbol, target, line_number, level)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                    [
+                        (new, module or "", imp.imported_module, imp.symbol, imp.target, imp.line_number, imp.level)
+                        for imp in imports
+                    ],
+                )
+            cursor.execute("DELETE FROM modules WHERE file_path = ?", (old,))
+            if module:
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO modules (module, file_path, rank) VALUES (?, ?, ?)",
+                    [(suffix, new, rank) for suffix, rank in module_suffixes(module)],
+                )
+            self._mark_pending()
+        return True
+
+    def stored_paths_under(self, path: Union[str, Path]) -> List[str]:
+        """Return the stored file paths equal to a path or below it as a directory."""
+        prefix = os.path.join(str(path), "")
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT file_path FROM file_hashes WHERE file_path = ? OR (file_path >= ? AND file_path < ?)",
+                (str(path), prefix, upper),
+            )
+            return [row[0] for row in rows]
+
+    def get_imports(self, file_path: Union[str, Path]) -> List[Tuple[str, Optional[str], int, Optional[int]]]:
+        """Return (imported_module, symbol, line_number, level) of every stored import of a file."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT imported_module, symbol, line_number, level FROM imports WHERE file_path = ? ORDER BY id",
+                (str(file_path),),
+            ).fetchall()
+
+    def remove_missing_files(self, present_paths: Iterable, scope: Union[str, Path]) -> Dict[str, int]:
+        """Delete every stored file under a directory that is not in a set of walked paths.
+
+        The walked paths are loaded into a temporary table and diffed against
+        the stored files in one EXCEPT query; the orphans' rows are then
+        deleted from every per-file table and committed in one transaction.
+
+        Args:
+            present_paths: Paths of the source files that currently exist.
+            scope: Directory the walk covered; files stored outside it are kept.
+
+        Returns:
+            Dictionary with the number of files and of rows removed.
+        """
+        # Stored paths under scope sort between "scope/" and "scope0" ('0' follows '/')
+        prefix = os.path.join(str(scope), "")
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS present_files (file_path TEXT PRIMARY KEY)")
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS orphan_files (file_path TEXT PRIMARY KEY)")
+            cursor.execute("DELETE FROM present_files")
+            cursor.execute("DELETE FROM orphan_files")
+            cursor.executemany(
+                "INSERT OR IGNORE INTO present_files (file_path) VALUES (?)", ((str(path),) for path in present_paths)
+            )
+            cursor.execute(
+                """
+                INSERT INTO orphan_files (file_path)
+                SELECT file_path FROM file_hashes WHERE file_path >= ? AND file_path < ?
+                UNION
+                SELECT path FROM files WHERE path >= ? AND path < ?
+                EXCEPT
+                SELECT file_path FROM present_files
+            """,
+                (prefix, upper, prefix, upper),
+            )
+            files_removed = cursor.execute("SELECT COUNT(*) FROM orphan_files").fetchone()[0]
+
+            rows_removed = 0
+            if files_removed:
+                cursor.execute(
+                    """
+                    DELETE FROM symbol_rows WHERE file_id IN (
+                        SELECT id FROM files WHERE path IN (SELECT file_path FROM orphan_files)
+                    )
+                """
+                )
+                rows_removed += cursor.rowcount
+                cursor.execute("DELETE FROM files WHERE path IN (SELECT file_path FROM orphan_files)")
+                for table in FILE_TABLES:
+                    cursor.execute(f"DELETE FROM {table} WHERE file_path IN (SELECT file_path FROM orphan_files)")
+                    rows_removed += cursor.rowcount
+
+            cursor.execute("DELETE FROM present_files")
+            cursor.execute("DELETE FROM orphan_files")
+            self.pending += files_removed
+            self.commit()
+
+        return {"files_removed": files_removed, "rows_removed": rows_removed}
+
+    def get_file_hash(self, file_path: Union[str, Path]):
+        """Return the stored hash of a file, or None if it was never indexed."""
+        with self._lock:
+            row = self.conn.execute("SELECT hash FROM file_hashes WHERE file_path = ?", (str(file_path),)).fetchone()
+        return row[0] if row else None
+
+    def get_file_state(self, file_path: Union[str, Path]) -> Optional[FileState]:
+        """Return the stored hash and stat signature of a file, or None."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT hash, st_mtime_ns, st_size, inode FROM file_hashes WHERE file_path = ?", (str(file_path),)
+            ).fetchone()
+        return FileState(*row) if row else None
+
+    def get_all_file_states(self) -> Dict[str, FileState]:
+        """Return every stored file path mapped to its FileState in one query."""
+        with self._lock:
+            rows = self.conn.execute("SELECT file_path, hash, st_mtime_ns, st_size, inode FROM file_hashes")
+            return {row[0]: FileState(*row[1:]) for row in rows}
+
+    def get_meta(self, key: str) -> Optional[str]:
+        """Return a value from the index_meta table, or None if it was never set."""
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM index_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: Optional[str]):
+        """Store a value in the index_meta table as part of the current transaction."""
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO index_meta (key, value) VALUES (?, ?)", (key, value))
+
+    def get_cached_extraction(self, content_hash: str, extractor_version: int) -> Optional[bytes]:
+        """Return the cached extraction payload for file content and mark it recently used."""
+        with self._lock:
+            payload = read_cached_extraction(self.conn, content_hash, extractor_version)
+            if payload is not None:
+                self.touch_cached_extraction(content_hash, extractor_version)
+        return payload
+
+    def touch_cached_extraction(self, content_hash: str, extractor_version: int):
+        """Mark a cache entry as used now, as part of the current transaction."""
+        with self._lock:
+            self.conn.execute(
+                "UPDATE extraction_cache SET last_used = ? WHERE content_hash = ? AND extractor_version = ?",
+                (int(time.time()), content_hash, extractor_version),
+            )
+
+    def put_cached_extraction(self, content_hash: str, extractor_version: int, payload: bytes):
+        """Cache the extraction payload of file content as part of the current transaction."""
+        with self._lock:
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO extraction_cache (content_hash, extractor_version, payload, size, last_used)
+                VALUES (?, ?, ?, ?, ?)
+            """,
+                (content_hash, extractor_version, payload, len(payload), int(time.time())),
+            )
+
+    def trim_extraction_cache(self, max_bytes: int, extractor_version: int) -> int:
+        """Evict least recently used cache entries until the cache fits in max_bytes.
+
+        Entries written by other extractor versions can never be used again
+        and are always evicted.
+
+        Returns:
+            Number of entries evicted.
+        """
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("DELETE FROM extraction_cache WHERE extractor_version != ?", (extractor_version,))
+            evicted = cursor.rowcount
+            # Keep the most recently used entries whose running size total fits
+            cursor.execute(
+                """
+                DELETE FROM extraction_cache WHERE content_hash IN (
+                    SELECT content_hash FROM (
+                        SELECT content_hash,
+                               SUM(size) OVER (ORDER BY last_used DESC, content_hash ROWS UNBOUNDED PRECEDING) AS total
+                        FROM extraction_cache
+                    ) WHERE total > ?
+                )
+            """,
+                (max(0, max_bytes),),
+            )
+            evicted += cursor.rowcount
+            self.commit()
+        if evicted:
+            logger.info("Evicted %d extraction cache entries", evicted)
+        return evicted
+
+    def _mark_pending(self):
+        """Count a written file and commit once a full batch is pending."""
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.commit()
+
+    def commit(self):
+        """Commit all pending writes, bumping the index generation if files changed."""
+        with self._lock:
+            if self.pending:
+                logger.debug("Committing %d file(s) to %s", self.pending, self.db_path)
+                self.conn.execute(
+                    "UPDATE index_meta SET value = CAST(value AS INTEGER) + 1 WHERE key = ?", (GENERATION_KEY,)
+                )
+                self.set_meta(LAST_INDEXED_KEY, str(datetime.now()))
+            self.conn.commit()
+            if self.pending and self.on_commit is not None:
+                self.on_commit(self.pending)
+            self.pending = 0
+
+    def close(self):
+        """Commit pending writes and close the connection."""
+        with self._lock:
+            self.commit()
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
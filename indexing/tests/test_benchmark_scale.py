@@ -0,0 +1,56 @@
+# RULE #0: MANDATORY FIRST ACTION FOR EVERY REQUEST
+# 1. Read CLAUDE.md COMPLETELY before responding
+# 2. Setup Python venv: [ -d "venv" ] || ./setup-venv.sh && source venv/bin/activate
+# 3. Search for rules related to the request
+# 4. Only proceed after confirming no violations
+# Failure to follow Rule #0 has caused real harm. Check BEFORE acting, not AFTER making mistakes.
+#
+# GUARDS ARE SAFETY EQUIPMENT - WHEN THEY FIRE, FIX THE PROBLEM THEY FOUND
+# NEVER weaken, disable, or bypass guards - they prevent real harm
+
+"""Tests for the indexer and searcher scale benchmark."""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from benchmark_scale import QUERIES, compare, measure, percentile
+
+
+class TestBenchmarkScale(unittest.TestCase):
+    """Test the measurements and the baseline comparison."""
+
+    def test_measure_reports_every_metric(self):
+        """Test that a tiny repository yields every timing."""
+        metrics = measure(files=20, workers=1, repeat=4, updates=2)
+
+        self.assertGreater(metrics["symbols"], 20)
+        for name in ("cold_index_ms", "noop_rescan_ms", "update_p50_ms", "update_p99_ms"):
+            self.assertGreater(metrics[name], 0)
+        for search_type in QUERIES:
+            self.assertLessEqual(metrics[f"search_{search_type}_p50_ms"], metrics[f"search_{search_type}_p99_ms"])
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 0.5), 50)
+        self.assertEqual(percentile(samples, 0.99), 99)
+        self.assertEqual(percentile([7.0], 0.99), 7.0)
+
+    def test_compare_flags_only_real_slowdowns(self):
+        """Test that regressions need both the relative and the absolute margin."""
+        baselines = {"1000": {"metrics": {"cold_index_ms": 1000.0, "search_name_p50_ms": 0.2, "symbols": 10}}}
+        results = {"1000": {"metrics": {"cold_index_ms": 1400.0, "search_name_p50_ms": 0.9, "symbols": 99}}}
+
+        regressions = compare(results, baselines, tolerance=0.25)
+
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("cold_index_ms", regressions[0])
+        self.assertEqual(compare(results, baselines, tolerance=0.5), [])
+        self.assertEqual(compare({"10": results["1000"]}, baselines, tolerance=0.25), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,8 +14,10 @@ import os
 import sqlite3
 import sys
 import tempfile
+import time
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
@@ -34,6 +36,7 @@ class TestCodeIndexer(unittest.TestCase):
     def tearDown(self):
         """Clean up test environment."""
         import shutil
+        self.indexer.close()
         shutil.rmtree(self.temp_dir, ignore_errors=True)
 
     def test_symbol_dataclass(self):
@@ -62,9 +65,12 @@ class TestCodeIndexer(unittest.TestCase):
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
 
-        # Check symbols table
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='symbols'")
+        # Check symbols view over the normalized tables
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='view' AND name='symbols'")
         self.assertIsNotNone(cursor.fetchone())
+        for table in ("symbol_rows", "files", "symbol_kinds", "docstrings"):
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,))
+            self.assertIsNotNone(cursor.fetchone(), table)
 
         # Check file_hashes table
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='file_hashes'")
@@ -173,6 +179,50 @@ class Outer:
         inner_method = next(s for s in symbols if s.name == "inner_method")
         self.assertEqual(inner_method.parent, "Inner")
 
+    def test_extract_python_records_references(self):
+        """Test that the AST pass records calls, attributes, name loads and imports."""
+        python_code = """
+import os
+from pathlib import Path
+
+class Loader:
+    def load(self, name):
+        path = Path(os.getcwd()) / name
+        return path.read_text()
+
+def main():
+    def helper():
+        return Loader().load(DEFAULT)
+    return helper()
+"""
+
+        test_file = self.test_dir / "loader.py"
+        test_file.write_text(python_code)
+
+        symbols, references, _ = self.indexer.extract_python(test_file)
+
+        # Functions nested in function bodies are not symbols
+        self.assertEqual({s.name for s in symbols}, {"Loader", "load", "main"})
+
+        found = {(r.name, r.kind, r.scope) for r in references}
+        self.assertIn(("os", "import", None), found)
+        self.assertIn(("Path", "import", None), found)
+        self.assertIn(("Path", "call", "Loader.load"), found)
+        self.assertIn(("getcwd", "call", "Loader.load"), found)
+        self.assertIn(("os", "name", "Loader.load"), found)
+        self.assertIn(("read_text", "call", "Loader.load"), found)
+        self.assertIn(("Loader", "call", "main.helper"), found)
+        self.assertIn(("load", "call", "main.helper"), found)
+        self.assertIn(("DEFAULT", "name", "main.helper"), found)
+        self.assertIn(("helper", "call", "main"), found)
+        self.assertNotIn("self", {r.name for r in references})
+
+        # Calls are not also recorded as plain name loads
+        self.assertNotIn(("Path", "name", "Loader.load"), found)
+
+        read_text = next(r for r in references if r.name == "read_text")
+        self.assertEqual((read_text.line_number, read_text.column), (8, 20))
+
     def test_extract_symbols_regex_fallback(self):
         """Test regex fallback for syntax errors."""
         # Malformed Python that will cause AST to fail
@@ -234,6 +284,58 @@ class ValidClass:
         # Should need reindexing
         self.assertTrue(self.indexer.should_reindex_file(test_file))
 
+    def test_should_reindex_file_skips_hash_when_stat_unchanged(self):
+        """Test that a file with an unchanged stat signature is not re-hashed."""
+        test_file = self.test_dir / "stat_checked.py"
+        test_file.write_text("def stat_checked(): pass")
+        past = time.time() - 60
+        os.utime(test_file, (past, past))
+        self.indexer.index_file(test_file)
+
+        with patch.object(self.indexer, "get_file_hash") as get_file_hash:
+            self.assertFalse(self.indexer.should_reindex_file(test_file))
+        get_file_hash.assert_not_called()
+
+    def test_should_reindex_file_touched_but_unchanged(self):
+        """Test that touching a file records its new stat instead of re-indexing."""
+        test_file = self.test_dir / "touched.py"
+        test_file.write_text("def touched(): pass")
+        old = time.time() - 120
+        os.utime(test_file, (old, old))
+        self.indexer.index_file(test_file)
+
+        newer = time.time() - 60
+        os.utime(test_file, (newer, newer))
+        self.assertFalse(self.indexer.should_reindex_file(test_file))
+
+        state = self.indexer.store.get_file_state(test_file)
+        self.assertEqual(state.st_mtime_ns, os.stat(test_file).st_mtime_ns)
+
+    def test_should_reindex_file_same_size_edit(self):
+        """Test that an edit keeping the same size is still detected via mtime."""
+        test_file = self.test_dir / "same_size.py"
+        test_file.write_text("def aaa(): pass")
+        old = time.time() - 120
+        os.utime(test_file, (old, old))
+        self.indexer.index_file(test_file)
+
+        test_file.write_text("def bbb(): pass")
+        self.assertTrue(self.indexer.should_reindex_file(test_file))
+
+    def test_blake2b_hash_algorithm(self):
+        """Test indexing with a non-default hash algorithm."""
+        indexer = CodeIndexer(project_root=self.temp_dir, hash_algorithm="blake2b")
+        test_file = self.test_dir / "hashed.py"
+        test_file.write_text("def hashed(): pass")
+        indexer.index_file(test_file)
+
+        self.assertEqual(len(indexer.store.get_file_hash(test_file)), 32)
+        self.assertFalse(indexer.should_reindex_file(test_file))
+        indexer.close()
+
+        with self.assertRaises(ValueError):
+            CodeIndexer(project_root=self.temp_dir, hash_algorithm="crc0")
+
     def test_index_file_complete_workflow(self):
         """Test complete file indexing workflow."""
         python_code = '''
@@ -311,6 +413,126 @@ class TestClass:
         self.assertIn("class", stats["type_counts"])
         self.assertIn("method", stats["type_counts"])
 
+    def test_index_parallel_matches_serial(self):
+        """Test that parallel indexing stores the same symbols as serial indexing."""
+        for i in range(6):
+            (self.test_dir / f"module_{i}.py").write_text(
+                f"class Widget{i}:\n    def render(self): pass\n\ndef build_{i}(x): return x\n"
+            )
+
+        self.indexer.store.batch_size = 2
+        result = self.indexer.index_parallel(workers=2)
+        parallel_stats = self.indexer.get_stats()
+
+        self.assertEqual(result["files_scanned"], 6)
+        self.assertEqual(result["files_indexed"], 6)
+        self.assertGreater(result["files_per_sec"], 0)
+        self.assertEqual(parallel_stats["total_files"], 6)
+        self.assertEqual(parallel_stats["type_counts"], {"class": 6, "method": 6, "function": 6})
+
+        serial_dir = tempfile.mkdtemp()
+        try:
+            for path in self.test_dir.glob("*.py"):
+                (Path(serial_dir) / path.name).write_text(path.read_text())
+            serial_indexer = CodeIndexer(project_root=serial_dir)
+            serial_indexer.index_all()
+            self.assertEqual(serial_indexer.get_stats()["type_counts"], parallel_stats["type_counts"])
+            serial_indexer.close()
+        finally:
+            import shutil
+            shutil.rmtree(serial_dir, ignore_errors=True)
+
+    def test_index_parallel_skips_unchanged_files(self):
+        """Test that a parallel rescan only re-indexes files whose content changed."""
+        for i in range(3):
+            (self.test_dir / f"stable_{i}.py").write_text(f"def stable_{i}(): pass\n")
+        self.indexer.index_all(workers=2)
+
+        (self.test_dir / "stable_1.py").write_text("def changed(): pass\n")
+        result = self.indexer.index_parallel(workers=2)
+
+        self.assertEqual(result["files_scanned"], 3)
+        self.assertEqual(result["files_indexed"], 1)
+        self.assertFalse(self.indexer.should_reindex_file(self.test_dir / "stable_1.py"))
+
+    def test_extraction_cache_survives_file_moves(self):
+        """Test that content seen before is rebuilt from the cache without parsing."""
+        source = "from ..util import helper\n\nclass Moved:\n    def run(self):\n        return helper()\n"
+        old_path = self.test_dir / "pkg" / "sub" / "old.py"
+        old_path.parent.mkdir(parents=True)
+        old_path.write_text(source)
+        self.indexer.index_file(old_path)
+
+        new_path = self.test_dir / "lib" / "inner" / "new.py"
+        new_path.parent.mkdir(parents=True)
+        old_path.rename(new_path)
+        expected = self.indexer.extract_python(new_path)
+
+        with patch.object(self.indexer, "extract_python", side_effect=AssertionError("parsed again")):
+            file_hash, parsed = self.indexer.read_and_extract(new_path)
+
+        self.assertEqual(file_hash, self.indexer.get_file_hash(new_path))
+        self.assertEqual(parsed, expected)
+        self.assertEqual(parsed.imports[0].imported_module, "lib.util")
+        self.assertEqual({symbol.file_path for symbol in parsed.symbols}, {str(new_path)})
+
+    def test_move_path_rewrites_paths_without_parsing(self):
+        """Test that a directory rename re-points rows and rebases relative imports."""
+        package = self.test_dir / "pkg" / "sub"
+        package.mkdir(parents=True)
+        (package / "mod.py").write_text("from ..util import helper\nimport os\n\ndef run():\n    return helper()\n")
+        (package / "other.py").write_text("def other(): pass\n")
+        self.indexer.index_all(use_git=False)
+
+        (self.test_dir / "pkg").rename(self.test_dir / "lib")
+        new_path = self.test_dir / "lib" / "sub" / "mod.py"
+        with patch.object(self.indexer, "read_and_extract", side_effect=AssertionError("parsed again")):
+            result = self.indexer.move_path(self.test_dir / "pkg", self.test_dir / "lib")
+
+        self.assertEqual(result, {"files_moved": 2, "files_indexed": 0, "files_removed": 0})
+        self.assertIsNone(self.indexer.store.get_file_state(package / "mod.py"))
+        self.assertFalse(self.indexer.should_reindex_file(new_path))
+        conn = sqlite3.connect(self.indexer.db_path)
+        self.assertEqual(
+            conn.execute("SELECT file_path FROM symbols WHERE name = 'run'").fetchone()[0], str(new_path)
+        )
+        self.assertEqual(
+            conn.execute("SELECT module, target FROM imports WHERE symbol = 'helper'").fetchone(),
+            ("lib.sub.mod", "lib.util.helper"),
+        )
+        self.assertEqual(conn.execute("SELECT target FROM imports WHERE symbol IS NULL").fetchone()[0], "os")
+        self.assertEqual(
+            conn.execute("SELECT file_path FROM modules WHERE module = 'lib.sub.mod'").fetchone()[0], str(new_path)
+        )
+        conn.close()
+
+    def test_move_path_parses_only_changed_content(self):
+        """Test that a rename over an indexed file with new content indexes it again."""
+        target = self.test_dir / "target.py"
+        target.write_text("def before(): pass\n")
+        self.indexer.index_file(target)
+        temp = self.test_dir / "target.py.tmp"
+        temp.write_text("def after(): pass\n")
+        temp.rename(target)
+
+        result = self.indexer.move_path(temp, target)
+
+        self.assertEqual(result, {"files_moved": 0, "files_indexed": 1, "files_removed": 0})
+        conn = sqlite3.connect(self.indexer.db_path)
+        self.assertEqual([row[0] for row in conn.execute("SELECT name FROM symbols")], ["after"])
+        conn.close()
+
+    def test_extraction_cache_disabled(self):
+        """Test that a zero cache size parses every time and stores nothing."""
+        indexer = CodeIndexer(project_root=self.temp_dir, cache_max_bytes=0)
+        test_file = self.test_dir / "plain.py"
+        test_file.write_text("def plain(): pass\n")
+        indexer.index_file(test_file)
+
+        count = indexer.store.conn.execute("SELECT COUNT(*) FROM extraction_cache").fetchone()[0]
+        indexer.close()
+        self.assertEqual(count, 0)
+
     def test_extract_symbols_edge_cases(self):
         """Test edge cases in symbol extraction."""
         edge_cases = [
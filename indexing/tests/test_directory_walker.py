@@ -0,0 +1,120 @@
+# RULE #0: MANDATORY FIRST ACTION FOR EVERY REQUEST
+# 1. Read CLAUDE.md COMPLETELY before responding
+# 2. Setup Python venv: [ -d "venv" ] || ./setup-venv.sh && source venv/bin/activate
+# 3. Search for rules related to the request
+# 4. Only proceed after confirming no violations
+# Failure to follow Rule #0 has caused real harm. Check BEFORE acting, not AFTER making mistakes.
+#
+# GUARDS ARE SAFETY EQUIPMENT - WHEN THEY FIRE, FIX THE PROBLEM THEY FOUND
+# NEVER weaken, disable, or bypass guards - they prevent real harm
+
+"""Unit tests for the shared pruning directory walker."""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from directory_walker import is_ignored, parse_gitignore, walk_files
+
+
+class TestDirectoryWalker(unittest.TestCase):
+    """Test pruning, gitignore handling and threaded walks."""
+
+    def setUp(self):
+        """Create a small tree with excluded and ignored directories."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.root = Path(self.temp_dir)
+        files = {
+            "main.py": "",
+            "README.md": "",
+            "pkg/module.py": "",
+            "pkg/debug.log": "",
+            "pkg/keep.log": "",
+            "pkg/.gitignore": "generated/\n",
+            "pkg/generated/out.py": "",
+            "node_modules/lib/index.js": "",
+            ".venv/lib/site.py": "",
+            "build/artifact.py": "",
+            "other/deep/nested/leaf.py": "",
+            ".gitignore": "*.log\n!keep.log\n/build\n",
+        }
+        for name, content in files.items():
+            path = self.root / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+
+    def tearDown(self):
+        """Remove the tree."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def walk(self, **kwargs):
+        """Return walked paths relative to the root."""
+        return sorted(Path(entry.path).relative_to(self.root).as_posix() for entry in walk_files(self.root, **kwargs))
+
+    def test_prunes_excluded_and_ignored_directories(self):
+        """Test that excluded, gitignored and nested-gitignored trees are skipped."""
+        self.assertEqual(
+            self.walk(),
+            [
+                ".gitignore",
+                "README.md",
+                "main.py",
+                "other/deep/nested/leaf.py",
+                "pkg/.gitignore",
+                "pkg/keep.log",
+                "pkg/module.py",
+            ],
+        )
+
+    def test_extension_filter(self):
+        """Test that only the requested suffixes are yielded."""
+        self.assertEqual(self.walk(extensions={".py"}), ["main.py", "other/deep/nested/leaf.py", "pkg/module.py"])
+
+    def test_without_gitignore(self):
+        """Test that gitignore handling can be disabled while exclusions still apply."""
+        walked = self.walk(extensions={".py"}, use_gitignore=False)
+        self.assertIn("build/artifact.py", walked)
+        self.assertIn("pkg/generated/out.py", walked)
+        self.assertNotIn(".venv/lib/site.py", walked)
+
+    def test_threaded_walk_matches_serial(self):
+        """Test that fanning out across top-level directories yields the same files."""
+        self.assertEqual(self.walk(threads=4), self.walk())
+
+    def test_does_not_follow_directory_symlinks(self):
+        """Test that a symlink cycle does not cause an endless walk."""
+        os.symlink(self.root, self.root / "pkg" / "loop")
+        self.assertNotIn("pkg/loop/main.py", self.walk())
+
+    def test_entries_carry_stat(self):
+        """Test that yielded entries expose stat data for change detection."""
+        entry = next(e for e in walk_files(self.root) if e.name == "main.py")
+        self.assertEqual(entry.stat().st_size, 0)
+
+
+class TestGitignoreRules(unittest.TestCase):
+    """Test gitignore pattern parsing."""
+
+    def test_anchored_and_wildcard_patterns(self):
+        """Test anchoring, '**' and directory-only patterns."""
+        rules = parse_gitignore("/dist\ndocs/**/*.tmp\ncache/\n")
+        self.assertTrue(is_ignored("dist", True, rules))
+        self.assertFalse(is_ignored("src/dist", True, rules))
+        self.assertTrue(is_ignored("docs/a/b/page.tmp", False, rules))
+        self.assertTrue(is_ignored("src/cache", True, rules))
+        self.assertFalse(is_ignored("src/cache", False, rules))
+
+    def test_nested_rules_apply_below_their_directory(self):
+        """Test that rules from a nested .gitignore only match inside that directory."""
+        rules = parse_gitignore("*.gen\n", base="pkg")
+        self.assertTrue(is_ignored("pkg/sub/a.gen", False, rules))
+        self.assertFalse(is_ignored("a.gen", False, rules))
+
+
+if __name__ == "__main__":
+    unittest.main()
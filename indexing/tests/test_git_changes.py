@@ -0,0 +1,132 @@
+# RULE #0: MANDATORY FIRST ACTION FOR EVERY REQUEST
+# 1. Read CLAUDE.md COMPLETELY before responding
+# 2. Setup Python venv: [ -d "venv" ] || ./setup-venv.sh && source venv/bin/activate
+# 3. Search for rules related to the request
+# 4. Only proceed after confirming no violations
+# Failure to follow Rule #0 has caused real harm. Check BEFORE acting, not AFTER making mistakes.
+#
+# GUARDS ARE SAFETY EQUIPMENT - WHEN THEY FIRE, FIX THE PROBLEM THEY FOUND
+# NEVER weaken, disable, or bypass guards - they prevent real harm
+
+"""Unit tests for git-driven incremental indexing."""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from code_indexer import INDEXED_COMMIT_KEY, CodeIndexer
+from git_changes import collect_changes, find_repo_root
+
+
+@unittest.skipUnless(shutil.which("git"), "git is not installed")
+class TestGitIncrementalIndex(unittest.TestCase):
+    """Test that indexing inside a git work tree only processes the diff."""
+
+    def setUp(self):
+        """Create a repository with two committed modules and index it."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.repo = Path(self.temp_dir).resolve()
+        self.git("init", "-q", "-b", "main")
+        (self.repo / ".gitignore").write_text(".code_index.db*\n")
+        (self.repo / "alpha.py").write_text("def alpha(): pass\n")
+        (self.repo / "beta.py").write_text("def beta(): pass\n")
+        self.commit("initial")
+
+        self.indexer = CodeIndexer(project_root=str(self.repo))
+        self.indexer.index_all()
+
+    def tearDown(self):
+        """Remove the repository."""
+        self.indexer.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def git(self, *args):
+        """Run git in the test repository."""
+        subprocess.run(
+            ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+            cwd=self.repo,
+            check=True,
+            capture_output=True,
+        )
+
+    def commit(self, message):
+        """Commit every change in the work tree."""
+        self.git("add", "-A")
+        self.git("commit", "-q", "-m", message)
+
+    def names(self):
+        """Return the indexed symbol names."""
+        rows = self.indexer.store.conn.execute("SELECT name FROM symbols ORDER BY name")
+        return [row[0] for row in rows]
+
+    def index_without_walking(self):
+        """Run index_all, failing if it falls back to a full walk."""
+        with patch.object(self.indexer, "iter_source_entries", side_effect=AssertionError("full walk")):
+            self.indexer.index_all()
+
+    def test_records_indexed_commit(self):
+        """Test that a full index remembers HEAD."""
+        head = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=self.repo, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        self.assertEqual(self.indexer.store.get_meta(INDEXED_COMMIT_KEY), head)
+
+    def test_branch_switch_indexes_only_the_diff(self):
+        """Test that changes, additions and deletions on another branch are picked up from the diff."""
+        self.git("checkout", "-q", "-b", "feature")
+        (self.repo / "alpha.py").write_text("def alpha_v2(): pass\n")
+        (self.repo / "gamma.py").write_text("def gamma(): pass\n")
+        (self.repo / "beta.py").unlink()
+        self.commit("feature work")
+
+        self.index_without_walking()
+        self.assertEqual(self.names(), ["alpha_v2", "gamma"])
+
+        self.git("checkout", "-q", "main")
+        self.index_without_walking()
+        self.assertEqual(self.names(), ["alpha", "beta"])
+
+    def test_untracked_files_are_indexed(self):
+        """Test that new files git does not track yet are indexed."""
+        (self.repo / "scratch.py").write_text("def scratch(): pass\n")
+
+        self.index_without_walking()
+
+        self.assertIn("scratch", self.names())
+
+    def test_reverted_edit_is_rechecked(self):
+        """Test that an uncommitted edit which is later reverted is re-indexed."""
+        (self.repo / "alpha.py").write_text("def alpha_wip(): pass\n")
+        self.index_without_walking()
+        self.assertIn("alpha_wip", self.names())
+
+        self.git("checkout", "--", "alpha.py")
+        self.index_without_walking()
+
+        self.assertEqual(self.names(), ["alpha", "beta"])
+
+    def test_unknown_base_commit_falls_back(self):
+        """Test that a base commit missing from the repository requests a full index."""
+        self.assertIsNone(collect_changes(self.repo, "0" * 40))
+
+    def test_not_a_repository(self):
+        """Test that indexing outside git reports no incremental result."""
+        plain_dir = tempfile.mkdtemp()
+        try:
+            self.assertIsNone(find_repo_root(plain_dir))
+            indexer = CodeIndexer(project_root=plain_dir)
+            self.assertIsNone(indexer.index_incremental())
+            indexer.close()
+        finally:
+            shutil.rmtree(plain_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
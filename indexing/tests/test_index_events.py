@@ -0,0 +1,284 @@
+# RULE #0: MANDATORY FIRST ACTION FOR EVERY REQUEST
+# 1. Read CLAUDE.md COMPLETELY before responding
+# 2. Setup Python venv: [ -d "venv" ] || ./setup-venv.sh && source venv/bin/activate
+# 3. Search for rules related to the request
+# 4. Only proceed after confirming no violations
+# Failure to follow Rule #0 has caused real harm. Check BEFORE acting, not AFTER making mistakes.
+#
+# GUARDS ARE SAFETY EQUIPMENT - WHEN THEY FIRE, FIX THE PROBLEM THEY FOUND
+# NEVER weaken, disable, or bypass guards - they prevent real harm
+
+"""Unit tests for the debounced watcher event queue and the index worker."""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from code_indexer import CodeIndexer
+from index_events import CHANGED, DELETED, MOVED, CatchUp, EventQueue, IndexWorker
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestEventQueue(unittest.TestCase):
+    """Test coalescing, the quiet period and overflow."""
+
+    def setUp(self):
+        """Create a queue on a fake clock."""
+        self.clock = FakeClock()
+        self.events = EventQueue(max_pending=3, quiet_period=0.5, clock=self.clock)
+
+    def test_events_for_a_path_coalesce_and_latest_kind_wins(self):
+        """Test that repeated events leave one entry with the last kind."""
+        self.events.put("a.py", CHANGED)
+        self.events.put("a.py", CHANGED)
+        self.events.put("a.py", DELETED)
+        self.clock.now = 1.0
+
+        self.assertEqual(self.events.take(10, timeout=0).paths, {"a.py": DELETED})
+        self.assertIsNone(self.events.take(10, timeout=0))
+
+    def test_paths_wait_for_the_quiet_period(self):
+        """Test that a path still receiving events is held back."""
+        self.events.put("a.py")
+        self.events.put("b.py")
+        self.clock.now = 0.4
+        self.events.put("a.py")
+        self.assertIsNone(self.events.take(10, timeout=0))
+
+        self.clock.now = 0.6
+        self.assertEqual(self.events.take(10, timeout=0).paths, {"b.py": CHANGED})
+        self.clock.now = 1.0
+        self.assertEqual(self.events.take(10, timeout=0).paths, {"a.py": CHANGED})
+
+    def test_batches_are_bounded(self):
+        """Test that ready paths are handed out oldest first, max_batch at a time."""
+        for name in ("a.py", "b.py", "c.py"):
+            self.events.put(name)
+        self.clock.now = 1.0
+
+        self.assertEqual(list(self.events.take(2, timeout=0).paths), ["a.py", "b.py"])
+        self.assertEqual(list(self.events.take(2, timeout=0).paths), ["c.py"])
+
+    def test_overflow_requests_one_rescan(self):
+        """Test that too many paths are dropped for a rescan and later events queue again."""
+        for name in ("a.py", "b.py", "c.py", "d.py", "e.py"):
+            self.events.put(name)
+        self.assertTrue(self.events.overflowed)
+        self.assertEqual(len(self.events), 0)
+
+        batch = self.events.take(10, timeout=0)
+        self.assertTrue(batch.overflowed)
+        self.events.put("f.py")
+        self.clock.now = 1.0
+        self.assertEqual(self.events.take(10, timeout=0).paths, {"f.py": CHANGED})
+
+    def test_moves_carry_their_source(self):
+        """Test that a move replaces the source's events and keeps the first source across renames."""
+        self.events.put("a.py", CHANGED)
+        self.events.put("b.py", MOVED, source="a.py")
+        self.events.put("c.py", MOVED, source="b.py")
+        self.events.put("c.py", CHANGED)
+        self.clock.now = 1.0
+
+        batch = self.events.take(10, timeout=0)
+        self.assertEqual(batch.paths, {"c.py": MOVED})
+        self.assertEqual(batch.sources, {"c.py": "a.py"})
+
+    def test_take_waits_for_the_debounce(self):
+        """Test that a blocking take returns once the path goes quiet."""
+        events = EventQueue(quiet_period=0.05)
+        events.put("a.py")
+        start = time.monotonic()
+        self.assertEqual(events.take(10, timeout=5).paths, {"a.py": CHANGED})
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+
+class TestIndexWorker(unittest.TestCase):
+    """Test that batches reach the index according to what is on disk."""
+
+    def setUp(self):
+        """Index a small project."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.project = Path(self.temp_dir)
+        (self.project / "kept.py").write_text("def kept(): pass\n")
+        (self.project / "gone.py").write_text("def gone(): pass\n")
+        self.indexer = CodeIndexer(project_root=self.temp_dir)
+        self.indexer.index_all(use_git=False)
+        self.events = EventQueue(quiet_period=0.01)
+        self.worker = IndexWorker(self.indexer, self.events)
+
+    def tearDown(self):
+        """Stop the worker and remove the temporary project."""
+        if self.worker.is_alive():
+            self.worker.stop()
+            self.worker.join()
+        self.indexer.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def names(self):
+        """Return every indexed symbol name."""
+        conn = sqlite3.connect(self.indexer.db_path)
+        names = [row[0] for row in conn.execute("SELECT name FROM symbols ORDER BY name")]
+        conn.close()
+        return names
+
+    def store_paths(self, name):
+        """Return the files a symbol is stored under."""
+        conn = sqlite3.connect(self.indexer.db_path)
+        paths = [row[0] for row in conn.execute("SELECT file_path FROM symbols WHERE name = ?", (name,))]
+        conn.close()
+        return paths
+
+    def test_apply_follows_the_disk(self):
+        """Test that changed files are indexed, vanished ones removed and unchanged ones skipped."""
+        (self.project / "kept.py").write_text("def kept(): pass\n\ndef added(): pass\n")
+        (self.project / "gone.py").unlink()
+        (self.project / "new.py").write_text("def new(): pass\n")
+
+        result = self.worker.apply(
+            {
+                str(self.project / "kept.py"): CHANGED,
+                str(self.project / "gone.py"): CHANGED,
+                str(self.project / "new.py"): DELETED,
+            }
+        )
+
+        self.assertEqual(result, {"files_indexed": 2, "files_moved": 0, "files_removed": 1})
+        self.assertEqual(self.names(), ["added", "kept", "new"])
+        self.assertEqual(self.worker.apply({str(self.project / "kept.py"): CHANGED})["files_indexed"], 0)
+
+    def test_apply_moves_directories_without_parsing(self):
+        """Test that a moved directory is re-pointed and a deleted one removed."""
+        (self.project / "pkg").mkdir()
+        (self.project / "pkg" / "inner.py").write_text("def inner(): pass\n")
+        self.indexer.index_file(self.project / "pkg" / "inner.py")
+        (self.project / "pkg").rename(self.project / "lib")
+
+        with mock.patch.object(self.indexer, "read_and_extract", side_effect=AssertionError("parsed again")):
+            result = self.worker.apply(
+                {str(self.project / "lib"): MOVED, str(self.project / "lib" / "inner.py"): MOVED},
+                {str(self.project / "lib"): str(self.project / "pkg"),
+                 str(self.project / "lib" / "inner.py"): str(self.project / "pkg" / "inner.py")},
+            )
+        self.assertEqual(result, {"files_indexed": 0, "files_moved": 1, "files_removed": 0})
+        self.assertIsNotNone(self.indexer.store.get_file_state(self.project / "lib" / "inner.py"))
+
+        shutil.rmtree(self.project / "lib")
+        self.assertEqual(self.worker.apply({str(self.project / "lib"): DELETED})["files_removed"], 1)
+        self.assertEqual(self.names(), ["gone", "kept"])
+
+    def test_apply_swaps_and_chains_moves(self):
+        """Test that moves into a path another move reads from keep both files."""
+        a, b, c, tmp = (str(self.project / name) for name in ("a.py", "b.py", "c.py", "tmp.py"))
+        Path(a).write_text("def alpha(): pass\n")
+        Path(b).write_text("def beta(): pass\n")
+        self.indexer.index_file(Path(a))
+        self.indexer.index_file(Path(b))
+
+        os.rename(a, tmp)
+        os.rename(b, a)
+        os.rename(tmp, b)
+        self.events.put(tmp, MOVED, source=a)
+        self.events.put(a, MOVED, source=b)
+        self.events.put(b, MOVED, source=tmp)
+        time.sleep(0.02)
+        batch = self.events.take(10, timeout=1)
+        self.assertEqual(batch.sources, {a: b, b: a})
+
+        result = self.worker.apply(batch.paths, batch.sources)
+        self.assertEqual(result["files_indexed"], 2)
+        self.assertEqual(self.names(), ["alpha", "beta", "gone", "kept"])
+        self.assertEqual(self.store_paths("alpha"), [b])
+        self.assertEqual(self.store_paths("beta"), [a])
+
+        # b -> c, then a -> b: b has to move out before a takes its place
+        os.rename(b, c)
+        os.rename(a, b)
+        with mock.patch.object(self.indexer, "read_and_extract", side_effect=AssertionError("parsed again")):
+            result = self.worker.apply({b: MOVED, c: MOVED}, {b: a, c: b})
+        self.assertEqual(result, {"files_indexed": 0, "files_moved": 2, "files_removed": 0})
+        self.assertEqual(self.store_paths("alpha"), [c])
+        self.assertEqual(self.store_paths("beta"), [b])
+
+    def test_worker_applies_queued_events_and_rescans_on_overflow(self):
+        """Test the running worker end to end, including the overflow fallback."""
+        self.events.max_pending = 1
+        self.worker.start()
+        (self.project / "a.py").write_text("def a(): pass\n")
+        (self.project / "b.py").write_text("def b(): pass\n")
+        self.events.put(str(self.project / "a.py"))
+        self.events.put(str(self.project / "b.py"))
+
+        deadline = time.monotonic() + 10
+        while self.names() != ["a", "b", "gone", "kept"] and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(self.names(), ["a", "b", "gone", "kept"])
+
+
+class TestCatchUp(unittest.TestCase):
+    """Test that the startup catch-up queues only what changed while nothing watched."""
+
+    def setUp(self):
+        """Index a small project whose files are old enough for their stat to be trusted."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.project = Path(self.temp_dir)
+        (self.project / "pkg").mkdir()
+        for name in ("same.py", "edited.py", "gone.py"):
+            path = self.project / "pkg" / name
+            path.write_text(f"def {name[:-3]}(): pass\n")
+            os.utime(path, (time.time() - 60, time.time() - 60))
+        self.indexer = CodeIndexer(project_root=self.temp_dir)
+        self.indexer.index_all(use_git=False)
+        self.events = EventQueue(quiet_period=0)
+
+    def tearDown(self):
+        """Remove the temporary project."""
+        self.indexer.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_only_changed_new_and_deleted_files_are_queued(self):
+        """Test the queued paths and the reported progress."""
+        (self.project / "pkg" / "edited.py").write_text("def edited(): return 1\n")
+        (self.project / "pkg" / "gone.py").unlink()
+        (self.project / "new.py").write_text("def new(): pass\n")
+
+        catch_up = CatchUp(self.indexer, self.events, threads=2)
+        self.assertEqual(catch_up.progress()["state"], "waiting")
+        result = catch_up.catch_up()
+
+        self.assertEqual(result, {"files_checked": 3, "files_changed": 2, "files_deleted": 1})
+        paths = self.events.take(10, timeout=0).paths
+        self.assertEqual(
+            {os.path.relpath(path, self.temp_dir): kind for path, kind in paths.items()},
+            {"pkg/edited.py": CHANGED, "new.py": CHANGED, "pkg/gone.py": DELETED},
+        )
+        progress = catch_up.progress()
+        self.assertEqual(progress["state"], "done")
+        self.assertEqual(progress["files_stored"], 3)
+
+    def test_missing_root_deletes_nothing(self):
+        """Test that an unmounted project is not mistaken for an empty one."""
+        self.indexer.index_dirs = ["missing"]
+        self.assertEqual(CatchUp(self.indexer, self.events).catch_up()["files_deleted"], 0)
+        self.assertEqual(len(self.events), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
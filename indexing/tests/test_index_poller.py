@@ -0,0 +1,138 @@
+# RULE #0: MANDATORY FIRST ACTION FOR EVERY REQUEST
+# 1. Read CLAUDE.md COMPLETELY before responding
+# 2. Setup Python venv: [ -d "venv" ] || ./setup-venv.sh && source venv/bin/activate
+# 3. Search for rules related to the request
+# 4. Only proceed after confirming no violations
+# Failure to follow Rule #0 has caused real harm. Check BEFORE acting, not AFTER making mistakes.
+#
+# GUARDS ARE SAFETY EQUIPMENT - WHEN THEY FIRE, FIX THE PROBLEM THEY FOUND
+# NEVER weaken, disable, or bypass guards - they prevent real harm
+
+"""Unit tests for the directory-mtime poller used when file system events are unavailable."""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from code_indexer import CodeIndexer
+from index_events import CHANGED, DELETED, EventQueue
+from index_poller import DirectoryPoller
+
+
+class TestDirectoryPoller(unittest.TestCase):
+    """Test which directories are listed and which changes are queued."""
+
+    def setUp(self):
+        """Create a small project and prime a poller on it."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.project = Path(self.temp_dir)
+        (self.project / "pkg").mkdir()
+        (self.project / "pkg" / "mod.py").write_text("def mod(): pass\n")
+        (self.project / "other").mkdir()
+        (self.project / "other" / "util.py").write_text("def util(): pass\n")
+        (self.project / "node_modules").mkdir()
+        self.indexer = CodeIndexer(project_root=self.temp_dir)
+        self.events = EventQueue(quiet_period=0)
+        self.poller = DirectoryPoller(self.indexer, self.events, sweep_polls=1)
+        self.poller.prime()
+
+    def tearDown(self):
+        """Remove the temporary project."""
+        self.indexer.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def queued(self):
+        """Return the queued changes by path relative to the project."""
+        batch = self.events.take(100, timeout=0)
+        if batch is None:
+            return {}
+        return {os.path.relpath(path, self.temp_dir): kind for path, kind in batch.paths.items()}
+
+    def touch(self, path: Path, text: str):
+        """Rewrite a file in place with a distinct mtime."""
+        path.write_text(text)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_unchanged_tree_lists_no_directories(self):
+        """Test that a quiet poll only stats, skipping excluded directories entirely."""
+        self.assertEqual(len(self.poller), 3)
+        result = self.poller.poll()
+        self.assertEqual(result, {"dirs_listed": 0, "files_checked": 2, "changes": 0})
+        self.assertEqual(self.queued(), {})
+
+    def test_in_place_edits_are_found_without_listing(self):
+        """Test that a file written in place is queued although its directory mtime is unchanged."""
+        directory = self.project / "pkg"
+        mtime_ns = directory.stat().st_mtime_ns
+        self.touch(directory / "mod.py", "def mod(): return 1\n")
+        os.utime(directory, ns=(mtime_ns, mtime_ns))
+
+        result = self.poller.poll()
+        self.assertEqual(result["dirs_listed"], 0)
+        self.assertEqual(self.queued(), {"pkg/mod.py": CHANGED})
+
+    def test_created_deleted_and_new_directories_are_queued(self):
+        """Test that only directories whose mtime changed are listed again."""
+        (self.project / "pkg" / "new.py").write_text("def new(): pass\n")
+        (self.project / "other" / "util.py").unlink()
+        (self.project / "pkg" / "sub").mkdir()
+        (self.project / "pkg" / "sub" / "deep.py").write_text("def deep(): pass\n")
+
+        result = self.poller.poll()
+        self.assertEqual(result["dirs_listed"], 3)
+        self.assertEqual(
+            self.queued(), {"pkg/new.py": CHANGED, "other/util.py": DELETED, "pkg/sub/deep.py": CHANGED}
+        )
+        self.assertEqual(self.poller.poll()["changes"], 0)
+
+    def test_gitignore_changes_requeue_the_subtree(self):
+        """Test that creating or editing a .gitignore queues the files it newly ignores or includes."""
+        gitignore = self.project / ".gitignore"
+        gitignore.write_text("other/\n")
+        self.poller.poll()
+        self.assertEqual(self.queued(), {"other/util.py": DELETED})
+
+        # Edited in place, so only the rotation's stat of the .gitignore notices
+        mtime_ns = self.project.stat().st_mtime_ns
+        self.touch(gitignore, "mod.py\n")
+        os.utime(self.project, ns=(mtime_ns, mtime_ns))
+        self.poller.poll()
+        self.assertEqual(self.queued(), {"other/util.py": CHANGED, "pkg/mod.py": DELETED})
+        self.assertEqual(self.poller.poll()["changes"], 0)
+
+    def test_removed_directories_are_queued_once(self):
+        """Test that a deleted tree is reported by its directory and forgotten."""
+        (self.project / "pkg" / "sub").mkdir()
+        self.poller.poll()
+        shutil.rmtree(self.project / "pkg")
+
+        self.poller.poll()
+        self.assertEqual(self.queued(), {"pkg": DELETED})
+        self.assertEqual(len(self.poller), 2)
+
+    def test_interval_backs_off_while_quiet(self):
+        """Test that the interval grows without changes and resets when one is found."""
+        self.poller.poll()
+        self.poller.poll()
+        self.assertGreater(self.poller.interval, self.poller.min_interval)
+
+        (self.project / "other" / "added.py").write_text("def added(): pass\n")
+        self.poller.poll()
+        self.assertEqual(self.poller.interval, self.poller.min_interval)
+
+    def test_unchanged_directories_are_checked_in_rotation(self):
+        """Test that each quiet directory is stat-checked once per sweep."""
+        poller = DirectoryPoller(self.indexer, self.events, sweep_polls=3)
+        poller.prime()
+        checked = sum(poller.poll()["files_checked"] for _ in range(3))
+        self.assertEqual(checked, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+# RULE #0: MANDATORY FIRST ACTION FOR EVERY REQUEST
+# 1. Read CLAUDE.md COMPLETELY before responding
+# 2. Setup Python venv: [ -d "venv" ] || ./setup-venv.sh && source venv/bin/activate
+# 3. Search for rules related to the request
+# 4. Only proceed after confirming no violations
+# Failure to follow Rule #0 has caused real harm. Check BEFORE acting, not AFTER making mistakes.
+#
+# GUARDS ARE SAFETY EQUIPMENT - WHEN THEY FIRE, FIX THE PROBLEM THEY FOUND
+# NEVER weaken, disable, or bypass guards - they prevent real harm
+
+"""Unit tests for the metrics registry and the threaded health server."""
+
+import json
+import os
+import sys
+import threading
+import unittest
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from indexer_metrics import MetricsRegistry, RateMeter, make_health_server
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test the text exposition of each metric type."""
+
+    def setUp(self):
+        """Create an empty registry."""
+        self.registry = MetricsRegistry()
+
+    def test_counters_and_gauges_render_their_samples(self):
+        """Test labelled counters, set gauges and gauges read at scrape time."""
+        events = self.registry.counter("events_total", "Events seen", labels=("kind",))
+        events.inc(kind="changed")
+        events.inc(2, kind="deleted")
+        self.registry.gauge("depth", "Queue depth", function=lambda: 7)
+        self.registry.gauge("ratio", "A ratio").set(0.25)
+
+        lines = self.registry.render().splitlines()
+        self.assertIn("# TYPE events_total counter", lines)
+        self.assertIn('events_total{kind="changed"} 1', lines)
+        self.assertIn('events_total{kind="deleted"} 2', lines)
+        self.assertIn("depth 7", lines)
+        self.assertIn("ratio 0.25", lines)
+        with self.assertRaises(ValueError):
+            events.inc(kind="changed", path="a.py")
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket counts, sum and count of a histogram."""
+        sizes = self.registry.histogram("batch_files", "Files per batch", buckets=(1, 10))
+        for value in (1, 5, 50):
+            sizes.observe(value)
+
+        lines = self.registry.render().splitlines()
+        self.assertIn('batch_files_bucket{le="1"} 1', lines)
+        self.assertIn('batch_files_bucket{le="10"} 2', lines)
+        self.assertIn('batch_files_bucket{le="+Inf"} 3', lines)
+        self.assertIn("batch_files_sum 56", lines)
+        self.assertIn("batch_files_count 3", lines)
+
+    def test_registering_again_returns_the_same_metric(self):
+        """Test that names are shared and a type clash is rejected."""
+        counter = self.registry.counter("files_total", "Files")
+        self.assertIs(self.registry.counter("files_total", "Files"), counter)
+        with self.assertRaises(ValueError):
+            self.registry.gauge("files_total", "Files")
+
+    def test_failing_gauge_does_not_break_the_scrape(self):
+        """Test that other metrics are still rendered when a gauge function raises."""
+        self.registry.gauge("broken", "Broken", function=lambda: 1 / 0)
+        self.registry.counter("fine_total", "Fine").inc()
+        with self.assertLogs("indexer_metrics", level="WARNING"):
+            self.assertIn("fine_total 1", self.registry.render())
+
+    def test_rate_meter_averages_over_the_window(self):
+        """Test that events older than the window stop counting."""
+        clock = FakeClock()
+        meter = RateMeter(window=10, clock=clock)
+        meter.mark(20)
+        clock.now = 5.0
+        meter.mark(10)
+        self.assertEqual(meter.rate(), 3.0)
+        clock.now = 12.0
+        self.assertEqual(meter.rate(), 1.0)
+
+
+class TestHealthServer(unittest.TestCase):
+    """Test the HTTP endpoints of the threaded server."""
+
+    def setUp(self):
+        """Serve a registry on a free port."""
+        self.registry = MetricsRegistry()
+        self.httpd = make_health_server(0, self.registry)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def tearDown(self):
+        """Stop the server."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def test_health_and_metrics_endpoints(self):
+        """Test that /health answers OK and /metrics renders the registry."""
+        self.registry.counter("scrapes_total", "Scrapes").inc()
+        with urllib.request.urlopen(self.url + "/health", timeout=5) as response:
+            self.assertEqual(response.read(), b"OK")
+        with urllib.request.urlopen(self.url + "/metrics", timeout=5) as response:
+            self.assertIn("text/plain; version=0.0.4", response.headers["Content-Type"])
+            self.assertIn("scrapes_total 1", response.read().decode())
+
+    def test_health_reports_status_details(self):
+        """Test that a status function turns /health into a JSON report."""
+        self.httpd.RequestHandlerClass.status = lambda: {"catch_up": {"state": "running"}}
+        with urllib.request.urlopen(self.url + "/health", timeout=5) as response:
+            self.assertEqual(json.loads(response.read()), {"status": "ok", "catch_up": {"state": "running"}})
+
+    def test_slow_scrape_does_not_block_health_checks(self):
+        """Test that a scrape stuck in a gauge leaves the server answering."""
+        release = threading.Event()
+        self.registry.gauge("slow", "Slow", function=lambda: release.wait(10))
+        scrape = threading.Thread(target=urllib.request.urlopen, args=(self.url + "/metrics",), kwargs={"timeout": 15})
+        scrape.start()
+        try:
+            with urllib.request.urlopen(self.url + "/health", timeout=5) as response:
+                self.assertEqual(response.read(), b"OK")
+        finally:
+            release.set()
+            scrape.join()
+
+
+if __name__ == "__main__":
+    unittest.main()
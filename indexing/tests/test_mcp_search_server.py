@@ -19,7 +19,10 @@ sys.path.insert(0, parent_dir)
 sys.path.insert(0, os.path.join(parent_dir, 'src'))
 
 import mcp_search_server
+from code_indexer import CodeIndexer
 from code_searcher import CodeSearcher
+from semantic_index import HAS_NUMPY
+from symbol_matcher import split_words
 
 
 class TestCodeSearcher(unittest.TestCase):
@@ -159,6 +162,694 @@ class TestCodeSearcher(unittest.TestCase):
         self.assertFalse(result["success"])
         self.assertIn("error", result)
 
+    def test_connections_are_pooled(self):
+        """Test that queries reuse one read-only connection."""
+        self.searcher.search("test*")
+        with self.searcher._connection() as first:
+            pass
+        self.searcher.get_stats()
+        with self.searcher._connection() as second:
+            self.assertIs(first, second)
+            with self.assertRaises(sqlite3.OperationalError):
+                second.execute("DELETE FROM symbols")
+        self.searcher.close()
+
+    def test_pool_sees_index_updates(self):
+        """Test that commits and a replaced database file are picked up by a warm searcher."""
+        self.assertEqual(self.searcher.search("fresh_symbol")["count"], 0)
+
+        conn = sqlite3.connect(self.test_db_path)
+        conn.execute(
+            "INSERT INTO symbols (name, type, file_path, line_number) VALUES ('fresh_symbol', 'function', '/a.py', 1)"
+        )
+        conn.commit()
+        conn.close()
+        self.assertEqual(self.searcher.search("fresh_symbol")["count"], 1)
+
+        replacement = self.test_db_path + ".new"
+        conn = sqlite3.connect(replacement)
+        conn.execute("CREATE TABLE symbols AS SELECT * FROM (SELECT 'rebuilt' AS name, 'class' AS type, "
+                     "'/b.py' AS file_path, 1 AS line_number, 0 AS column, NULL AS parent, "
+                     "NULL AS signature, NULL AS docstring)")
+        conn.commit()
+        conn.close()
+        os.replace(replacement, self.test_db_path)
+
+        self.assertEqual(self.searcher.search("fresh_symbol")["count"], 0)
+        self.assertEqual(self.searcher.search("rebuilt")["count"], 1)
+        self.searcher.close()
+
+
+class TestCodeSearcherResultCache(unittest.TestCase):
+    """Test the generation-aware search result cache."""
+
+    def setUp(self):
+        """Index a small project with the current indexer."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.project = Path(self.temp_dir)
+        (self.project / "app.py").write_text("def handle_request(req): pass\n\nclass Handler: pass\n")
+        self.indexer = CodeIndexer(project_root=self.temp_dir)
+        self.indexer.index_all(use_git=False)
+        self.searcher = CodeSearcher(str(self.indexer.db_path))
+
+    def tearDown(self):
+        """Remove the temporary project."""
+        import shutil
+        self.searcher.close()
+        self.indexer.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_repeated_search_skips_database(self):
+        """Test that a repeated query is answered from the cache."""
+        first = self.searcher.search("handle*")
+        with patch.object(self.searcher, "_search", side_effect=AssertionError("queried")), \
+                patch.object(self.searcher, "_connection", side_effect=AssertionError("connected")):
+            second = self.searcher.search("handle*")
+
+        self.assertEqual(first, second)
+        stats = self.searcher.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_index_commit_invalidates_cache(self):
+        """Test that results are recomputed after the indexer commits a change."""
+        self.assertEqual(self.searcher.search("handle*")["count"], 2)
+
+        (self.project / "more.py").write_text("def handle_event(evt): pass\n")
+        self.indexer.index_file(self.project / "more.py")
+
+        self.assertEqual(self.searcher.search("handle*")["count"], 3)
+        self.assertEqual(self.searcher.cache_stats()["hits"], 0)
+
+    def test_cached_results_are_copies(self):
+        """Test that editing a returned result does not change later hits."""
+        first = self.searcher.search("handle*")
+        first["results"].clear()
+        first["count"] = 0
+        result = self.searcher.search("handle*")
+
+        self.assertEqual(result["count"], 2)
+        self.assertEqual(len(result["results"]), 2)
+        self.assertEqual(self.searcher.cache_stats()["hits"], 1)
+
+    def test_stats_read_maintained_counters(self):
+        """Test that statistics match the index and report the cache hit rate."""
+        self.searcher.search("Handler")
+        self.searcher.search("Handler")
+        stats = self.searcher.get_stats()["stats"]
+
+        self.assertEqual(stats["total_symbols"], 2)
+        self.assertEqual(stats["total_files"], 1)
+        self.assertEqual(stats["by_type"], {"function": 1, "class": 1})
+        self.assertIn("last_indexed", stats)
+        self.assertEqual(stats["result_cache"]["hits"], 1)
+
+
+class TestCodeSearcherFullText(unittest.TestCase):
+    """Test content search through the FTS5 index built by the indexer."""
+
+    def setUp(self):
+        """Index a small project so the database has a symbols_fts table."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.project = Path(self.temp_dir)
+        (self.project / "config.py").write_text(
+            'def load_config(path):\n'
+            '    """Read settings from disk."""\n\n'
+            'def save_settings(data):\n'
+            '    """Persist the parsed config to disk."""\n'
+        )
+        (self.project / "helpers.py").write_text(
+            "def format_row(row): pass\n\ndef retry(fn): pass\n\nclass Timer: pass\n"
+        )
+        self.indexer = CodeIndexer(project_root=self.temp_dir)
+        self.indexer.index_all()
+        self.searcher = CodeSearcher(str(self.indexer.db_path))
+
+    def tearDown(self):
+        """Remove the temporary project."""
+        import shutil
+        self.indexer.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_content_search_ranks_name_matches_first(self):
+        """Test that bm25 ranks a name match above a docstring-only match."""
+        result = self.searcher.search("config", search_type="content")
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["ranking"], "bm25")
+        self.assertEqual([r["name"] for r in result["results"]], ["load_config", "save_settings"])
+        self.assertGreater(result["results"][0]["score"], result["results"][1]["score"])
+
+    def test_content_search_highlights_snippet(self):
+        """Test that content results carry a highlighted snippet."""
+        result = self.searcher.search("persist", search_type="content")
+
+        self.assertEqual(result["count"], 1)
+        self.assertIn("**Persist**", result["results"][0]["snippet"])
+
+    def test_fts_index_follows_reindex_and_delete(self):
+        """Test that the FTS index stays in sync when symbols are replaced or removed."""
+        config_file = self.project / "config.py"
+        config_file.write_text('def load_yaml(path):\n    """Read settings from disk."""\n')
+        self.indexer.index_file(config_file)
+
+        self.assertEqual(self.searcher.search("load_config", search_type="content")["count"], 0)
+        self.assertEqual(self.searcher.search("yaml", search_type="content")["count"], 1)
+
+        self.indexer.store.delete_file(config_file)
+        self.indexer.commit()
+        self.assertEqual(self.searcher.search("settings", search_type="content")["count"], 0)
+
+    def test_wildcard_only_content_query_uses_like_fallback(self):
+        """Test that a query without words still returns results via LIKE."""
+        result = self.searcher.search("*", search_type="content")
+
+        self.assertTrue(result["success"])
+        self.assertNotIn("ranking", result)
+        self.assertEqual(result["count"], 5)
+
+
+class TestCodeSearcherTrigram(unittest.TestCase):
+    """Test wildcard name and file searches planned onto the trigram indexes."""
+
+    def setUp(self):
+        """Index a project with handler-style names spread over packages."""
+        self.temp_dir = tempfile.mkdtemp()
+        project = Path(self.temp_dir)
+        (project / "web").mkdir()
+        (project / "web" / "handlers.py").write_text(
+            "class RequestHandler: pass\n\nclass ErrorHandler: pass\n\ndef get_handler(): pass\n"
+        )
+        (project / "jobs.py").write_text("def set_job(): pass\n\ndef get_item(): pass\n\nclass Worker: pass\n")
+        self.indexer = CodeIndexer(project_root=self.temp_dir)
+        self.indexer.index_all()
+        self.searcher = CodeSearcher(str(self.indexer.db_path))
+
+    def tearDown(self):
+        """Remove the temporary project."""
+        import shutil
+        self.indexer.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_leading_wildcard_name_search(self):
+        """Test that '*Handler*' finds every name containing Handler, case-insensitively."""
+        result = self.searcher.search("*Handler*", search_type="name")
+
+        names = sorted(r["name"] for r in result["results"])
+        self.assertEqual(names, ["ErrorHandler", "RequestHandler", "get_handler"])
+
+    def test_single_character_wildcards(self):
+        """Test that '?et_*' keeps LIKE semantics through the trigram index."""
+        result = self.searcher.search("?et_*", search_type="name", symbol_type="function")
+
+        names = sorted(r["name"] for r in result["results"])
+        self.assertEqual(names, ["get_handler", "get_item", "set_job"])
+
+    def test_name_search_uses_trigram_index(self):
+        """Test that substring patterns are planned onto symbol_names_trigram."""
+        conn = sqlite3.connect(self.indexer.db_path)
+        self.assertTrue(CodeSearcher._use_trigram(conn, "symbol_names_trigram", "%Handler%"))
+        self.assertFalse(CodeSearcher._use_trigram(conn, "symbol_names_trigram", "%ab%"))
+        conn.close()
+
+    def test_file_search_by_substring(self):
+        """Test file path substring search through file_paths_trigram."""
+        result = self.searcher.search("handlers", search_type="file")
+
+        self.assertEqual(result["count"], 1)
+        self.assertTrue(result["results"][0]["file_path"].endswith("web/handlers.py"))
+        self.assertEqual(result["results"][0]["symbol_count"], 3)
+
+    def test_trigram_index_drops_deleted_files(self):
+        """Test that deleted files disappear from trigram-backed searches."""
+        self.indexer.store.delete_file(Path(self.temp_dir) / "web" / "handlers.py")
+        self.indexer.commit()
+
+        self.assertEqual(self.searcher.search("*Handler*", search_type="name")["count"], 0)
+        self.assertEqual(self.searcher.search("handlers", search_type="file")["count"], 0)
+
+
+class TestCodeSearcherFileSymbols(unittest.TestCase):
+    """Test file-scoped symbol queries."""
+
+    def setUp(self):
+        """Index a small file next to a file with many symbols."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.project = Path(self.temp_dir)
+        (self.project / "pkg").mkdir()
+        (self.project / "pkg" / "small.py").write_text(
+            "class Service:\n    def start(self): pass\n\n    def stop(self): pass\n\ndef build(): pass\n"
+        )
+        (self.project / "big.py").write_text("".join(f"def func_{i}(): pass\n" for i in range(150)))
+        self.indexer = CodeIndexer(project_root=self.temp_dir)
+        self.indexer.index_all(use_git=False)
+        self.searcher = CodeSearcher(str(self.indexer.db_path))
+
+    def tearDown(self):
+        """Remove the temporary project."""
+        import shutil
+        self.searcher.close()
+        self.indexer.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_file_outline_in_source_order(self):
+        """Test that a file's symbols come back by line even when other files have more than the limit."""
+        result = self.searcher.search_in_file(str(self.project / "pkg" / "small.py"))
+
+        self.assertTrue(result["success"])
+        self.assertEqual([r["name"] for r in result["results"]], ["Service", "start", "stop", "build"])
+        self.assertEqual(result["results"][1]["parent"], "Service")
+
+    def test_batch_of_files_and_suffixes(self):
+        """Test that several files, given by path suffix, are returned grouped by file."""
+        result = self.searcher.search_in_files(["big.py", "pkg/small.py", "gone.py"])
+
+        self.assertEqual(result["count"], 154)
+        self.assertEqual(result["missing"], ["gone.py"])
+        self.assertEqual([Path(path).name for path in result["files"]], ["big.py", "small.py"])
+        self.assertEqual(result["results"][0]["name"], "func_0")
+        self.assertEqual(result["results"][-1]["name"], "build")
+
+    def test_name_pattern_and_limit(self):
+        """Test that plain patterns match substrings, wildcards keep LIKE semantics and limits apply."""
+        small = str(self.project / "pkg" / "small.py")
+
+        self.assertEqual([r["name"] for r in self.searcher.search_in_file(small, "st")["results"]], ["start", "stop"])
+        self.assertEqual([r["name"] for r in self.searcher.search_in_file(small, "st*")["results"]], ["start", "stop"])
+        self.assertEqual(self.searcher.search_in_files(["big.py"], limit=5)["count"], 5)
+
+
+class TestCodeSearcherFuzzy(unittest.TestCase):
+    """Test fuzzy search through CodeSearcher.search."""
+
+    def setUp(self):
+        """Index a project with abbreviation-friendly names."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.project = Path(self.temp_dir)
+        (self.project / "hashing.py").write_text(
+            "def get_file_hash(path): pass\n\nclass FileHasher:\n    def get_file_hash(self): pass\n"
+        )
+        self.indexer = CodeIndexer(project_root=self.temp_dir)
+        self.indexer.index_all(use_git=False)
+        self.searcher = CodeSearcher(str(self.indexer.db_path))
+
+    def tearDown(self):
+        """Remove the temporary project."""
+        import shutil
+        self.searcher.close()
+        self.indexer.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_fuzzy_search_returns_ranked_symbols(self):
+        """Test that every symbol of the best names is returned with its score."""
+        result = self.searcher.search("gfh", search_type="fuzzy")
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["ranking"], "fuzzy")
+        self.assertEqual([r["name"] for r in result["results"]], ["get_file_hash", "get_file_hash"])
+        self.assertEqual(result["results"][0]["match"], "abbreviation")
+
+        methods = self.searcher.search("gfh", search_type="fuzzy", symbol_type="method")
+        self.assertEqual([r["parent"] for r in methods["results"]], ["FileHasher"])
+
+    def test_fuzzy_search_pages_through_rows_of_one_name(self):
+        """Test that rows of a name are read in location order, limit at a time."""
+        first = self.searcher.search("gfh", search_type="fuzzy", limit=1)
+        second = self.searcher.search("gfh", search_type="fuzzy", limit=1, cursor=first["next_cursor"])
+
+        self.assertEqual([r["line_number"] for r in first["results"] + second["results"]], [1, 4])
+        self.assertIsNone(second["next_cursor"])
+
+    def test_fuzzy_search_follows_index_updates(self):
+        """Test that names written after the first fuzzy search are found."""
+        self.assertEqual(self.searcher.search("FileHashr", search_type="fuzzy")["count"], 1)
+
+        (self.project / "more.py").write_text("class FileHashCache: pass\n")
+        self.indexer.index_file(self.project / "more.py")
+
+        names = [r["name"] for r in self.searcher.search("FileHash", search_type="fuzzy")["results"]]
+        self.assertEqual(names, ["FileHasher", "FileHashCache"])
+
+
+class TestCodeSearcherPagination(unittest.TestCase):
+    """Test cursor pagination and compact results."""
+
+    def setUp(self):
+        """Index a project with many similarly named symbols across files."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.project = Path(self.temp_dir)
+        for module in range(3):
+            (self.project / f"handlers_{module}.py").write_text("".join(
+                f'def handle_{i}():\n    """Handle case {i}."""\n\n' for i in range(7)
+            ))
+        self.indexer = CodeIndexer(project_root=self.temp_dir)
+        self.indexer.index_all(use_git=False)
+        self.searcher = CodeSearcher(str(self.indexer.db_path))
+
+    def tearDown(self):
+        """Remove the temporary project."""
+        import shutil
+        self.searcher.close()
+        self.indexer.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def collect(self, query, page_size, **kwargs):
+        """Follow next_cursor to the last page and return every page."""
+        pages = [self.searcher.search(query, limit=page_size, **kwargs)]
+        while pages[-1]["next_cursor"]:
+            pages.append(self.searcher.search(query, limit=page_size, cursor=pages[-1]["next_cursor"], **kwargs))
+        return pages
+
+    def test_name_pages_concatenate_to_full_result(self):
+        """Test that keyset pages cover the ordered result once, with no cursor on the last page."""
+        full = self.searcher.search("handle_*", limit=100)
+        self.assertIsNone(full["next_cursor"])
+        self.assertEqual(full["count"], 21)
+
+        pages = self.collect("handle_*", 4)
+        self.assertEqual([page["count"] for page in pages], [4, 4, 4, 4, 4, 1])
+        locations = [item["location"] for page in pages for item in page["results"]]
+        self.assertEqual(locations, [item["location"] for item in full["results"]])
+
+    def test_prefix_searches_fold_case_and_keep_underscores_literal(self):
+        """Test that a name prefix matches in any case and that _ only matches itself."""
+        (self.project / "misc.py").write_text("def handlex(): pass\n\ndef HANDLE_extra(): pass\n")
+        self.indexer.index_file(self.project / "misc.py")
+
+        names = [item["name"] for page in self.collect("Handle_*", 5) for item in page["results"]]
+        self.assertEqual(len(names), 22)
+        self.assertIn("HANDLE_extra", names)
+        self.assertNotIn("handlex", names)
+
+    def test_type_filtered_pages_concatenate_to_full_result(self):
+        """Test that symbol type filters page through the same order as one large page."""
+        full = self.searcher.list_symbols("function", limit=100)
+        pages = self.collect("*", 6, symbol_type="function")
+        self.assertEqual([item["location"] for page in pages for item in page["results"]],
+                         [item["location"] for item in full["results"]])
+        self.assertEqual(self.searcher.search("handle_*", symbol_type="no_such_type")["count"], 0)
+
+    def test_file_and_content_pages(self):
+        """Test that file searches and ranked content searches page without gaps."""
+        files = [item["file_path"] for page in self.collect("*handlers*", 2, search_type="file")
+                 for item in page["results"]]
+        self.assertEqual(len(files), 3)
+        self.assertEqual(files, sorted(files))
+
+        full = self.searcher.search("case", search_type="content", limit=100)
+        pages = self.collect("case", 5, search_type="content")
+        self.assertEqual([item["location"] for page in pages for item in page["results"]],
+                         [item["location"] for item in full["results"]])
+
+    def test_compact_results_omit_docstrings(self):
+        """Test that compact results keep locations but leave out docstrings."""
+        result = self.searcher.search("handle_1", compact=True)
+        self.assertEqual(result["count"], 3)
+        self.assertNotIn("docstring", result["results"][0])
+        self.assertIn("location", result["results"][0])
+        self.assertIn("docstring", self.searcher.search("handle_1")["results"][0])
+
+    def test_invalid_cursors_are_rejected(self):
+        """Test that garbled cursors and cursors from another search fail cleanly."""
+        cursor = self.searcher.search("handle_*", limit=2)["next_cursor"]
+
+        self.assertFalse(self.searcher.search("handle_*", limit=2, cursor="not-a-cursor")["success"])
+        self.assertFalse(self.searcher.search("handle_1*", limit=2, cursor=cursor)["success"])
+        self.assertFalse(self.searcher.search("handle_*", search_type="content", cursor=cursor)["success"])
+        self.assertTrue(self.searcher.list_symbols("function", limit=2)["next_cursor"])
+
+
+class TestCodeSearcherBatch(unittest.TestCase):
+    """Test running several searches through search_many."""
+
+    def setUp(self):
+        """Index a small project."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.project = Path(self.temp_dir)
+        (self.project / "service.py").write_text(
+            'class Service:\n    """Serve requests."""\n\n    def handle(self): pass\n\ndef get_file_hash(): pass\n'
+        )
+        self.indexer = CodeIndexer(project_root=self.temp_dir)
+        self.indexer.index_all(use_git=False)
+        self.searcher = CodeSearcher(str(self.indexer.db_path))
+
+    def tearDown(self):
+        """Remove the temporary project."""
+        import shutil
+        self.searcher.close()
+        self.indexer.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_results_match_single_searches_in_order(self):
+        """Test that each entry equals the result of the same search() call."""
+        specs = [
+            {"query": "Service", "symbol_type": "class"},
+            {"query": "gfh", "search_type": "fuzzy"},
+            {"query": "requests", "search_type": "content", "compact": True},
+            {"query": "*service*", "search_type": "file"},
+        ]
+
+        batch = self.searcher.search_many(specs)
+
+        self.assertTrue(batch["success"])
+        self.assertEqual(batch["count"], 4)
+        single = CodeSearcher(str(self.indexer.db_path), result_cache_size=0)
+        for spec, result in zip(specs, batch["results"]):
+            query = spec.pop("query")
+            self.assertEqual(result, single.search(query, **spec))
+        single.close()
+
+    def test_invalid_specs_fail_alone(self):
+        """Test that bad specs and failing searches do not fail the rest of the batch."""
+        batch = self.searcher.search_many([
+            {"query": "handle"},
+            {"query": "handle", "name": "handle"},
+            {"query": "handle", "cursor": "bogus"},
+            "handle",
+        ])
+
+        self.assertTrue(batch["success"])
+        self.assertEqual([r["success"] for r in batch["results"]], [True, False, False, False])
+        self.assertIn("Unknown query keys: name", batch["results"][1]["error"])
+
+    def test_batch_uses_the_result_cache(self):
+        """Test that cached searches are answered without running again."""
+        self.searcher.search("Service")
+        batch = self.searcher.search_many([{"query": "Service"}, {"query": "handle"}])
+
+        self.assertEqual([r["count"] for r in batch["results"]], [1, 1])
+        self.assertEqual(self.searcher.cache_stats()["hits"], 1)
+        self.assertEqual(self.searcher.search_many([{"query": "handle"}])["results"][0]["count"], 1)
+        self.assertEqual(self.searcher.cache_stats()["hits"], 2)
+
+    def test_batch_size_is_limited(self):
+        """Test that oversized batches are rejected."""
+        result = self.searcher.search_many([{"query": "x"}] * 51)
+        self.assertFalse(result["success"])
+
+
+def bag_of_words(texts):
+    """Deterministic stand-in for the embedding model: hashed word counts."""
+    import zlib
+    vectors = []
+    for text in texts:
+        vector = [0.0] * 64
+        for word in split_words(text):
+            vector[zlib.crc32(word.encode()) % 64] += 1.0
+        vectors.append(vector)
+    return vectors
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy is not installed")
+class TestCodeSearcherSemantic(unittest.TestCase):
+    """Test semantic search over indexer-written embeddings."""
+
+    def setUp(self):
+        """Index a project with embeddings from a deterministic encoder."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.project = Path(self.temp_dir)
+        (self.project / "files.py").write_text(
+            'def get_file_hash(path):\n    """Hash the contents of a file."""\n\n'
+            'class FileCache:\n    """Keep file contents in memory."""\n'
+        )
+        (self.project / "net.py").write_text('def fetch_url(url):\n    """Download a web page."""\n')
+        self.indexer = CodeIndexer(project_root=self.temp_dir, embeddings=True, embedding_encoder=bag_of_words)
+        self.indexer.index_all(use_git=False)
+        self.searcher = CodeSearcher(str(self.indexer.db_path), encoder=bag_of_words)
+
+    def tearDown(self):
+        """Remove the temporary project."""
+        import shutil
+        self.searcher.close()
+        self.indexer.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_ranks_symbols_by_description(self):
+        """Test that the closest symbol ranks first and filters apply."""
+        result = self.searcher.semantic_search("hash the contents of a file", limit=2)
+
+        self.assertTrue(result["success"])
+        self.assertEqual((result["ranking"], result["index"]), ("cosine", "exact"))
+        self.assertEqual(result["results"][0]["name"], "get_file_hash")
+        self.assertGreater(result["results"][0]["score"], result["results"][1]["score"])
+
+        classes = self.searcher.semantic_search("file contents", symbol_type="class")
+        self.assertEqual([r["name"] for r in classes["results"]], ["FileCache"])
+
+    def test_follows_indexer_updates(self):
+        """Test that symbols embedded after the first query are found."""
+        self.searcher.semantic_search("web page")
+        (self.project / "net.py").write_text('def send_mail(to):\n    """Send an email message."""\n')
+        self.indexer.index_file(self.project / "net.py")
+
+        names = [r["name"] for r in self.searcher.semantic_search("send an email message")["results"]]
+        self.assertEqual(names[0], "send_mail")
+        self.assertNotIn("fetch_url", names)
+
+    def test_missing_embeddings_report_an_error(self):
+        """Test that an index built without embeddings explains how to add them."""
+        other = tempfile.mkdtemp()
+        indexer = CodeIndexer(project_root=other)
+        searcher = CodeSearcher(str(indexer.db_path), encoder=bag_of_words)
+
+        result = searcher.semantic_search("anything")
+
+        self.assertFalse(result["success"])
+        self.assertIn("--embeddings", result["error"])
+        searcher.close()
+        indexer.close()
+        import shutil
+        shutil.rmtree(other, ignore_errors=True)
+
+
+class TestCodeSearcherReferences(unittest.TestCase):
+    """Test find_references and find_callers against the reference index."""
+
+    def setUp(self):
+        """Index a small project with calls across modules."""
+        self.temp_dir = tempfile.mkdtemp()
+        project = Path(self.temp_dir)
+        (project / "store.py").write_text("def save(item):\n    return item\n")
+        (project / "api.py").write_text(
+            "from store import save\n\n"
+            "class Api:\n"
+            "    def create(self, item):\n"
+            "        return save(item)\n\n"
+            "save(None)\n"
+        )
+        self.indexer = CodeIndexer(project_root=self.temp_dir)
+        self.indexer.index_all()
+        self.searcher = CodeSearcher(str(self.indexer.db_path))
+
+    def tearDown(self):
+        """Remove the temporary project."""
+        import shutil
+        self.indexer.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_find_references(self):
+        """Test that imports and calls of a name are all returned in file order."""
+        result = self.searcher.find_references("save")
+
+        self.assertTrue(result["success"])
+        found = [(Path(r["file_path"]).name, r["line_number"], r["kind"]) for r in result["results"]]
+        self.assertEqual(found, [("api.py", 1, "import"), ("api.py", 5, "call"), ("api.py", 7, "call")])
+
+    def test_find_callers(self):
+        """Test that callers are reported by enclosing function or module."""
+        result = self.searcher.find_callers("save")
+
+        self.assertEqual([r["caller"] for r in result["results"]], ["Api.create", "<module>"])
+
+    def test_references_follow_reindex(self):
+        """Test that removing a call and re-indexing drops its reference."""
+        api = Path(self.temp_dir) / "api.py"
+        api.write_text("def create(item):\n    return item\n")
+        self.indexer.index_file(api)
+
+        self.assertEqual(self.searcher.find_callers("save")["count"], 0)
+
+    def test_missing_reference_index(self):
+        """Test a clear error on databases built before references were indexed."""
+        db_path = Path(self.temp_dir) / "legacy.db"
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE symbols (name TEXT)")
+        conn.close()
+
+        result = CodeSearcher(str(db_path)).find_references("save")
+
+        self.assertFalse(result["success"])
+        self.assertIn("Re-run the code indexer", result["error"])
+
+
+class TestCodeSearcherImportGraph(unittest.TestCase):
+    """Test get_imports and find_dependents against the module import graph."""
+
+    def setUp(self):
+        """Index a project where app -> pkg.service -> pkg.core."""
+        self.temp_dir = tempfile.mkdtemp()
+        project = Path(self.temp_dir)
+        (project / "pkg").mkdir()
+        (project / "pkg" / "__init__.py").write_text("")
+        (project / "pkg" / "core.py").write_text("def run(): pass\n")
+        (project / "pkg" / "service.py").write_text("from .core import run\n")
+        (project / "app.py").write_text("from pkg import service\n")
+        (project / "cli.py").write_text("import os\nimport app\n")
+        (project / "other.py").write_text("def unrelated(): pass\n")
+        self.indexer = CodeIndexer(project_root=self.temp_dir)
+        self.indexer.index_all()
+        self.searcher = CodeSearcher(str(self.indexer.db_path))
+
+    def tearDown(self):
+        """Remove the temporary project."""
+        import shutil
+        self.indexer.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def relative(self, path):
+        """Return a result path relative to the project."""
+        return Path(path).relative_to(self.temp_dir).as_posix() if path else None
+
+    def test_get_imports_resolves_indexed_modules(self):
+        """Test that imports resolve to indexed files and external ones stay unresolved."""
+        result = self.searcher.get_imports("cli")
+
+        found = [(r["imported_module"], self.relative(r["resolved_path"])) for r in result["results"]]
+        self.assertEqual(found, [("os", None), ("app", "app.py")])
+
+    def test_relative_import_is_made_absolute(self):
+        """Test that 'from .core import run' is recorded against pkg.core."""
+        result = self.searcher.get_imports("pkg/service.py")
+
+        item = result["results"][0]
+        self.assertEqual((item["imported_module"], item["symbol"]), ("pkg.core", "run"))
+        self.assertEqual(self.relative(item["resolved_path"]), "pkg/core.py")
+
+    def test_find_dependents_is_transitive(self):
+        """Test that dependents include indirect importers, direct ones first."""
+        result = self.searcher.find_dependents("pkg.core")
+
+        found = [(self.relative(r["file_path"]), r["direct"]) for r in result["results"]]
+        self.assertEqual(found, [("pkg/service.py", True), ("app.py", False), ("cli.py", False)])
+
+    def test_find_dependents_terminates_on_cycles(self):
+        """Test that import cycles do not loop forever."""
+        (Path(self.temp_dir) / "pkg" / "core.py").write_text("from pkg import service\n")
+        self.indexer.index_all()
+
+        result = self.searcher.find_dependents("pkg/core.py")
+
+        self.assertEqual(
+            sorted(self.relative(r["file_path"]) for r in result["results"]), ["app.py", "cli.py", "pkg/service.py"]
+        )
+
+    def test_unknown_target(self):
+        """Test that an unmatched target returns no files rather than an error."""
+        result = self.searcher.find_dependents("does.not.exist")
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["files"], [])
+
 
 class TestMCPProtocol(unittest.TestCase):
     """Test MCP protocol-level functionality."""
@@ -0,0 +1,250 @@
+# RULE #0: MANDATORY FIRST ACTION FOR EVERY REQUEST
+# 1. Read CLAUDE.md COMPLETELY before responding
+# 2. Setup Python venv: [ -d "venv" ] || ./setup-venv.sh && source venv/bin/activate
+# 3. Search for rules related to the request
+# 4. Only proceed after confirming no violations
+# Failure to follow Rule #0 has caused real harm. Check BEFORE acting, not AFTER making mistakes.
+#
+# GUARDS ARE SAFETY EQUIPMENT - WHEN THEY FIRE, FIX THE PROBLEM THEY FOUND
+# NEVER weaken, disable, or bypass guards - they prevent real harm
+
+"""Unit tests for the sidecar symbol embeddings and the in-memory vector index."""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+import zlib
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+import semantic_index
+from code_indexer import CodeIndexer
+from semantic_index import HAS_NUMPY, VectorIndex, embeddings_path
+from symbol_matcher import split_words
+
+if HAS_NUMPY:
+    import numpy as np
+
+
+class BagOfWordsEncoder:
+    """Deterministic stand-in for the embedding model: hashed word counts."""
+
+    def __init__(self, dimensions=64):
+        self.dimensions = dimensions
+        self.texts = []
+
+    def __call__(self, texts):
+        self.texts.extend(texts)
+        vectors = []
+        for text in texts:
+            vector = [0.0] * self.dimensions
+            for word in split_words(text):
+                vector[zlib.crc32(word.encode()) % self.dimensions] += 1.0
+            vectors.append(vector)
+        return vectors
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy is not installed")
+class TestEmbeddingStore(unittest.TestCase):
+    """Test that the sidecar follows the symbol index incrementally."""
+
+    def setUp(self):
+        """Index a small project with embeddings enabled."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.project = Path(self.temp_dir)
+        (self.project / "files.py").write_text(
+            'def get_file_hash(path):\n    """Hash the contents of a file."""\n    return md5(open(path).read())\n'
+        )
+        (self.project / "net.py").write_text(
+            'def fetch_url(url):\n    """Download a web page."""\n    return urlopen(url).read()\n'
+        )
+        self.encoder = BagOfWordsEncoder()
+        self.indexer = CodeIndexer(project_root=self.temp_dir, embeddings=True, embedding_encoder=self.encoder)
+        self.indexer.index_all(use_git=False)
+
+    def tearDown(self):
+        """Remove the temporary project."""
+        self.indexer.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def embedded(self):
+        """Return (name, file name) of every stored vector."""
+        conn = sqlite3.connect(embeddings_path(self.indexer.db_path))
+        rows = conn.execute("SELECT name, file_path FROM symbol_embeddings ORDER BY name").fetchall()
+        conn.close()
+        return [(name, Path(path).name) for name, path in rows]
+
+    def test_texts_hold_signature_docstring_and_body(self):
+        """Test what is embedded for each symbol."""
+        text = next(text for text in self.encoder.texts if text.startswith("function get_file_hash"))
+        self.assertIn("Hash the contents of a file.", text)
+        self.assertIn("return md5(open(path).read())", text)
+        self.assertEqual(self.embedded(), [("fetch_url", "net.py"), ("get_file_hash", "files.py")])
+
+    def test_only_changed_files_are_embedded_again(self):
+        """Test that commits re-embed changed files and drop deleted ones."""
+        self.encoder.texts.clear()
+        self.assertEqual(self.indexer.update_embeddings()["files_embedded"], 0)
+
+        (self.project / "files.py").write_text("def get_file_size(path):\n    return os.stat(path).st_size\n")
+        self.indexer.index_file(self.project / "files.py")
+        self.assertEqual(len(self.encoder.texts), 1)
+
+        self.indexer.store.delete_file(self.project / "net.py")
+        self.indexer.commit()
+        self.assertEqual(self.embedded(), [("get_file_size", "files.py")])
+
+    def test_moved_files_keep_their_vectors(self):
+        """Test that a rename re-points vectors instead of embedding them again."""
+        self.encoder.texts.clear()
+        (self.project / "net.py").rename(self.project / "web.py")
+        self.indexer.move_path(self.project / "net.py", self.project / "web.py")
+
+        self.assertEqual(self.encoder.texts, [])
+        self.assertEqual(self.embedded(), [("fetch_url", "web.py"), ("get_file_hash", "files.py")])
+
+    def test_move_of_a_file_older_than_the_watermark_is_followed(self):
+        """Test that a moved file is seen although its content was indexed before the last sync."""
+        (self.project / "mail.py").write_text("def send_mail(to):\n    return smtp.send(to)\n")
+        self.indexer.index_file(self.project / "mail.py")
+        self.encoder.texts.clear()
+
+        (self.project / "net.py").rename(self.project / "web.py")
+        self.indexer.move_path(self.project / "net.py", self.project / "web.py")
+
+        self.assertEqual(self.encoder.texts, [])
+        self.assertEqual(
+            self.embedded(), [("fetch_url", "web.py"), ("get_file_hash", "files.py"), ("send_mail", "mail.py")]
+        )
+
+    def test_removed_file_is_dropped_when_another_is_added(self):
+        """Test that a removal is found although the number of indexed files did not change."""
+        self.indexer.store.delete_file(self.project / "net.py")
+        (self.project / "mail.py").write_text("def send_mail(to):\n    return smtp.send(to)\n")
+        self.indexer.index_file(self.project / "mail.py")
+
+        self.assertEqual(self.embedded(), [("get_file_hash", "files.py"), ("send_mail", "mail.py")])
+
+    def test_sync_reads_only_files_modified_since_the_last_one(self):
+        """Test that unchanged files are not looked at again after the first sync."""
+        (self.project / "mail.py").write_text("def send_mail(to):\n    return smtp.send(to)\n")
+        self.indexer.index_file(self.project / "mail.py")
+        (self.project / "files.py").write_text("def get_file_size(path):\n    return os.stat(path).st_size\n")
+        with mock.patch.object(self.indexer.embeddings, "_embedded_hashes",
+                               wraps=self.indexer.embeddings._embedded_hashes) as embedded_hashes:
+            self.indexer.index_file(self.project / "files.py")
+
+        # The watermark is inclusive, so the file written last before it is read again
+        read = {Path(path).name for path in embedded_hashes.call_args[0][0]}
+        self.assertEqual(read, {"mail.py", "files.py"})
+
+    def test_updater_embeds_after_commit_returns(self):
+        """Test that with background updates a commit only requests the embedding."""
+        release = threading.Event()
+        encode = self.encoder.__call__
+
+        def slow_encoder(texts):
+            release.wait(5)
+            return encode(texts)
+
+        self.indexer.embeddings._encoder = slow_encoder
+        self.indexer.start_embedding_updates()
+        (self.project / "files.py").write_text("def get_file_size(path):\n    return os.stat(path).st_size\n")
+        self.indexer.index_file(self.project / "files.py")
+        self.assertIn(("get_file_hash", "files.py"), self.embedded())
+
+        release.set()
+        self.indexer.close()
+        self.assertIn(("get_file_size", "files.py"), self.embedded())
+
+    def test_changing_model_embeds_everything_again(self):
+        """Test that vectors from another model are replaced."""
+        self.indexer.close()
+        encoder = BagOfWordsEncoder(dimensions=32)
+        indexer = CodeIndexer(project_root=self.temp_dir, embeddings=True, embedding_encoder=encoder,
+                              embedding_model="other-model")
+        self.assertEqual(indexer.update_embeddings()["symbols_embedded"], 2)
+        indexer.close()
+        self.assertEqual(len(encoder.texts), 2)
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy is not installed")
+class TestVectorIndex(unittest.TestCase):
+    """Test exact and clustered nearest neighbour search."""
+
+    def setUp(self):
+        """Create a sidecar database holding random unit vectors."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.conn = sqlite3.connect(os.path.join(self.temp_dir, "vectors.db"))
+        semantic_index.create_embedding_schema(self.conn)
+        self.rng = np.random.default_rng(1)
+        self.generation = 0
+
+    def tearDown(self):
+        """Remove the temporary database."""
+        self.conn.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def add(self, vectors):
+        """Store vectors as one new sidecar generation."""
+        self.generation += 1
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO symbol_embeddings (file_path, name, type, line_number, generation, vector) "
+                "VALUES ('a.py', 'f', 'function', 1, ?, ?)",
+                [(self.generation, vector.tobytes()) for vector in semantic_index.normalize(vectors)],
+            )
+            self.conn.execute("INSERT OR REPLACE INTO embedding_meta VALUES ('generation', ?)", (str(self.generation),))
+
+    def brute_force(self, query, limit):
+        """Return the ids of the true nearest neighbours."""
+        rows = self.conn.execute("SELECT id, vector FROM symbol_embeddings").fetchall()
+        scored = sorted(rows, key=lambda row: -float(np.frombuffer(row[1], dtype=np.float32) @ query))
+        return [row[0] for row in scored[:limit]]
+
+    def test_exact_search_and_incremental_refresh(self):
+        """Test that refreshes add new rows, drop deleted ones and rank exactly."""
+        index = VectorIndex()
+        self.add(self.rng.normal(size=(200, 16)))
+        index.refresh(self.conn)
+        self.add(self.rng.normal(size=(50, 16)))
+        with self.conn:
+            self.conn.execute("DELETE FROM symbol_embeddings WHERE id <= 20")
+            self.conn.execute("UPDATE embedding_meta SET value = '3' WHERE key = 'generation'")
+        index.refresh(self.conn)
+
+        self.assertEqual(len(index), 230)
+        self.assertFalse(index.approximate)
+        for query in semantic_index.normalize(self.rng.normal(size=(5, 16))):
+            self.assertEqual([i for i, _ in index.search(query, 10)], self.brute_force(query, 10))
+
+    def test_clustered_search_finds_most_neighbours(self):
+        """Test that the inverted file keeps recall high while scanning a fraction of the vectors."""
+        centers = self.rng.normal(size=(40, 16))
+        points = centers[self.rng.integers(0, 40, size=4000)] + 0.3 * self.rng.normal(size=(4000, 16))
+        self.add(points[:3000])
+
+        with mock.patch.object(semantic_index, "EXACT_SEARCH_MAX_VECTORS", 1000):
+            index = VectorIndex()
+            index.refresh(self.conn)
+            self.add(points[3000:])
+            index.refresh(self.conn)
+
+            self.assertTrue(index.approximate)
+            self.assertEqual(len(index), 4000)
+            found = 0
+            queries = semantic_index.normalize(self.rng.normal(size=(20, 16)) + centers[:20])
+            for query in queries:
+                found += len({i for i, _ in index.search(query, 10)} & set(self.brute_force(query, 10)))
+            self.assertGreater(found / (10 * len(queries)), 0.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
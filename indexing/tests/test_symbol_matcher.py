@@ -0,0 +1,147 @@
+# RULE #0: MANDATORY FIRST ACTION FOR EVERY REQUEST
+# 1. Read CLAUDE.md COMPLETELY before responding
+# 2. Setup Python venv: [ -d "venv" ] || ./setup-venv.sh && source venv/bin/activate
+# 3. Search for rules related to the request
+# 4. Only proceed after confirming no violations
+# Failure to follow Rule #0 has caused real harm. Check BEFORE acting, not AFTER making mistakes.
+#
+# GUARDS ARE SAFETY EQUIPMENT - WHEN THEY FIRE, FIX THE PROBLEM THEY FOUND
+# NEVER weaken, disable, or bypass guards - they prevent real harm
+
+"""Unit tests for the in-memory fuzzy symbol name index."""
+
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from code_indexer import CodeIndexer
+from symbol_matcher import (
+    SymbolNameIndex,
+    abbreviation_pattern,
+    edit_distance,
+    pattern_bitmasks,
+    spell_words,
+    split_words,
+)
+
+
+def levenshtein(a, b):
+    """Reference dynamic-programming edit distance."""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+class TestMatching(unittest.TestCase):
+    """Test word splitting, abbreviation patterns and edit distance."""
+
+    def test_split_words(self):
+        """Test snake_case, camelCase and capital runs."""
+        self.assertEqual(split_words("get_file_hash"), ["get", "file", "hash"])
+        self.assertEqual(split_words("CodeIndexer"), ["code", "indexer"])
+        self.assertEqual(split_words("HTTPServer2"), ["http", "server", "2"])
+        self.assertEqual(split_words("__init__"), ["init"])
+
+    def test_abbreviations(self):
+        """Test which names a query abbreviates and how many words it leaves over."""
+
+        def trailing(query, name):
+            found = abbreviation_pattern(query).match(spell_words(split_words(name)))
+            return None if found is None else found.group(1).count("_")
+
+        self.assertEqual(trailing("gfh", "get_file_hash"), 0)
+        self.assertEqual(trailing("GetFH", "getFileHash"), 0)
+        self.assertEqual(trailing("CodeIdx", "CodeIndexer"), 0)
+        self.assertEqual(trailing("getFile", "get_file_hash"), 1)
+        self.assertEqual(trailing("abc", "ab_b_c"), 0)
+        self.assertIsNone(trailing("fh", "get_file_hash"))
+        self.assertIsNone(trailing("gfhx", "get_file_hash"))
+        self.assertIsNone(abbreviation_pattern("__"))
+
+    def test_edit_distance_matches_reference(self):
+        """Test the bit-parallel distance against the dynamic-programming definition."""
+        rng = random.Random(7)
+        for _ in range(2000):
+            a = "".join(rng.choice("ab_c") for _ in range(rng.randint(0, 10)))
+            b = "".join(rng.choice("ab_c") for _ in range(rng.randint(0, 10)))
+            self.assertEqual(edit_distance(pattern_bitmasks(a), len(a), b), levenshtein(a, b), (a, b))
+
+
+class TestSymbolNameIndex(unittest.TestCase):
+    """Test ranking and incremental refreshes against a real index."""
+
+    def setUp(self):
+        """Index a project with similar names."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.project = Path(self.temp_dir)
+        (self.project / "files.py").write_text(
+            "def get_file_hash(): pass\n\ndef get_file_handle(): pass\n\ndef gather_fresh_hints(): pass\n"
+        )
+        (self.project / "index.py").write_text("class CodeIndexer: pass\n\nclass CodeSearcher: pass\n")
+        self.indexer = CodeIndexer(project_root=self.temp_dir)
+        self.indexer.index_all(use_git=False)
+        self.conn = sqlite3.connect(self.indexer.db_path)
+        self.index = SymbolNameIndex()
+        self.index.refresh(self.conn, self.generation())
+
+    def tearDown(self):
+        """Remove the temporary project."""
+        self.conn.close()
+        self.indexer.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def generation(self):
+        """Return the generation the indexer recorded."""
+        return self.conn.execute("SELECT value FROM index_meta WHERE key = 'generation'").fetchone()[0]
+
+    def names(self, query):
+        """Return the ranked names matching a query."""
+        return [match.name for match in self.index.match(query)]
+
+    def test_abbreviation_ranking(self):
+        """Test that initials match every word and names with fewer letters rank first."""
+        self.assertEqual(self.names("gfh"), ["get_file_hash", "get_file_handle", "gather_fresh_hints"])
+        self.assertEqual(self.names("CodeIdx"), ["CodeIndexer"])
+
+    def test_exact_and_prefix_matches(self):
+        """Test that prefixes complete to longer names and case is ignored for exact matches."""
+        matches = self.index.match("get_file")
+        self.assertEqual([match.name for match in matches], ["get_file_hash", "get_file_handle"])
+        self.assertEqual(self.index.match("codeindexer")[0].match, "exact")
+
+    def test_misspelled_names(self):
+        """Test that typos within the edit bound are found and ranked by distance."""
+        match = self.index.match("get_file_hsah")[0]
+        self.assertEqual((match.name, match.match), ("get_file_hash", "edit"))
+        self.assertEqual(self.names("CodeSaercher"), ["CodeSearcher"])
+        self.assertEqual(self.names("xyzzy"), [])
+
+    def test_incremental_refresh(self):
+        """Test that a new generation reloads only changed files and drops removed names."""
+        (self.project / "index.py").write_text("class CodeIndexer: pass\n\nclass CodeWatcher: pass\n")
+        self.indexer.index_file(self.project / "index.py")
+        self.indexer.store.delete_file(self.project / "files.py")
+        self.indexer.commit()
+
+        self.index.refresh(self.conn, self.generation())
+
+        self.assertEqual(self.names("CodeWatcher"), ["CodeWatcher"])
+        self.assertEqual(self.names("CodeSearcher"), [])
+        self.assertEqual(self.names("gfh"), [])
+        self.assertEqual(len(self.index), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,336 @@
+# RULE #0: MANDATORY FIRST ACTION FOR EVERY REQUEST
+# 1. Read CLAUDE.md COMPLETELY before responding
+# 2. Setup Python venv: [ -d "venv" ] || ./setup-venv.sh && source venv/bin/activate
+# 3. Search for rules related to the request
+# 4. Only proceed after confirming no violations
+# Failure to follow Rule #0 has caused real harm. Check BEFORE acting, not AFTER making mistakes.
+#
+# GUARDS ARE SAFETY EQUIPMENT - WHEN THEY FIRE, FIX THE PROBLEM THEY FOUND
+# NEVER weaken, disable, or bypass guards - they prevent real harm
+
+"""Unit tests for the SymbolStore bulk ingestion layer."""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from code_indexer import CodeIndexer, Reference, Symbol
+from symbol_store import SymbolStore
+
+
+def make_symbol(name, file_path, line_number=1):
+    """Build a minimal function symbol for store tests."""
+    return Symbol(name=name, type="function", file_path=file_path, line_number=line_number, column=0)
+
+
+class TestSymbolStore(unittest.TestCase):
+    """Test SymbolStore write paths and batching."""
+
+    def setUp(self):
+        """Set up a temporary database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = Path(self.temp_dir) / ".code_index.db"
+        self.store = SymbolStore(self.db_path, batch_size=3)
+
+    def tearDown(self):
+        """Clean up the temporary database."""
+        self.store.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def count_rows(self, table):
+        """Count committed rows as seen by a separate reader connection."""
+        conn = sqlite3.connect(self.db_path)
+        count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        conn.close()
+        return count
+
+    def test_uses_wal_journal(self):
+        """Test that the writer connection switches the database to WAL mode."""
+        mode = self.store.conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode.lower(), "wal")
+
+    def test_commits_in_batches(self):
+        """Test that writes become visible to readers once a full batch is written."""
+        for i in range(2):
+            self.store.write_file(f"/repo/f{i}.py", [make_symbol(f"f{i}", f"/repo/f{i}.py")], f"hash{i}")
+        self.assertEqual(self.count_rows("file_hashes"), 0)
+
+        self.store.write_file("/repo/f2.py", [make_symbol("f2", "/repo/f2.py")], "hash2")
+        self.assertEqual(self.count_rows("file_hashes"), 3)
+        self.assertEqual(self.store.pending, 0)
+
+    def test_write_file_replaces_previous_symbols(self):
+        """Test that rewriting a file drops its old symbols."""
+        path = "/repo/module.py"
+        self.store.write_file(path, [make_symbol("old", path, 1), make_symbol("older", path, 2)], "a")
+        self.store.write_file(path, [make_symbol("new", path, 1)], "b")
+        self.store.commit()
+
+        names = [row[0] for row in self.store.conn.execute("SELECT name FROM symbols WHERE file_path = ?", (path,))]
+        self.assertEqual(names, ["new"])
+        self.assertEqual(self.store.get_file_hash(path), "b")
+
+    def test_delete_file(self):
+        """Test that deleting a file removes its symbols and hash."""
+        path = "/repo/gone.py"
+        self.store.write_file(path, [make_symbol("gone", path)], "h")
+        self.store.delete_file(path)
+        self.store.commit()
+
+        self.assertEqual(self.count_rows("symbols"), 0)
+        self.assertIsNone(self.store.get_file_hash(path))
+
+    def test_remove_missing_files(self):
+        """Test that stored files absent from the walk are removed, scoped to the walked tree."""
+        for name in ("kept.py", "gone.py", "sub/gone_too.py"):
+            path = f"/repo/{name}"
+            self.store.write_file(path, [make_symbol("f", path)], "h", module=name[:-3].replace("/", "."))
+        self.store.write_file("/other/outside.py", [make_symbol("f", "/other/outside.py")], "h")
+        self.store.write_file("/repo0/sibling.py", [make_symbol("f", "/repo0/sibling.py")], "h")
+
+        result = self.store.remove_missing_files(["/repo/kept.py"], scope="/repo")
+
+        self.assertEqual(result["files_removed"], 2)
+        # 2 files x (symbol + file hash) + 3 module name suffixes
+        self.assertEqual(result["rows_removed"], 7)
+        remaining = {row[0] for row in self.store.conn.execute("SELECT file_path FROM file_hashes")}
+        self.assertEqual(remaining, {"/repo/kept.py", "/other/outside.py", "/repo0/sibling.py"})
+        self.assertEqual(self.count_rows("symbols"), 3)
+
+    def test_adds_stat_columns_to_existing_database(self):
+        """Test that a pre-stat file_hashes table is migrated in place."""
+        legacy_path = Path(self.temp_dir) / "legacy.db"
+        conn = sqlite3.connect(legacy_path)
+        conn.execute("CREATE TABLE file_hashes (file_path TEXT PRIMARY KEY, hash TEXT NOT NULL, last_modified TIMESTAMP)")
+        conn.execute("INSERT INTO file_hashes VALUES ('/repo/a.py', 'abc', NULL)")
+        conn.commit()
+        conn.close()
+
+        with SymbolStore(legacy_path) as store:
+            state = store.get_file_state("/repo/a.py")
+
+        # Databases from before the reference index are re-parsed once
+        self.assertEqual(state.hash, "")
+        self.assertIsNone(state.st_mtime_ns)
+
+    def test_write_file_replaces_references(self):
+        """Test that rewriting or deleting a file replaces its references."""
+        path = "/repo/caller.py"
+        self.store.write_file(path, [], "a", references=[Reference("old_call", "call", path, 3, 4, "main")])
+        self.store.write_file(path, [], "b", references=[Reference("new_call", "call", path, 5, 4, "main")])
+        self.store.commit()
+
+        rows = self.store.conn.execute("SELECT name, line_number, scope FROM symbol_references").fetchall()
+        self.assertEqual(rows, [("new_call", 5, "main")])
+
+        self.store.delete_file(path)
+        self.store.commit()
+        self.assertEqual(self.count_rows("symbol_references"), 0)
+
+    def test_paths_and_docstrings_are_stored_once(self):
+        """Test that symbols reference an interned path and keep docstrings in the side table."""
+        path = "/repo/documented.py"
+        documented = Symbol("load", "function", path, 1, 0, docstring="Read the configuration file.")
+        self.store.write_file(path, [documented, make_symbol("save", path, 5)], "h")
+        self.store.commit()
+
+        self.assertEqual(self.count_rows("files"), 1)
+        self.assertEqual(self.count_rows("docstrings"), 1)
+        row = self.store.conn.execute(
+            "SELECT name, type, file_path, docstring, file_hash FROM symbols WHERE name = 'load'"
+        ).fetchone()
+        self.assertEqual(row, ("load", "function", path, "Read the configuration file.", "h"))
+        matches = self.store.conn.execute("SELECT rowid FROM symbols_fts WHERE symbols_fts MATCH 'configuration'")
+        self.assertEqual(len(matches.fetchall()), 1)
+
+        self.store.write_file(path, [make_symbol("load", path, 1)], "h2")
+        self.store.commit()
+        self.assertEqual(self.count_rows("docstrings"), 0)
+        matches = self.store.conn.execute("SELECT rowid FROM symbols_fts WHERE symbols_fts MATCH 'configuration'")
+        self.assertEqual(matches.fetchall(), [])
+
+        self.store.delete_file(path)
+        self.store.commit()
+        self.assertEqual(self.count_rows("files"), 0)
+
+    def test_migrates_flat_symbols_table(self):
+        """Test that an index built with the original flat symbols table is migrated in place."""
+        legacy_path = Path(self.temp_dir) / "flat.db"
+        conn = sqlite3.connect(legacy_path)
+        conn.execute(
+            """
+            CREATE TABLE symbols (
+                id INTEGER PRIMARY KEY, name TEXT NOT NULL, type TEXT NOT NULL, file_path TEXT NOT NULL,
+                line_number INTEGER NOT NULL, column INTEGER NOT NULL, parent TEXT, signature TEXT,
+                docstring TEXT, file_hash TEXT NOT NULL, indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(name, type, file_path, line_number)
+            )
+        """
+        )
+        conn.executemany(
+            "INSERT INTO symbols (id, name, type, file_path, line_number, column, parent, signature, docstring, file_hash)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (7, "Parser", "class", "/repo/parse.py", 1, 0, None, None, "Tokenize input.", "h"),
+                (9, "feed", "method", "/repo/parse.py", 3, 4, "Parser", "(self, data)", None, "h"),
+                (12, "main", "function", "/repo/cli.py", 1, 0, None, "()", None, "h"),
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+        with SymbolStore(legacy_path) as store:
+            rows = store.conn.execute(
+                "SELECT id, name, type, file_path, parent, signature, docstring FROM symbols ORDER BY id"
+            ).fetchall()
+            self.assertEqual(
+                rows,
+                [
+                    (7, "Parser", "class", "/repo/parse.py", None, None, "Tokenize input."),
+                    (9, "feed", "method", "/repo/parse.py", "Parser", "(self, data)", None),
+                    (12, "main", "function", "/repo/cli.py", None, "()", None),
+                ],
+            )
+            counts = dict(store.conn.execute("SELECT name, symbol_count FROM symbol_kinds WHERE symbol_count > 0"))
+            self.assertEqual(counts, {"class": 1, "method": 1, "function": 1})
+            kind = store.conn.execute("SELECT type FROM sqlite_master WHERE name = 'symbols'").fetchone()[0]
+            self.assertEqual(kind, "view")
+            matches = store.conn.execute("SELECT rowid FROM symbols_fts WHERE symbols_fts MATCH 'tokenize'")
+            self.assertEqual(matches.fetchall(), [(7,)])
+
+            store.write_file("/repo/parse.py", [make_symbol("parse", "/repo/parse.py")], "h2")
+            store.commit()
+            names = [row[0] for row in store.conn.execute("SELECT name FROM symbols ORDER BY name")]
+            self.assertEqual(names, ["main", "parse"])
+            matches = store.conn.execute("SELECT rowid FROM symbols_fts WHERE symbols_fts MATCH 'tokenize'")
+            self.assertEqual(matches.fetchall(), [])
+
+    def test_counters_track_symbols_and_files(self):
+        """Test that maintained counts match a scan after replacing, deleting and pruning files."""
+        for name in ("a.py", "b.py", "c.py"):
+            path = f"/repo/{name}"
+            symbols = [make_symbol("f", path, 1), Symbol(name="C", type="class", file_path=path, line_number=2, column=0)]
+            self.store.write_file(path, symbols, "h")
+        self.store.write_file("/repo/a.py", [make_symbol("g", "/repo/a.py")], "h2")
+        self.store.write_file("/repo/b.py", [], "h2")
+        self.store.delete_file("/repo/c.py")
+        self.store.write_file("/repo/d.py", [make_symbol("d", "/repo/d.py")], "h")
+        self.store.remove_missing_files(["/repo/a.py", "/repo/b.py"], scope="/repo")
+
+        counts = dict(self.store.conn.execute("SELECT name, symbol_count FROM symbol_kinds"))
+        scanned = dict(self.store.conn.execute("SELECT type, COUNT(*) FROM symbols GROUP BY type"))
+        self.assertEqual(counts, {"function": scanned.get("function", 0), "class": 0, "method": 0, "variable": 0})
+        files = self.store.conn.execute("SELECT value FROM index_counters WHERE name = 'files'").fetchone()[0]
+        self.assertEqual(files, self.count_rows("files"))
+        self.assertEqual(files, 1)
+
+    def test_reference_counter_is_maintained_and_backfilled(self):
+        """Test that the reference count follows writes and is recounted for older databases."""
+        for name in ("a.py", "b.py"):
+            path = f"/repo/{name}"
+            refs = [Reference("call", "call", path, line, 0, None) for line in (1, 2, 3)]
+            self.store.write_file(path, [], "h", references=refs)
+        self.store.write_file("/repo/a.py", [], "h2", references=[Reference("call", "call", "/repo/a.py", 1, 0, None)])
+        self.store.delete_file("/repo/b.py")
+        self.store.commit()
+
+        def counted():
+            return self.store.conn.execute("SELECT value FROM index_counters WHERE name = 'references'").fetchone()[0]
+
+        self.assertEqual(counted(), self.count_rows("symbol_references"))
+        self.assertEqual(counted(), 1)
+
+        self.store.conn.execute("DELETE FROM index_counters WHERE name = 'references'")
+        self.store.conn.execute("DROP TRIGGER references_count_insert")
+        self.store.commit()
+        self.store.close()
+        self.store = SymbolStore(self.db_path, batch_size=3)
+        self.assertEqual(counted(), 1)
+
+    def test_commits_with_writes_bump_generation(self):
+        """Test that only commits carrying file writes advance the index generation."""
+        start = int(self.store.get_meta("generation"))
+        self.store.commit()
+        self.store.put_cached_extraction("h", 1, b"x")
+        self.store.commit()
+        self.assertEqual(int(self.store.get_meta("generation")), start)
+
+        self.store.write_file("/repo/a.py", [make_symbol("a", "/repo/a.py")], "h")
+        self.store.commit()
+        self.assertEqual(int(self.store.get_meta("generation")), start + 1)
+        self.assertIsNotNone(self.store.get_meta("last_indexed"))
+
+    def test_trim_extraction_cache_evicts_least_recently_used(self):
+        """Test that trimming keeps the most recently used entries that fit and drops old versions."""
+        for i, used_at in enumerate((100, 300, 200)):
+            self.store.put_cached_extraction(f"h{i}", 1, b"x" * 10)
+            self.store.conn.execute("UPDATE extraction_cache SET last_used = ? WHERE content_hash = ?", (used_at, f"h{i}"))
+        self.store.put_cached_extraction("stale", 0, b"x")
+
+        evicted = self.store.trim_extraction_cache(25, extractor_version=1)
+
+        self.assertEqual(evicted, 2)
+        remaining = {row[0] for row in self.store.conn.execute("SELECT content_hash FROM extraction_cache")}
+        self.assertEqual(remaining, {"h1", "h2"})
+        self.assertIsNotNone(self.store.get_cached_extraction("h2", 1))
+        self.assertIsNone(self.store.get_cached_extraction("h2", 2))
+
+
+class TestCodeIndexerIngestion(unittest.TestCase):
+    """Test that CodeIndexer writes through the store efficiently."""
+
+    def setUp(self):
+        """Set up a temporary project."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.indexer = CodeIndexer(project_root=self.temp_dir, batch_size=50)
+
+    def tearDown(self):
+        """Clean up the temporary project."""
+        self.indexer.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_index_file_hashes_once(self):
+        """Test that indexing a file with many symbols hashes its contents once."""
+        test_file = Path(self.temp_dir) / "many.py"
+        test_file.write_text("".join(f"def func_{i}(): pass\n" for i in range(20)))
+
+        with patch.object(self.indexer, "hash_bytes", wraps=self.indexer.hash_bytes) as hash_bytes:
+            self.indexer.index_file(test_file)
+
+        self.assertEqual(hash_bytes.call_count, 1)
+        self.assertEqual(self.indexer.get_stats()["total_symbols"], 20)
+
+    def test_index_directory_commits_at_end(self):
+        """Test that a directory index is fully committed when it returns."""
+        for i in range(5):
+            (Path(self.temp_dir) / f"mod_{i}.py").write_text(f"class C{i}: pass\n")
+
+        count = self.indexer.index_directory(".")
+
+        self.assertEqual(count, 5)
+        self.assertEqual(self.indexer.store.pending, 0)
+        self.assertEqual(self.indexer.get_stats()["total_files"], 5)
+
+    def test_index_all_removes_deleted_files(self):
+        """Test that a full index drops files deleted without a watcher event."""
+        for i in range(3):
+            (Path(self.temp_dir) / f"mod_{i}.py").write_text(f"def f{i}(): pass\n")
+        self.indexer.index_all()
+
+        (Path(self.temp_dir) / "mod_1.py").unlink()
+        self.indexer.index_all()
+
+        self.assertEqual(self.indexer.get_stats()["total_files"], 2)
+        self.assertIsNone(self.indexer.store.get_file_hash(Path(self.temp_dir) / "mod_1.py"))
+        self.assertEqual(self.indexer.reconcile()["files_removed"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
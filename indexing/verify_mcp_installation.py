@@ -171,6 +171,13 @@ def main():
         print("2. Tools will be available as:")
         print("   - mcp__code-search__search_code")
         print("   - mcp__code-search__list_symbols")
+        print("   - mcp__code-search__find_references")
+        print("   - mcp__code-search__find_callers")
+        print("   - mcp__code-search__get_imports")
+        print("   - mcp__code-search__find_dependents")
+        print("   - mcp__code-search__get_file_symbols")
+        print("   - mcp__code-search__semantic_search")
+        print("   - mcp__code-search__batch_search")
         print("   - mcp__code-search__get_search_stats")
     else:
         print("\n⚠️  Installation has issues. Check the output above.")
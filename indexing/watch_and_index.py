@@ -5,9 +5,9 @@ Uses watchdog library for efficient file system monitoring
 """
 
 import logging
+import os
 import threading
 import time
-from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
 
 try:
@@ -17,10 +17,15 @@ try:
     HAS_WATCHDOG = True
 except ImportError:
     HAS_WATCHDOG = False
+    # Lets the module load so main() can fall back to polling
+    FileSystemEventHandler = object
     print("Warning: watchdog not installed. Install with: pip install watchdog")
-    print("Falling back to periodic scanning mode.")
+    print("Falling back to polling for changes.")
 
 from code_indexer import CodeIndexer
+from index_events import CHANGED, DELETED, MOVED, CatchUp, EventQueue, IndexWorker
+from index_poller import DirectoryPoller
+from indexer_metrics import REGISTRY, start_health_server
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -28,11 +33,15 @@ logger = logging.getLogger(__name__)
 
 
 class CodeIndexHandler(FileSystemEventHandler):
-    """Handles file system events and updates the code index"""
+    """Queues file system events for the index worker.
 
-    def __init__(self, indexer):
+    Events are only recorded here, so the observer thread never waits on
+    parsing or the database; the IndexWorker debounces and applies them.
+    """
+
+    def __init__(self, indexer, events):
         self.indexer = indexer
-        self.last_indexed = {}
+        self.events = events
 
     def should_index_file(self, file_path):
         """Check if file should be indexed"""
@@ -46,134 +55,73 @@ class CodeIndexHandler(FileSystemEventHandler):
         if "__pycache__" in str(path) or "venv" in str(path):
             return False
 
-        # Skip if file was indexed very recently (within 1 second)
-        last_time = self.last_indexed.get(str(path), 0)
-        if time.time() - last_time < 1.0:
-            return False
-
         return True
 
+    def should_track_directory(self, dir_path):
+        """Check if a deleted or moved directory can contain indexed files"""
+        return "__pycache__" not in str(dir_path) and "venv" not in str(dir_path)
+
     def on_modified(self, event):
         """Handle file modification events"""
-        if event.is_directory:
-            return
-
-        if self.should_index_file(event.src_path):
-            logger.info(f"File modified: {event.src_path}")
-            try:
-                file_path = Path(event.src_path)
-                self.indexer.index_file(file_path)
-                self.last_indexed[str(file_path)] = time.time()
-                logger.info(f"Successfully re-indexed: {event.src_path}")
-            except Exception as e:
-                logger.error(f"Error indexing {event.src_path}: {e}")
+        if not event.is_directory and self.should_index_file(event.src_path):
+            logger.debug(f"File modified: {event.src_path}")
+            self.events.put(event.src_path, CHANGED)
 
     def on_created(self, event):
         """Handle file creation events"""
-        if event.is_directory:
-            return
-
-        if self.should_index_file(event.src_path):
-            logger.info(f"New file created: {event.src_path}")
-            # Wait a moment for the file to be fully written
-            time.sleep(0.1)
-            try:
-                file_path = Path(event.src_path)
-                self.indexer.index_file(file_path)
-                self.last_indexed[str(file_path)] = time.time()
-                logger.info(f"Successfully indexed new file: {event.src_path}")
-            except Exception as e:
-                logger.error(f"Error indexing {event.src_path}: {e}")
+        if not event.is_directory and self.should_index_file(event.src_path):
+            logger.debug(f"New file created: {event.src_path}")
+            self.events.put(event.src_path, CHANGED)
 
     def on_deleted(self, event):
-        """Handle file deletion events"""
+        """Handle file and directory deletion events"""
         if event.is_directory:
+            relevant = self.should_track_directory(event.src_path)
+        else:
+            relevant = self.should_index_file(event.src_path)
+        if relevant:
+            logger.debug(f"Deleted: {event.src_path}")
+            self.events.put(event.src_path, DELETED)
+
+    def on_moved(self, event):
+        """Handle file and directory moves by re-pointing stored paths instead of re-parsing"""
+        # watchdog follows a directory move with synthetic moves of everything
+        # below it, which the directory move has already handled
+        if getattr(event, "is_synthetic", False):
             return
-
-        if Path(event.src_path).suffix in self.indexer.extensions:
-            logger.info(f"File deleted: {event.src_path}")
-            # Remove from index
-            try:
-                import sqlite3
-
-                conn = sqlite3.connect(self.indexer.db_path)
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM symbols WHERE file_path = ?", (event.src_path,))
-                cursor.execute("DELETE FROM file_hashes WHERE file_path = ?", (event.src_path,))
-                conn.commit()
-                conn.close()
-                logger.info(f"Removed from index: {event.src_path}")
-            except Exception as e:
-                logger.error(f"Error removing {event.src_path} from index: {e}")
-
-
-class HealthCheckHandler(BaseHTTPRequestHandler):
-    """Simple HTTP handler for health checks"""
-
-    def do_GET(self):
-        if self.path == "/health":
-            self.send_response(200)
-            self.send_header("Content-type", "text/plain")
-            self.end_headers()
-            self.wfile.write(b"OK")
+        if event.is_directory:
+            relevant = self.should_track_directory(event.src_path) or self.should_track_directory(event.dest_path)
         else:
-            self.send_response(404)
-            self.end_headers()
-
-    def log_message(self, format, *args):
-        # Suppress health check logs
-        if "/health" not in args[0]:
-            super().log_message(format, *args)
-
-
-def start_health_server(port=9999):
-    """Start a simple HTTP server for health checks"""
-    server_address = ("", port)
-    httpd = HTTPServer(server_address, HealthCheckHandler)
-    logger.info(f"Health check server started on port {port}")
-    httpd.serve_forever()
+            relevant = self.should_index_file(event.src_path) or self.should_index_file(event.dest_path)
+        if relevant:
+            logger.debug(f"Moved: {event.src_path} -> {event.dest_path}")
+            self.events.put(event.dest_path, MOVED, source=event.src_path)
 
 
-def periodic_scan(indexer, scan_interval=60):
-    """Fallback mode: periodically scan for changes"""
-    logger.info(f"Running in periodic scan mode (every {scan_interval} seconds)")
-
-    while True:
-        try:
-            logger.info("Starting periodic scan...")
-            changed_count = 0
-
-            for directory in indexer.index_dirs:
-                dir_path = indexer.project_root / directory
-                if not dir_path.exists():
-                    continue
-
-                for file_path in dir_path.rglob("*.py"):
-                    if "__pycache__" in str(file_path) or "venv" in str(file_path):
-                        continue
+def main():
+    """Main entry point"""
+    catch_up = None
 
-                    if indexer.should_reindex_file(file_path):
-                        indexer.index_file(file_path)
-                        changed_count += 1
+    def health_status():
+        return {"catch_up": catch_up.progress() if catch_up is not None else {"state": "waiting"}}
 
-            if changed_count > 0:
-                logger.info(f"Updated {changed_count} files in index")
-            else:
-                logger.info("No changes detected")
+    # Start the health check and /metrics server in a background thread
+    health_thread = threading.Thread(target=start_health_server, kwargs={"status": health_status}, daemon=True)
+    health_thread.start()
 
-        except Exception as e:
-            logger.error(f"Error during periodic scan: {e}")
+    # CODE_INDEX_EMBEDDINGS=1 keeps semantic search embeddings up to date as well
+    indexer = CodeIndexer(embeddings=os.environ.get("CODE_INDEX_EMBEDDINGS") == "1")
 
-        time.sleep(scan_interval)
+    # File events, polls and the startup catch-up only queue paths; one worker applies them in batches
+    events = EventQueue()
+    REGISTRY.gauge("code_index_event_queue_depth", "Paths waiting in the watcher event queue",
+                   function=lambda: len(events))
 
-
-def main():
-    """Main entry point"""
-    # Start health check server in background thread
-    health_thread = threading.Thread(target=start_health_server, daemon=True)
-    health_thread.start()
-
-    indexer = CodeIndexer()
+    poller = None
+    if not HAS_WATCHDOG:
+        # Record the tree before the startup index so edits made meanwhile show up in the first poll
+        poller = DirectoryPoller(indexer, events)
+        poller.prime()
 
     # Initial full index if database is empty
     import sqlite3
@@ -188,36 +136,44 @@ def main():
         logger.info("Database is empty, performing initial index...")
         indexer.index_all()
 
+    # Embedding changed symbols must not hold up applying the next file events
+    indexer.start_embedding_updates()
+    worker = IndexWorker(indexer, events)
+    worker.start()
+
     if HAS_WATCHDOG:
         # Use watchdog for efficient monitoring
         logger.info("Starting file watcher with watchdog...")
 
-        event_handler = CodeIndexHandler(indexer)
-        observer = Observer()
+        event_handler = CodeIndexHandler(indexer, events)
+        watcher = Observer()
 
         # Watch each configured directory
         for directory in indexer.index_dirs:
             dir_path = indexer.project_root / directory
             if dir_path.exists():
-                observer.schedule(event_handler, str(dir_path), recursive=True)
+                watcher.schedule(event_handler, str(dir_path), recursive=True)
                 logger.info(f"Watching directory: {dir_path}")
-
-        observer.start()
-
-        try:
-            while True:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            observer.stop()
-            logger.info("File watcher stopped")
-        observer.join()
-
     else:
-        # Fallback to periodic scanning
-        try:
-            periodic_scan(indexer)
-        except KeyboardInterrupt:
-            logger.info("Periodic scanner stopped")
+        # Fallback to polling directory mtimes
+        logger.info("Starting directory poller...")
+        watcher = poller
+
+    watcher.start()
+
+    # Changes made while the watcher was down are queued next to the live events
+    catch_up = CatchUp(indexer, events)
+    catch_up.start()
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        watcher.stop()
+        worker.stop()
+        logger.info("File watcher stopped")
+    watcher.join()
+    worker.join()
 
 
 if __name__ == "__main__":
@@ -202,6 +202,8 @@ mkdir -p "$CENTRAL_DIR/code-review"
 echo -e "${YELLOW}Installing code-search server...${NC}"
 cp "$SCRIPT_DIR/indexing/mcp_search_server.py" "$CENTRAL_DIR/code-search/server.py"
 cp -r "$SCRIPT_DIR/indexing/src" "$CENTRAL_DIR/code-search/"
+# semantic_search embeds queries with the same generator the indexer uses
+cp "$SCRIPT_DIR/duplicate_prevention/embedding_generator.py" "$CENTRAL_DIR/code-search/src/"
 chmod +x "$CENTRAL_DIR/code-search/server.py"
 echo -e "${GREEN}✓ code-search server installed${NC}"
 